@@ -0,0 +1,77 @@
+import argparse
+import sys
+import time
+from typing import List, Optional
+
+from .services.batch_fit import LAW_FITTERS, fit_directory
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """コマンドライン引数の定義"""
+    parser = argparse.ArgumentParser(
+        prog="python -m app_package.cli",
+        description="硬化則カーブフィッティングのバッチ実行",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    fit_parser = subparsers.add_parser("fit", help="ディレクトリ内の全CSVをフィッティング")
+    fit_parser.add_argument("directory", help="試験データ(CSV)を格納したディレクトリ")
+    fit_parser.add_argument("--workers", type=int, default=None, help="並列プロセス数（省略時はCPUコア数）")
+    fit_parser.add_argument("--output", default="fit_results.csv", help="結果テーブルの出力先CSV")
+    fit_parser.add_argument("--pattern", default="*.csv", help="対象ファイルのglobパターン")
+    fit_parser.add_argument("--strain-col", default=None, help="ひずみ列名（省略時は1列目）")
+    fit_parser.add_argument("--stress-col", default=None, help="応力列名（省略時は2列目）")
+    fit_parser.add_argument("--percent", action="store_true", help="ひずみの単位が[%%]の場合に指定")
+    fit_parser.add_argument("--young-modulus", type=float, default=200000, help="ヤング率[MPa]")
+    fit_parser.add_argument("--yield-stress", type=float, default=300, help="降伏応力[MPa]")
+    fit_parser.add_argument("--fit-range", type=float, nargs=2, default=None, metavar=("START", "END"),
+                            help="フィット範囲（省略時は塑性ひずみの全範囲）")
+    fit_parser.add_argument("--max-iterations", type=int, default=1000, help="イテレーション回数制限")
+    fit_parser.add_argument("--solver", choices=["curve_fit", "varpro"], default="curve_fit",
+                            help="ソルバー（varpro は Ludwik則・Voce則に変数射影法を使用）")
+    fit_parser.add_argument("--cache-dir", default=None,
+                            help="フィット結果のディスクキャッシュ（省略時は環境変数 FITCURVE_CACHE_DIR）")
+    fit_parser.add_argument("--laws", nargs="+", choices=list(LAW_FITTERS), default=list(LAW_FITTERS),
+                            help="フィッティングする硬化則")
+    return parser
+
+
+def run_fit(args: argparse.Namespace) -> int:
+    """fitサブコマンドの実行"""
+    curve_options = {
+        "epsilon_column": args.strain_col,
+        "sigma_column": args.stress_col,
+        "is_strain_percent": args.percent,
+        "young_modulus": args.young_modulus,
+        "yield_stress": args.yield_stress,
+    }
+    start_time = time.perf_counter()
+    result_df = fit_directory(
+        args.directory,
+        curve_options,
+        fit_range=tuple(args.fit_range) if args.fit_range else None,
+        max_iterations=args.max_iterations,
+        laws=tuple(args.laws),
+        pattern=args.pattern,
+        workers=args.workers,
+        solver=args.solver,
+        cache_dir=args.cache_dir,
+    )
+    elapsed = time.perf_counter() - start_time
+
+    result_df.to_csv(args.output, index=False)
+    num_specimens = result_df["specimen"].nunique() if not result_df.empty else 0
+    num_errors = int((result_df["status"] != "ok").sum()) if not result_df.empty else 0
+    print(f"{num_specimens} specimens, {len(result_df)} fits ({num_errors} errors) in {elapsed:.2f} s -> {args.output}")
+    return 1 if num_errors else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command == "fit":
+        return run_fit(args)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
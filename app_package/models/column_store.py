@@ -0,0 +1,105 @@
+from pydantic import BaseModel, ConfigDict
+import hashlib
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+
+from typing import Dict, List, Sequence
+
+
+def _pyarrow_csv():
+    """pyarrow の CSV リーダー（未インストールの場合は None）。読み込みが重いため使用時に読み込む"""
+    try:
+        import pyarrow as pa
+        from pyarrow import csv as pa_csv
+    except ImportError:
+        return None, None
+    return pa, pa_csv
+
+
+class ColumnStore(BaseModel):
+    """
+    大きなCSVから必要な列だけを取り出して保持する列指向キャッシュ
+    ・列は初回アクセス時にチャンク単位で読み込み、float64 の生バイナリとして cache_dir に保存
+    ・以降はメモリマップで参照するため、全列のデータフレームをメモリに持たない
+    """
+    source_path: str
+    digest: str
+    cache_dir: str
+    chunksize: int = 1_000_000
+
+    def column_path(self, column: str) -> str:
+        """列キャッシュのファイルパス"""
+        # 列名はファイル名に使えない文字を含みうるためハッシュ値で識別する
+        column_id = hashlib.sha1(column.encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{self.digest}__{column_id}.f64")
+
+    def column(self, column: str) -> np.ndarray:
+        """
+        列を読み取り専用のメモリマップ配列として取得（未作成なら作成）
+        ・更新時刻を最後の使用時刻として更新する（古い列キャッシュの削除に使用）
+        """
+        path = self.column_path(column)
+        if not os.path.exists(path):
+            self.extract([column])
+        else:
+            os.utime(path)
+        if os.path.getsize(path) == 0:
+            return np.empty(0, dtype=np.float64)
+        return np.memmap(path, dtype=np.float64, mode="r")
+
+    def extract(self, columns: Sequence[str]) -> None:
+        """指定した列をチャンク単位で読み込み、列キャッシュに書き出す"""
+        columns = [column for column in dict.fromkeys(columns) if not os.path.exists(self.column_path(column))]
+        if not columns:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        # 一時ファイルに書き出してから置き換える（途中のファイルを参照させない）
+        tmp_files: Dict[str, str] = {}
+        handles = {}
+        try:
+            for column in columns:
+                fd, tmp_files[column] = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+                handles[column] = os.fdopen(fd, "wb")
+            for chunk in self._iter_chunks(columns):
+                for column in columns:
+                    np.ascontiguousarray(chunk[column], dtype=np.float64).tofile(handles[column])
+        finally:
+            for handle in handles.values():
+                handle.close()
+        for column, tmp_path in tmp_files.items():
+            os.replace(tmp_path, self.column_path(column))
+
+    def _iter_chunks(self, columns: List[str]):
+        """列ごとの numpy 配列の辞書をチャンク単位で返す"""
+        pa, pa_csv = _pyarrow_csv()
+        if pa_csv is not None:
+            # pyarrow のストリーミングリーダー（必要な列のみ、型を明示）
+            reader = pa_csv.open_csv(
+                self.source_path,
+                read_options=pa_csv.ReadOptions(block_size=64 * 1024 * 1024),
+                convert_options=pa_csv.ConvertOptions(
+                    include_columns=columns,
+                    column_types={column: pa.float64() for column in columns},
+                ),
+            )
+            for batch in reader:
+                yield {column: batch.column(column).to_numpy(zero_copy_only=False) for column in columns}
+        else:
+            for chunk in pd.read_csv(
+                    self.source_path,
+                    usecols=columns,
+                    dtype={column: np.float64 for column in columns},
+                    chunksize=self.chunksize,
+                    engine="c",
+            ):
+                yield {column: chunk[column].to_numpy() for column in columns}
+
+    @staticmethod
+    def default_cache_dir() -> str:
+        """列キャッシュの既定の保存先（環境変数 FITCURVE_DATA_DIR で変更可）"""
+        return os.environ.get("FITCURVE_DATA_DIR") or os.path.join(tempfile.gettempdir(), "fitcurve_columns")
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
@@ -1,12 +1,18 @@
 from pydantic import BaseModel, Field
-from typing import Tuple
+from typing import Literal, Optional, Tuple
 
 
 class FitSettings(BaseModel):
     """フィッティングの設定を管理するモデル"""
     fit_range: Tuple[float, float]
-    initial_guess: Tuple[float, float] = Field(default=(1.0, 0.2))
+    # None の場合はデータから初期推定値を自動で決定
+    initial_guess: Optional[Tuple[float, float]] = Field(default=None)
     max_iterations: int = Field(default=1000)
+    solver: Literal["curve_fit", "varpro"] = Field(default="curve_fit")
+    # 材料名（同じ材料の前回結果をウォームスタートに使用）
+    material: Optional[str] = Field(default=None)
+    # 硬化則ごとのフィッティング制限時間[秒]
+    timeout: float = Field(default=10.0)
     
     def validate_range(self) -> bool:
         """範囲が有効かどうか検証"""
@@ -0,0 +1,204 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+import time
+import pandas as pd
+import numpy as np
+
+from typing import Any, ClassVar, Dict, Optional, Tuple
+
+from . import kernels
+
+
+def build_strain_grid(
+        strain_range: Tuple[float, float],
+        num_points: int = 100,
+        detail_range: Tuple[float, float] = (0.0, 0.05),
+        detail_points: int = 50
+) -> np.ndarray:
+    """
+    プロット・エクスポート用のひずみの格子を作成
+    ・strain_range の全体を num_points 点の割合で、detail_range を detail_points 点で分割
+    """
+    # 全体範囲のデータを生成（詳細範囲を除く）
+    strain_before = np.linspace(strain_range[0], detail_range[0],
+                               int(num_points * (detail_range[0] - strain_range[0]) /
+                                  (strain_range[1] - strain_range[0])))
+
+    # 詳細範囲のデータを生成
+    strain_detail = np.linspace(detail_range[0], detail_range[1], detail_points)
+
+    # 詳細範囲の後のデータを生成
+    strain_after = np.linspace(detail_range[1], strain_range[1],
+                              int(num_points * (strain_range[1] - detail_range[1]) /
+                                 (strain_range[1] - strain_range[0])))
+
+    # 3つの配列を結合
+    strain = np.concatenate([strain_before, strain_detail, strain_after])
+
+    # 重複した境界値を削除（オプション）
+    strain = np.unique(strain)
+    return strain
+
+
+class FitTimeoutError(TimeoutError):
+    """フィッティングが制限時刻までに終わらなかった場合の例外"""
+
+
+def check_deadline(deadline: Optional[float]) -> None:
+    """制限時刻（time.monotonic() 基準）を過ぎていれば FitTimeoutError を送出"""
+    if deadline is not None and time.monotonic() > deadline:
+        raise FitTimeoutError("フィッティングが制限時間内に終わりませんでした")
+
+
+@dataclass(slots=True, kw_only=True)
+class HardeningLaw(ABC):
+    """
+    硬化則モデルの共通基底クラス
+    ・降伏応力 yield_stress と2つのフィッティングパラメータを持つ
+    ・サブクラスは param_names, law_function, law_jacobian を定義する
+    ・varpro_bounds を指定するサブクラスは separable_basis(x, p2, yield_stress) も定義する
+      （p2 を固定したときの分離形 σ = offset + p1 * basis の (offset, basis)）
+    ・一括フィッティングやブートストラップで大量に生成するため、検証なしの __slots__ 付き dataclass とする
+    """
+    yield_stress: float
+
+    # 法則名（計算カーネルの選択に使用）
+    law_name: ClassVar[Optional[str]] = None
+    # フィッティングパラメータ名（モデルのフィールド名）
+    param_names: ClassVar[Tuple[str, str]]
+    # フィッティングの初期推定値
+    default_initial_guess: ClassVar[Tuple[float, float]]
+    # 変数射影法(VarPro)で探索する非線形パラメータ p2 の範囲（None の場合は非対応）
+    varpro_bounds: ClassVar[Optional[Tuple[float, float]]] = None
+    # 直近の fit_to_data での関数評価回数
+    _nfev: int = field(default=0, init=False, repr=False, compare=False)
+    # 直近の fit_to_data でのパラメータの共分散行列（curve_fit の pcov）
+    _covariance: Optional[np.ndarray] = field(default=None, init=False, repr=False, compare=False)
+
+    def __init_subclass__(cls, **kwargs):
+        """varpro_bounds を指定して separable_basis を定義していない硬化則はクラス定義時にエラー"""
+        # slots=True の dataclass はクラスを作り直すため、引数なしの super() は使えない
+        super(HardeningLaw, cls).__init_subclass__(**kwargs)
+        if cls.varpro_bounds is not None and not hasattr(cls, "separable_basis"):
+            raise TypeError(f"{cls.__name__}: varpro_bounds を指定する場合は separable_basis を定義してください")
+
+    @staticmethod
+    @abstractmethod
+    def law_function(x, p1, p2, yield_stress):
+        """硬化則の関数 σ(x; p1, p2)"""
+
+    @staticmethod
+    @abstractmethod
+    def law_jacobian(x, p1, p2, yield_stress):
+        """硬化則の関数のパラメータに関する偏微分 (∂σ/∂p1, ∂σ/∂p2)"""
+
+    @classmethod
+    def residual(cls, params, x, y, yield_stress) -> np.ndarray:
+        """残差 σ(x; p) - y"""
+        return cls.law_function(x, params[0], params[1], yield_stress) - y
+
+    @classmethod
+    def jacobian(cls, params, x, yield_stress) -> np.ndarray:
+        """残差のヤコビアン (N, 2)"""
+        j1, j2 = cls.law_jacobian(x, params[0], params[1], yield_stress)
+        return np.column_stack(np.broadcast_arrays(j1, j2))
+
+    @property
+    def nfev(self) -> int:
+        """直近の fit_to_data での関数評価回数（curve_fit の nfev）"""
+        return self._nfev
+
+    @property
+    def covariance(self) -> Optional[np.ndarray]:
+        """直近の fit_to_data でのパラメータの共分散行列 (2, 2)（未フィッティング・varpro の場合は None）"""
+        return self._covariance
+
+    @property
+    def standard_errors(self) -> Optional[Tuple[float, float]]:
+        """共分散行列から求めたパラメータの標準誤差（漸近近似）"""
+        if self._covariance is None:
+            return None
+        return tuple(float(value) for value in np.sqrt(np.abs(np.diag(self._covariance))))
+
+    @property
+    def params(self) -> Tuple[float, float]:
+        """フィッティングパラメータの値"""
+        return tuple(getattr(self, name) for name in self.param_names)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """降伏応力とフィッティングパラメータの辞書（コンストラクタ引数と同じ形）"""
+        return {"yield_stress": self.yield_stress, **dict(zip(self.param_names, self.params))}
+
+    def set_params(self, params) -> None:
+        """フィッティングパラメータを設定"""
+        for name, value in zip(self.param_names, params):
+            setattr(self, name, float(value))
+
+    def get_stress(self, strain: float) -> float:
+        """
+        指定されたひずみにおける応力を計算
+        ・1次元配列の場合は計算カーネル（Numba があれば一時配列を作らないループ）で評価
+        """
+        return kernels.law_stress(type(self), strain, *self.params, self.yield_stress)
+
+    def fit_to_data(
+            self,
+            strain_data,
+            stress_data,
+            initial_guess: Optional[Tuple[float, float]] = None,
+            max_iterations=1000,
+            deadline: Optional[float] = None,
+    ) -> None:
+        """
+        データからパラメータをフィッティング（解析的ヤコビアンを使用）
+        ・deadline（time.monotonic() 基準）を過ぎると評価のたびに FitTimeoutError で中断
+        """
+        # scipy は読み込みが重いため、フィッティング時に初めて読み込む
+        from scipy import optimize
+
+        yield_stress = self.yield_stress
+
+        def function(x, p1, p2):
+            check_deadline(deadline)
+            return self.law_function(x, p1, p2, yield_stress)
+
+        def jacobian(x, p1, p2):
+            check_deadline(deadline)
+            return self.jacobian((p1, p2), x, yield_stress)
+
+        params, covariance, info, _, _ = optimize.curve_fit(
+            function,
+            strain_data,
+            stress_data,
+            p0=initial_guess or self.default_initial_guess,
+            jac=jacobian,
+            maxfev=max_iterations,
+            full_output=True
+        )
+        self._nfev = int(info["nfev"])
+        self._covariance = covariance
+        # パラメータをモデルに設定
+        self.set_params(params)
+
+    def calculate_r_squared(self, x, y):
+        """決定係数R²を計算（残差平方和と全平方和は計算カーネルで1回の走査で求める）"""
+        return kernels.r_squared(type(self), x, y, *self.params, self.yield_stress)
+
+    def get_plot_data(
+            self,
+            strain_range: Tuple[float, float],
+            num_points: int = 100,
+            detail_range: Tuple[float, float] = (0.0, 0.05),
+            detail_points: int = 50
+    ) -> pd.DataFrame:
+        """
+        プロット用のデータを取得
+        ・strain_range で全体範囲を指定
+        ・detail_range で詳細範囲を指定
+        ・detail_points で詳細範囲のポイント数を指定
+        """
+        strain = build_strain_grid(strain_range, num_points, detail_range, detail_points)
+
+        # 応力を計算
+        stress = self.get_stress(strain)
+        return pd.DataFrame({"strain": strain, "stress": stress})
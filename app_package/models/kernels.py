@@ -0,0 +1,130 @@
+import logging
+import os
+import threading
+from typing import TYPE_CHECKING, Optional, Tuple, Type
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .hardening_law import HardeningLaw
+
+
+# モデルはサービス層（instrumentation）に依存しないため、同じロガーに直接出力する
+logger = logging.getLogger("fitcurve")
+
+
+# 計算バックエンドの選択（auto: numba があれば小さい配列の残差平方和に使用、numba: 必須ですべてに使用、numpy: 使用しない）
+KERNELS_ENV = "FITCURVE_KERNELS"
+BACKEND_NUMBA = "numba"
+BACKEND_NUMPY = "numpy"
+
+# auto で Numba を使う点数の上限（これより多いと SVML のない環境では NumPy の方が速い）
+AUTO_MAX_POINTS = 2048
+
+_backend: Optional[str] = None
+# すべての計算を Numba で行うか（明示的に numba を指定した場合のみ）
+_numba_always = False
+_numba_kernels = None
+_backend_lock = threading.Lock()
+
+
+def _resolve() -> str:
+    """
+    使用するバックエンドを決定
+    ・numba は読み込みとコンパイル（キャッシュがあれば読み込みのみ）が重いため、最初のカーネル呼び出し時に読み込む
+    """
+    global _backend, _numba_kernels, _numba_always
+    with _backend_lock:
+        if _backend is not None:
+            return _backend
+        requested = os.environ.get(KERNELS_ENV, "auto").lower()
+        _backend = BACKEND_NUMPY
+        _numba_always = requested == BACKEND_NUMBA
+        if requested != BACKEND_NUMPY:
+            try:
+                from . import kernels_numba
+                kernels_numba.warm_up()
+                _numba_kernels = kernels_numba.KERNELS
+                _backend = BACKEND_NUMBA
+            except ImportError as e:
+                if requested == BACKEND_NUMBA:
+                    raise
+                logger.info("Numba を利用できないため NumPy で計算します: %s", e)
+            except Exception as e:
+                if requested == BACKEND_NUMBA:
+                    raise
+                logger.warning("Numba カーネルのコンパイルに失敗したため NumPy で計算します", exc_info=e)
+        logger.info("計算カーネルのバックエンド: %s", _backend)
+        return _backend
+
+
+def backend() -> str:
+    """使用中のバックエンド名（"numba" または "numpy"）"""
+    return _resolve()
+
+
+def set_backend(name: Optional[str]) -> str:
+    """
+    バックエンドを切り替え（ベンチマーク用）
+    ・None の場合は環境変数 FITCURVE_KERNELS に従って選び直す
+    """
+    global _backend
+    with _backend_lock:
+        _backend = None
+    if name is None:
+        return _resolve()
+    previous = os.environ.get(KERNELS_ENV)
+    os.environ[KERNELS_ENV] = name
+    try:
+        return _resolve()
+    finally:
+        if previous is None:
+            os.environ.pop(KERNELS_ENV, None)
+        else:
+            os.environ[KERNELS_ENV] = previous
+
+
+def _kernel(law_class: Type["HardeningLaw"], *arrays) -> Optional[tuple]:
+    """law_class と配列に使える Numba カーネル（なければ None）"""
+    if _resolve() != BACKEND_NUMBA or law_class.law_name not in _numba_kernels:
+        return None
+    if not all(isinstance(array, np.ndarray) and array.ndim == 1 and len(array) for array in arrays):
+        return None
+    if any(len(array) != len(arrays[0]) for array in arrays):
+        return None
+    return _numba_kernels[law_class.law_name]
+
+
+def law_stress(law_class: Type["HardeningLaw"], x, p1: float, p2: float, yield_stress: float):
+    """
+    硬化則の応力 σ(x; p1, p2)
+    ・FITCURVE_KERNELS=numba の場合は一時配列を作らない1重ループで評価（結果の配列のみ確保）
+    ・auto では law_function をそのまま評価（SVML のない環境では pow / exp の1重ループは NumPy より遅いため）
+    """
+    kernel = _kernel(law_class, x)
+    if kernel is None or not _numba_always:
+        return law_class.law_function(x, p1, p2, yield_stress)
+    x = np.ascontiguousarray(x, dtype=np.float64)
+    out = np.empty_like(x)
+    kernel[0](x, float(p1), float(p2), float(yield_stress), out)
+    return out
+
+
+def residual_sums(law_class: Type["HardeningLaw"], x, y, p1: float, p2: float, yield_stress: float) -> Tuple[float, float]:
+    """
+    残差平方和 Σ(y - σ)² と全平方和 Σ(y - ȳ)²
+    ・Numba が使える場合は1回の走査で両方を累積し、一時配列を作らない（auto では AUTO_MAX_POINTS 点以下のみ）
+    """
+    kernel = _kernel(law_class, x, y)
+    if kernel is None or not (_numba_always or len(x) <= AUTO_MAX_POINTS):
+        residuals = y - law_class.law_function(x, p1, p2, yield_stress)
+        return np.sum(residuals ** 2), np.sum((y - np.mean(y)) ** 2)
+    x = np.ascontiguousarray(x, dtype=np.float64)
+    y = np.ascontiguousarray(y, dtype=np.float64)
+    return kernel[1](x, y, float(p1), float(p2), float(yield_stress))
+
+
+def r_squared(law_class: Type["HardeningLaw"], x, y, p1: float, p2: float, yield_stress: float) -> float:
+    """決定係数 R²"""
+    ss_res, ss_tot = residual_sums(law_class, x, y, p1, p2, yield_stress)
+    return 1 - (np.float64(ss_res) / ss_tot)
@@ -0,0 +1,111 @@
+"""
+硬化則の評価・残差平方和の Numba カーネル（numba がインストールされている場合のみ kernels から読み込む）
+・各カーネルは一時配列を作らない1重ループ
+・cache=True でコンパイル結果をディスク（__pycache__ または NUMBA_CACHE_DIR）に保存し、次回以降の起動ではコンパイルしない
+"""
+import math
+
+import numba
+import numpy as np
+
+# ゼロ除算などは例外ではなく NumPy と同じく inf / nan にする
+jit = numba.njit(cache=True, error_model="numpy")
+# 累積は並べ替え（ベクトル化）を許可する（nan / inf の扱いは変えない）
+jit_sums = numba.njit(cache=True, error_model="numpy", fastmath={"reassoc", "contract", "afn"})
+
+
+@jit
+def _ludwik(x, k, n, yield_stress):
+    return yield_stress + k * x ** n
+
+
+@jit
+def _swift(x, alpha, n, yield_stress):
+    return yield_stress * (1.0 + x / alpha) ** n
+
+
+@jit
+def _voce(x, stress_infinite, h, yield_stress):
+    return stress_infinite - (stress_infinite - yield_stress) * math.exp(-h * x)
+
+
+# 応力の評価（結果を out に書き込む）
+@jit
+def ludwik_stress(x, p1, p2, yield_stress, out):
+    for i in range(x.shape[0]):
+        out[i] = _ludwik(x[i], p1, p2, yield_stress)
+
+
+@jit
+def swift_stress(x, p1, p2, yield_stress, out):
+    for i in range(x.shape[0]):
+        out[i] = _swift(x[i], p1, p2, yield_stress)
+
+
+@jit
+def voce_stress(x, p1, p2, yield_stress, out):
+    for i in range(x.shape[0]):
+        out[i] = _voce(x[i], p1, p2, yield_stress)
+
+
+# 残差平方和と全平方和（1回の走査、y は先頭の値を引いてから累積して桁落ちを抑える）
+@jit_sums
+def ludwik_sums(x, y, p1, p2, yield_stress):
+    shift = y[0]
+    ss_res = 0.0
+    total = 0.0
+    total_square = 0.0
+    for i in range(x.shape[0]):
+        residual = y[i] - _ludwik(x[i], p1, p2, yield_stress)
+        ss_res += residual * residual
+        d = y[i] - shift
+        total += d
+        total_square += d * d
+    return ss_res, total_square - total * total / x.shape[0]
+
+
+@jit_sums
+def swift_sums(x, y, p1, p2, yield_stress):
+    shift = y[0]
+    ss_res = 0.0
+    total = 0.0
+    total_square = 0.0
+    for i in range(x.shape[0]):
+        residual = y[i] - _swift(x[i], p1, p2, yield_stress)
+        ss_res += residual * residual
+        d = y[i] - shift
+        total += d
+        total_square += d * d
+    return ss_res, total_square - total * total / x.shape[0]
+
+
+@jit_sums
+def voce_sums(x, y, p1, p2, yield_stress):
+    shift = y[0]
+    ss_res = 0.0
+    total = 0.0
+    total_square = 0.0
+    for i in range(x.shape[0]):
+        residual = y[i] - _voce(x[i], p1, p2, yield_stress)
+        ss_res += residual * residual
+        d = y[i] - shift
+        total += d
+        total_square += d * d
+    return ss_res, total_square - total * total / x.shape[0]
+
+
+# 法則名 → (応力の評価, 残差平方和と全平方和)
+KERNELS = {
+    "ludwik": (ludwik_stress, ludwik_sums),
+    "swift": (swift_stress, swift_sums),
+    "voce": (voce_stress, voce_sums),
+}
+
+
+def warm_up() -> None:
+    """全カーネルを float64 の1次元配列でコンパイル（キャッシュがあれば読み込むだけ）"""
+    x = np.linspace(0.01, 0.1, 4)
+    out = np.empty_like(x)
+    for stress, sums in KERNELS.values():
+        stress(x, 1.0, 0.5, 1.0, out)
+        sums(x, out, 1.0, 0.5, 1.0)
@@ -1,40 +1,95 @@
-from pydantic import BaseModel, ConfigDict
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Any, ClassVar, Dict, FrozenSet, Optional, Tuple
 import pandas as pd
 import numpy as np
 
+from .column_store import ColumnStore
+
+
+def _changed(old: Any, new: Any) -> bool:
+    """フィールドの値が変わったかどうか（データフレームなどは同一オブジェクトかどうかで判定）"""
+    if old is new:
+        return False
+    if isinstance(old, (pd.DataFrame, ColumnStore)) or isinstance(new, (pd.DataFrame, ColumnStore)):
+        return True
+    return old != new
+
+
+@dataclass(slots=True, kw_only=True, eq=False)
+class RawData:
+    """
+    CSVから読み込んだ生データとカラム選択情報を保持するクラス
+    ・大きなファイルの場合 df は先頭行のプレビューのみで、列データは column_store から読み込む
+    ・ひずみ・応力の配列は列・単位の選択ごとに一度だけ作成し、連続した読み取り専用の配列（dtype）で保持する
+    ・元の列が既に dtype の連続配列ならコピーせずにそのまま参照する
+    """
+    # 変換済み列のキャッシュ (列名, パーセント変換の有無, dtype) -> 配列（他のフィールドより先に初期化する）
+    _columns: Dict[Tuple[str, bool, str], np.ndarray] = field(default_factory=dict, init=False, repr=False)
 
-class RawData(BaseModel):
-    """CSVから読み込んだ生データとカラム選択情報を保持するクラス"""
     df: pd.DataFrame
+    column_store: Optional[ColumnStore] = None
     epsilon_column: Optional[str] = None
     sigma_column: Optional[str] = None
     is_strain_percent: bool = False
     young_modulus: float = 200000
     yield_stress: float = 300
+    dtype: Any = np.float64
+
+    # 変換済み列のキャッシュを無効化するフィールド
+    cache_sources: ClassVar[FrozenSet[str]] = frozenset(
+        {"df", "column_store", "epsilon_column", "sigma_column", "is_strain_percent", "dtype"}
+    )
+
+    def __setattr__(self, name, value):
+        # 値が変わった場合のみ破棄する（カラム選択のたびに同じ値が再設定されるため）
+        if name in RawData.cache_sources and self._columns and _changed(getattr(self, name), value):
+            self._columns.clear()
+        object.__setattr__(self, name, value)
 
     @property
     def strain_col(self) -> np.ndarray:
         """ひずみの配列を取得（パーセント値の場合は変換）"""
         if not self.epsilon_column:
-            return np.array([])
-            
-        if self.is_strain_percent:
-            return self.df[self.epsilon_column].to_numpy() * 0.01
-        else:
-            return self.df[self.epsilon_column].to_numpy()
+            return np.array([], dtype=self.dtype)
+        return self._converted(self.epsilon_column, self.is_strain_percent)
     
     @property
     def stress_col(self) -> np.ndarray:
         """応力の配列を取得"""
         if not self.sigma_column:
-            return np.array([])
-        return self.df[self.sigma_column].to_numpy()
+            return np.array([], dtype=self.dtype)
+        return self._converted(self.sigma_column, False)
+
+    def _converted(self, column: str, is_percent: bool) -> np.ndarray:
+        """変換済みの列をキャッシュから取得（なければ作成して読み取り専用で保存）"""
+        key = (column, is_percent, np.dtype(self.dtype).str)
+        array = self._columns.get(key)
+        if array is None:
+            source = self._column(column)
+            if is_percent:
+                array = np.multiply(source, 0.01, dtype=self.dtype)
+            else:
+                # 既に連続した dtype の配列ならコピーしない（元の列を書き込み不可にしないよう view を保持する）
+                array = np.ascontiguousarray(source, dtype=self.dtype)
+                if np.may_share_memory(array, source):
+                    array = array.view()
+            array.setflags(write=False)
+            self._columns[key] = array
+        return array
+
+    def _column(self, column: str) -> np.ndarray:
+        """列データを取得（列キャッシュがあればそこから読み込む）"""
+        if self.column_store is not None:
+            return self.column_store.column(column)
+        return self.df[column].to_numpy()
+
+    def load_columns(self) -> None:
+        """選択中のひずみ列・応力列を列キャッシュに一度の読み込みで用意"""
+        if self.column_store is not None and self.epsilon_column and self.sigma_column:
+            self.column_store.extract([self.epsilon_column, self.sigma_column])
     
     def is_ready(self) -> bool:
         """データが解析準備完了かどうか確認"""
         return (self.epsilon_column is not None and 
                 self.sigma_column is not None and
                 not self.df.empty)
-    
-    model_config = ConfigDict(arbitrary_types_allowed=True)
\ No newline at end of file
@@ -1,30 +1,94 @@
-from pydantic import BaseModel, ConfigDict
+from dataclasses import dataclass, field
+import hashlib
 import pandas as pd
 import numpy as np
 
-class StressStrainCurve(BaseModel):
-    """応力ひずみ曲線のデータモデル"""
+from typing import Any, Callable, ClassVar, Dict, FrozenSet, Optional
+
+
+@dataclass(slots=True, kw_only=True, eq=False)
+class StressStrainCurve:
+    """
+    応力ひずみ曲線のデータモデル
+    ・真ひずみ・真応力などの派生配列は初回アクセス時に一度だけ計算し、読み取り専用で保持する
+    ・nominal_strain / nominal_stress / young_modulus / yield_stress の変更時にのみ再計算する
+    ・配列は dtype（float64 または float32）で保持し、既に同じ型ならコピーしない
+    ・フィッティングのループで大量に生成するため、検証なしの __slots__ 付き dataclass とする
+    """
+    # キャッシュは他のフィールドより先に初期化する（フィールドの設定時に破棄されるため）
+    _cache: Dict[str, Any] = field(default_factory=dict, init=False, repr=False)
+    _content_hash: Optional[str] = field(default=None, init=False, repr=False)
+
     nominal_strain: np.ndarray
     nominal_stress: np.ndarray
     young_modulus: float = 200000
     yield_stress: float = 300
     label_strain: str = "strain[-]"
     label_stress: str = "stress[MPa]"
-    
+    dtype: Any = np.float64
+
+    # 派生配列のキャッシュを無効化するフィールド
+    cache_sources: ClassVar[FrozenSet[str]] = frozenset({"nominal_strain", "nominal_stress", "young_modulus", "yield_stress"})
+
+    def __post_init__(self):
+        self.nominal_strain = np.asarray(self.nominal_strain, dtype=self.dtype)
+        self.nominal_stress = np.asarray(self.nominal_stress, dtype=self.dtype)
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name in StressStrainCurve.cache_sources and (self._cache or self._content_hash is not None):
+            self.invalidate_cache()
+
+    def invalidate_cache(self) -> None:
+        """派生配列のキャッシュを破棄"""
+        self._cache.clear()
+        self._content_hash = None
+
+    def content_hash(self) -> str:
+        """曲線データ（公称ひずみ・応力、ヤング率、降伏応力）のハッシュ値"""
+        if self._content_hash is None:
+            digest = hashlib.sha256()
+            for array in (self.nominal_strain, self.nominal_stress):
+                array = np.ascontiguousarray(array, dtype=np.float64)
+                digest.update(str(array.shape).encode())
+                digest.update(array.tobytes())
+            digest.update(repr((float(self.young_modulus), float(self.yield_stress))).encode())
+            self._content_hash = digest.hexdigest()
+        return self._content_hash
+
+    def _cached(self, name: str, compute: Callable[[], np.ndarray]) -> np.ndarray:
+        """派生配列をキャッシュから取得（なければ計算して読み取り専用で保存）"""
+        value = self._cache.get(name)
+        if value is None:
+            value = np.asarray(compute())
+            value.setflags(write=False)
+            self._cache[name] = value
+        return value
+
+    def cached(self, name: str, compute: Callable[[], Any]) -> Any:
+        """
+        曲線データから派生する任意の値をキャッシュから取得（なければ計算して保存）
+        ・曲線データの変更時に派生配列と一緒に破棄される
+        ・返した値は共有されるため変更しないこと
+        """
+        if name not in self._cache:
+            self._cache[name] = compute()
+        return self._cache[name]
+
     @property
     def true_strain(self) -> np.ndarray:
         """真ひずみを計算"""
-        return np.log(1 + self.nominal_strain)
+        return self._cached("true_strain", lambda: np.log(1 + self.nominal_strain))
     
     @property
     def true_stress(self) -> np.ndarray:
         """真応力を計算"""
-        return self.nominal_stress * (1 + self.nominal_strain)
+        return self._cached("true_stress", lambda: self.nominal_stress * (1 + self.nominal_strain))
     
     @property
     def elastic_strain(self) -> np.ndarray:
         """弾性ひずみを計算"""
-        return self.true_stress / self.young_modulus
+        return self._cached("elastic_strain", lambda: self.true_stress / self.young_modulus)
 
     @property
     def plastic_strain(self) -> np.ndarray:
@@ -32,12 +96,11 @@ class StressStrainCurve(BaseModel):
         塑性ひずみを計算
         降伏応力未満は0、降伏応力以上は真ひずみから弾性ひずみを引いた値を返す
         """
-        result = np.zeros_like(self.true_strain)
-        yield_indices = np.where(self.true_stress >= self.yield_stress)[0]
-        
-        if len(yield_indices) > 0:
-            result[yield_indices] = self.true_strain[yield_indices] - self.elastic_strain[yield_indices]
-        return result
+        return self._cached("plastic_strain", lambda: np.where(
+            self.true_stress >= self.yield_stress,
+            self.true_strain - self.elastic_strain,
+            0.0
+        ))
     
     def get_nominal_data(self) -> pd.DataFrame:
         """公称ひずみ・公称応力データをデータフレームで取得"""
@@ -69,5 +132,3 @@ class StressStrainCurve(BaseModel):
         # 初期点を追加して返却
         initial_point_df = pd.DataFrame({col_strain: [0], col_stress: [self.yield_stress]})
         return pd.concat([initial_point_df, nonzero_plastic_df], ignore_index=True)
-    
-    model_config = ConfigDict(arbitrary_types_allowed=True)
\ No newline at end of file
@@ -0,0 +1,329 @@
+import asyncio
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlencode
+
+import numpy as np
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+
+from .models.stress_strain_curve import StressStrainCurve
+from .models.fit_settings import FitSettings
+from .services.fit_curve import LAW_MODELS, get_fit_data
+from .services.micro_batcher import LatencyStats, MicroBatcher
+
+
+class FitRequest(BaseModel):
+    """
+    フィッティング要求
+    ・JSON の場合は本文に全項目を指定
+    ・バイナリ(application/octet-stream)の場合は本文に float64 のひずみ列・応力列を連結し、他の項目はクエリで指定
+    """
+    strain: np.ndarray
+    stress: np.ndarray
+    young_modulus: float = 200000
+    yield_stress: float = 300
+    is_strain_percent: bool = False
+    laws: List[str] = Field(default_factory=lambda: list(LAW_MODELS))
+    # None の場合は塑性ひずみの全範囲
+    fit_range: Optional[Tuple[float, float]] = None
+    max_iterations: int = 1000
+    material: Optional[str] = None
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    def to_curve(self) -> StressStrainCurve:
+        strain = self.strain * 0.01 if self.is_strain_percent else self.strain
+        return StressStrainCurve(
+            nominal_strain=strain,
+            nominal_stress=self.stress,
+            young_modulus=self.young_modulus,
+            yield_stress=self.yield_stress,
+        )
+
+    def to_settings(self, curve: StressStrainCurve) -> FitSettings:
+        fit_range = self.fit_range or (0.0, float(curve.plastic_strain.max()))
+        return FitSettings(fit_range=fit_range, max_iterations=self.max_iterations, material=self.material)
+
+
+class RequestError(ValueError):
+    """不正なフィッティング要求（400 を返す）"""
+
+
+def _parse_arrays(strain: Any, stress: Any) -> Tuple[np.ndarray, np.ndarray]:
+    strain = np.asarray(strain, dtype=np.float64).ravel()
+    stress = np.asarray(stress, dtype=np.float64).ravel()
+    if len(strain) != len(stress):
+        raise RequestError("strain と stress の長さが一致しません")
+    if len(strain) < 3 or not (np.all(np.isfinite(strain)) and np.all(np.isfinite(stress))):
+        raise RequestError("strain / stress は3点以上の有限値で指定してください")
+    return strain, stress
+
+
+def _parse_query(query_string: bytes) -> Dict[str, Any]:
+    """バイナリ要求のクエリ（laws=ludwik,swift / fit_range=0,0.5 のようにカンマ区切り）"""
+    fields: Dict[str, Any] = {}
+    for key, values in parse_qs(query_string.decode()).items():
+        value = values[-1]
+        if key in ("laws", "fit_range"):
+            fields[key] = [item for item in value.split(",") if item]
+        elif key == "is_strain_percent":
+            fields[key] = value.lower() in ("1", "true", "yes")
+        else:
+            fields[key] = value
+    return fields
+
+
+def parse_fit_request(body: bytes, content_type: str, query_string: bytes = b"") -> FitRequest:
+    """要求本文（JSON またはバイナリ配列）を FitRequest に変換"""
+    try:
+        if content_type.startswith("application/octet-stream"):
+            if len(body) % 16 != 0:
+                raise RequestError("本文は float64 のひずみ列・応力列を連結した長さにしてください")
+            values = np.frombuffer(body, dtype="<f8")
+            fields = _parse_query(query_string)
+            fields["strain"], fields["stress"] = _parse_arrays(*np.split(values, 2))
+        else:
+            fields = json.loads(body or b"{}")
+            if not isinstance(fields, dict):
+                raise RequestError("本文はJSONオブジェクトで指定してください")
+            fields["strain"], fields["stress"] = _parse_arrays(fields.get("strain", []), fields.get("stress", []))
+        request = FitRequest.model_validate(fields)
+    except (ValueError, TypeError, ValidationError) as e:
+        raise RequestError(f"{e}") from e
+
+    unknown = [law for law in request.laws if law not in LAW_MODELS]
+    if unknown or not request.laws:
+        raise RequestError(f"未対応の硬化則です: {unknown} (対応: {list(LAW_MODELS)})")
+    return request
+
+
+class FitService:
+    """
+    フィッティングのASGIアプリケーション
+    ・POST /fit      曲線を受け取り、指定した硬化則のパラメータと決定係数を返す
+    ・GET  /metrics  待ち行列の長さ・平均バッチサイズ・レイテンシのパーセンタイル
+    ・GET  /health   死活確認
+    ・同時に届いた要求は MicroBatcher で硬化則ごとにまとめて一括フィッティングする
+    """
+
+    def __init__(self, window: float = 0.005, max_batch: int = 256):
+        self.batcher = MicroBatcher(window=window, max_batch=max_batch)
+        self.latency = LatencyStats()
+        self.num_requests = 0
+        self.num_errors = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        method, path = scope["method"], scope["path"]
+        if path == "/fit" and method == "POST":
+            status, payload = await self._fit(scope, await self._read_body(receive))
+        elif path == "/metrics" and method == "GET":
+            status, payload = 200, self.metrics()
+        elif path == "/health" and method == "GET":
+            status, payload = 200, {"status": "ok"}
+        else:
+            status, payload = 404, {"error": f"{method} {path} は存在しません"}
+        await self._send_json(send, status, payload)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                self.batcher.start()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.batcher.stop()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    @staticmethod
+    async def _read_body(receive) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                return b"".join(chunks)
+
+    @staticmethod
+    async def _send_json(send, status: int, payload: Dict) -> None:
+        body = json.dumps(payload).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def _fit(self, scope, body: bytes) -> Tuple[int, Dict]:
+        """曲線を検証し、硬化則ごとの要求を MicroBatcher に投入して結果を集める"""
+        start_time = time.perf_counter()
+        self.num_requests += 1
+        headers = dict(scope.get("headers") or [])
+        content_type = headers.get(b"content-type", b"application/json").decode()
+        try:
+            request = parse_fit_request(body, content_type, scope.get("query_string", b""))
+            curve = request.to_curve()
+            settings = request.to_settings(curve)
+            if not settings.validate_range():
+                raise RequestError(f"fit_range が不正です: {settings.fit_range}")
+            if len(get_fit_data(curve, settings)[0]) < 2:
+                raise RequestError("fit_range 内のデータが2点未満です")
+        except RequestError as e:
+            self.num_errors += 1
+            return 400, {"error": f"{e}"}
+
+        outcomes = await asyncio.gather(
+            *(self.batcher.submit(law, curve, settings) for law in request.laws),
+            return_exceptions=True,
+        )
+        results = {}
+        for law, outcome in zip(request.laws, outcomes):
+            if isinstance(outcome, Exception):
+                self.num_errors += 1
+                results[law] = {"status": "error", "error": f"{outcome}"}
+                continue
+            results[law] = {
+                "status": "ok" if outcome.converged else "not_converged",
+                "params": dict(zip(outcome.model.param_names, outcome.model.params)),
+                "r_squared": outcome.r_squared,
+                "batch_size": outcome.batch_size,
+            }
+        elapsed = time.perf_counter() - start_time
+        self.latency.record(elapsed)
+        return 200, {
+            "yield_stress": curve.yield_stress,
+            "fit_range": list(settings.fit_range),
+            "results": results,
+            "elapsed": elapsed,
+        }
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "requests": self.num_requests,
+            "errors": self.num_errors,
+            "request_latency": self.latency.summary(),
+            **self.batcher.metrics(),
+        }
+
+
+class LocalResponse(BaseModel):
+    """LocalClient の応答"""
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+
+class LocalClient:
+    """
+    ASGIアプリをネットワークを使わずに同一プロセス内で呼び出すクライアント
+    ・専用スレッドでイベントループを動かし、複数スレッドからの同時呼び出しをそのままアプリに渡す
+    ・with 文で lifespan の startup / shutdown を実行する
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="asgi-local", daemon=True)
+        self._lifespan_queue: Optional[asyncio.Queue] = None
+        self._lifespan_sent: Optional[asyncio.Queue] = None
+        self._lifespan_task = None
+
+    def __enter__(self) -> "LocalClient":
+        self._thread.start()
+        self._run(self._startup())
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._run(self._shutdown())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def _run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    async def _startup(self):
+        self._lifespan_queue = asyncio.Queue()
+        self._lifespan_sent = asyncio.Queue()
+        self._lifespan_task = asyncio.create_task(
+            self.app({"type": "lifespan"}, self._lifespan_queue.get, self._lifespan_sent.put)
+        )
+        await self._lifespan_queue.put({"type": "lifespan.startup"})
+        await self._lifespan_sent.get()
+
+    async def _shutdown(self):
+        await self._lifespan_queue.put({"type": "lifespan.shutdown"})
+        await self._lifespan_sent.get()
+        await self._lifespan_task
+
+    async def _request(self, method: str, path: str, body: bytes, headers: Dict[str, str], query: str):
+        scope = {
+            "type": "http",
+            "method": method,
+            "path": path,
+            "query_string": query.encode(),
+            "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        }
+        received = False
+
+        async def receive():
+            nonlocal received
+            if received:
+                await asyncio.Event().wait()
+            received = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        await self.app(scope, receive, send)
+        start = next(m for m in messages if m["type"] == "http.response.start")
+        return LocalResponse(
+            status=start["status"],
+            headers={k.decode(): v.decode() for k, v in start["headers"]},
+            body=b"".join(m.get("body", b"") for m in messages if m["type"] == "http.response.body"),
+        )
+
+    def request(
+            self,
+            method: str,
+            path: str,
+            json_body: Any = None,
+            content: bytes = b"",
+            headers: Optional[Dict[str, str]] = None,
+            params: Optional[Dict[str, Any]] = None,
+    ) -> LocalResponse:
+        headers = dict(headers or {})
+        if json_body is not None:
+            content = json.dumps(json_body).encode()
+            headers.setdefault("content-type", "application/json")
+        query = urlencode(params or {})
+        return self._run(self._request(method, path, content, headers, query))
+
+    def post(self, path: str, **kwargs) -> LocalResponse:
+        return self.request("POST", path, **kwargs)
+
+    def get(self, path: str, **kwargs) -> LocalResponse:
+        return self.request("GET", path, **kwargs)
+
+
+def encode_arrays(strain: np.ndarray, stress: np.ndarray) -> bytes:
+    """バイナリ要求の本文（float64 のひずみ列・応力列を連結）"""
+    return np.concatenate([np.asarray(strain, dtype="<f8"), np.asarray(stress, dtype="<f8")]).tobytes()
+
+
+# uvicorn app_package.server:app で起動
+app = FitService()
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+from typing import Callable, Tuple
+
+from ..models.hardening_law import HardeningLaw
+
+
+def _interpolation_error(x: np.ndarray, y: np.ndarray, x_test: np.ndarray, y_test: np.ndarray) -> np.ndarray:
+    """点列 (x, y) の折れ線で x_test を補間したときの誤差（複数列の場合は列ごとの最大値）"""
+    index = np.clip(np.searchsorted(x, x_test) - 1, 0, len(x) - 2)
+    t = (x_test - x[index]) / (x[index + 1] - x[index])
+    if y.ndim == 2:
+        t = t[:, None]
+    error = np.abs(y[index] + t * (y[index + 1] - y[index]) - y_test)
+    return error.max(axis=1) if error.ndim == 2 else error
+
+
+def refine(
+        func: Callable[[np.ndarray], np.ndarray],
+        lo: float,
+        hi: float,
+        tolerance: float,
+        initial_points: int = 17,
+        max_points: int = 100_000,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    誤差二分法で区間を細分化
+    ・各区間の 1/4, 1/2, 3/4 点で折れ線補間の誤差を一括評価し、許容誤差を超える区間だけを二分
+    ・func は (N,) または (N, K) の値を返す（K 本の曲線の最大誤差で判定）
+    """
+    x = np.linspace(lo, hi, initial_points)
+    y = func(x)
+    min_width = (hi - lo) * 1e-9
+    while len(x) < max_points:
+        width = np.diff(x)
+        probe = (x[:-1, None] + width[:, None] * np.array([0.25, 0.5, 0.75])).ravel()
+        error = _interpolation_error(x, y, probe, func(probe)).reshape(-1, 3).max(axis=1)
+        split = (error > tolerance) & (width > min_width)
+        if not np.any(split):
+            break
+        mid = x[:-1][split] + width[split] / 2
+        order = np.argsort(np.concatenate([x, mid]), kind="stable")
+        x = np.concatenate([x, mid])[order]
+        y = np.concatenate([y, func(mid)])[order]
+    return x, y
+
+
+def simplify(x: np.ndarray, y: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    折れ線の点を間引く
+    ・先頭から、間の全点を tolerance 以内で補間できる最も遠い点まで一度に進む
+    ・残した点のインデックスを返す
+    """
+    keep = [0]
+    start, n = 0, len(x)
+    while start < n - 1:
+        # 進める距離を倍々に伸ばしてから二分探索で最も遠い点を探す
+        def within(end):
+            if end - start < 2:
+                return True
+            segment = slice(start + 1, end)
+            return _interpolation_error(x[[start, end]], y[[start, end]], x[segment], y[segment]).max() <= tolerance
+
+        step = 1
+        while start + step * 2 < n and within(start + step * 2):
+            step *= 2
+        low, high = start + step, min(start + step * 2, n - 1)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if within(middle):
+                low = middle
+            else:
+                high = middle - 1
+        start = max(low, start + 1)
+        keep.append(start)
+    return np.array(keep)
+
+
+def adaptive_sample(
+        func: Callable[[np.ndarray], np.ndarray],
+        lo: float,
+        hi: float,
+        tolerance: float,
+        max_points: int = 100_000,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    折れ線補間で func を tolerance 以内に再現する少ない点列を作る
+    ・許容誤差の1/4で細分化し、残り3/4で間引く（合計で tolerance 以内）
+    """
+    x, y = refine(func, lo, hi, tolerance / 4, max_points=max_points)
+    keep = simplify(x, y, tolerance * 3 / 4)
+    return x[keep], y[keep]
+
+
+def get_adaptive_plot_data(
+        law_model: HardeningLaw,
+        strain_range: Tuple[float, float],
+        tolerance: float = 1.0,
+) -> pd.DataFrame:
+    """
+    硬化則を応力誤差 tolerance[MPa] 以内で再現する点列を取得
+    ・get_plot_data と同じ列構成 (strain, stress)
+    """
+    strain, stress = adaptive_sample(law_model.get_stress, strain_range[0], strain_range[1], tolerance)
+    return pd.DataFrame({"strain": strain, "stress": stress})
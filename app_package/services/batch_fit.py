@@ -0,0 +1,145 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from ..models import kernels
+from ..models.raw_data import RawData
+from ..models.stress_strain_curve import StressStrainCurve
+from ..models.fit_settings import FitSettings
+from .fit_curve import LAW_FITTERS
+from .fit_cache import get_fit_cache
+
+
+def load_curve(
+        csv_path: str,
+        epsilon_column: Optional[str] = None,
+        sigma_column: Optional[str] = None,
+        is_strain_percent: bool = False,
+        young_modulus: float = 200000,
+        yield_stress: float = 300,
+) -> StressStrainCurve:
+    """
+    CSVファイルから応力ひずみ曲線を作成
+    ・列名を省略した場合は1列目をひずみ、2列目を応力とする
+    ・列が足りない・指定した列がない場合はファイル名と列名を含む ValueError
+    """
+    df = pd.read_csv(csv_path)
+    cols = df.columns.tolist()
+    if (epsilon_column is None or sigma_column is None) and len(cols) < 2:
+        raise ValueError(f"{csv_path}: ひずみ・応力の2列が必要ですが、列が {len(cols)} 列しかありません（{cols}）")
+    epsilon_column = epsilon_column or cols[0]
+    sigma_column = sigma_column or cols[1]
+    missing = [column for column in (epsilon_column, sigma_column) if column not in cols]
+    if missing:
+        raise ValueError(f"{csv_path}: 列 {missing} がありません（列: {cols}）")
+    raw_data = RawData(
+        df=df,
+        epsilon_column=epsilon_column,
+        sigma_column=sigma_column,
+        is_strain_percent=is_strain_percent,
+        young_modulus=young_modulus,
+        yield_stress=yield_stress,
+    )
+    return StressStrainCurve(
+        nominal_strain=raw_data.strain_col,
+        nominal_stress=raw_data.stress_col,
+        young_modulus=raw_data.young_modulus,
+        yield_stress=raw_data.yield_stress,
+        dtype=raw_data.dtype
+    )
+
+
+def warm_up() -> None:
+    """
+    ワーカーの初回フィッティングの準備（プロセスプールの initializer）
+    ・scipy の読み込みと計算カーネルのバックエンド決定（numba のコンパイル・キャッシュ読み込み）を済ませ、
+      最初の硬化則の fit_time_s に含めない
+    """
+    from scipy import optimize  # noqa: F401
+
+    kernels.backend()
+
+
+def fit_specimen(
+        csv_path: str,
+        curve_options: Dict,
+        fit_range: Optional[Tuple[float, float]] = None,
+        max_iterations: int = 1000,
+        laws: Tuple[str, ...] = tuple(LAW_FITTERS),
+        solver: str = "curve_fit",
+        cache_dir: Optional[str] = None,
+) -> List[Dict]:
+    """
+    1試験片分のCSVを読み込み、各硬化則をフィッティングして結果の行を返す
+    ・fit_range を省略した場合は塑性ひずみの全範囲を使用
+    ・フィッティングに失敗した法則は status="error" の行として返す
+    ・同じ曲線・設定の結果はフィットキャッシュ（cache_dir 指定時はディスク共有）から取得
+    """
+    specimen = Path(csv_path).stem
+    try:
+        curve = load_curve(csv_path, **curve_options)
+    except Exception as e:
+        return [{"specimen": specimen, "law": law, "status": "error", "error": f"{e}"} for law in laws]
+
+    if fit_range is None:
+        fit_range = (0.0, float(curve.plastic_strain.max()))
+    settings = FitSettings(fit_range=fit_range, max_iterations=max_iterations, solver=solver)
+
+    fit_cache = get_fit_cache(cache_dir)
+    rows = []
+    for law in laws:
+        row = {"specimen": specimen, "law": law}
+        start_time = time.perf_counter()
+        try:
+            model = fit_cache.get_or_fit(curve, law, settings, LAW_FITTERS[law])
+            row.update(model.to_dict())
+            row["r_squared"] = float(model.calculate_r_squared(curve.plastic_strain, curve.true_stress))
+            row["status"] = "ok"
+        except Exception as e:
+            row["status"] = "error"
+            row["error"] = f"{e}"
+        row["fit_time_s"] = time.perf_counter() - start_time
+        rows.append(row)
+    return rows
+
+
+def fit_directory(
+        directory: str,
+        curve_options: Dict,
+        fit_range: Optional[Tuple[float, float]] = None,
+        max_iterations: int = 1000,
+        laws: Tuple[str, ...] = tuple(LAW_FITTERS),
+        pattern: str = "*.csv",
+        workers: Optional[int] = None,
+        solver: str = "curve_fit",
+        cache_dir: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    ディレクトリ内の全CSVをプロセスプールで並列にフィッティング
+    ・1試験片・1法則ごとに1行の結果テーブルを返す
+    """
+    csv_paths = sorted(str(path) for path in Path(directory).glob(pattern))
+    if not csv_paths:
+        return pd.DataFrame(columns=["specimen", "law", "status"])
+
+    workers = workers or os.cpu_count() or 1
+    rows = []
+    if workers == 1:
+        warm_up()
+        for csv_path in csv_paths:
+            rows.extend(fit_specimen(csv_path, curve_options, fit_range, max_iterations, laws, solver, cache_dir))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(csv_paths)), initializer=warm_up) as executor:
+            futures = [
+                executor.submit(fit_specimen, csv_path, curve_options, fit_range, max_iterations, laws, solver, cache_dir)
+                for csv_path in csv_paths
+            ]
+            # 入力順を保ったまま結果を集約
+            for future in futures:
+                rows.extend(future.result())
+
+    return pd.DataFrame(rows)
@@ -0,0 +1,190 @@
+import numpy as np
+from typing import List, Sequence, Tuple
+
+from ..models.stress_strain_curve import StressStrainCurve
+from ..models.fit_settings import FitSettings
+from .fit_curve import LAW_MODELS, get_fit_data
+from .initializer import initial_guess_for
+
+
+# 1回の一括フィッティングで詰める配列の要素数 (B × L) の上限（float64 の (B, L) 配列1つあたり 32 MB）
+MAX_BATCH_POINTS = 4 * 2 ** 20
+
+
+def split_batches(lengths: Sequence[int], max_points: int = MAX_BATCH_POINTS) -> List[List[int]]:
+    """
+    曲線の点数から、パディング後の要素数 (曲線数 × 最長の点数) が max_points 以下になるようにバッチに分割
+    ・点数の近い曲線が同じバッチになるよう点数順に詰める（パディングの無駄を減らす）
+    ・1本で max_points を超える曲線は単独のバッチにする
+    ・元の並びでの添字のリストを返す
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    for index in np.argsort(np.asarray(lengths, dtype=np.int64), kind="stable"):
+        length = max(int(lengths[index]), 1)
+        if current and (len(current) + 1) * length > max_points:
+            batches.append(current)
+            current = []
+        current.append(int(index))
+    if current:
+        batches.append(current)
+    return batches
+
+
+def pad_curves(
+        x_list: Sequence[np.ndarray],
+        y_list: Sequence[np.ndarray],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    長さの異なる曲線を (B, L) の配列に詰める
+    ・パディング部分は各曲線の最終点で埋め、マスクで重み0とする
+    """
+    lengths = np.array([len(x) for x in x_list])
+    num_curves, max_length = len(x_list), int(lengths.max(initial=1))
+    mask = np.arange(max_length)[None, :] < lengths[:, None]
+
+    x = np.ones((num_curves, max_length))
+    y = np.zeros((num_curves, max_length))
+    for i, (x_row, y_row) in enumerate(zip(x_list, y_list)):
+        if len(x_row) == 0:
+            continue
+        x[i, :len(x_row)] = x_row
+        x[i, len(x_row):] = x_row[-1]
+        y[i, :len(y_row)] = y_row
+    return x, y, mask
+
+
+def solve_batched(
+        law: str,
+        x: np.ndarray,
+        y: np.ndarray,
+        mask: np.ndarray,
+        yield_stress: np.ndarray,
+        initial_guess=None,
+        max_iterations: int = 1000,
+        tolerance: float = 1e-10,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    B本の曲線に対し2パラメータのLevenberg-Marquardt法を一括で実行
+    ・x, y, mask は (B, L)、yield_stress は (B,) の配列
+    ・initial_guess は全曲線共通の (2,) または曲線ごとの (B, 2)
+    ・収束した曲線は以降の反復から除外する
+    ・(パラメータ (B, 2), 収束フラグ (B,), 反復回数 (B,)) を返す
+    """
+    law_class = LAW_MODELS[law]
+    num_curves = x.shape[0]
+    weight = mask.astype(float)
+    sigma0 = np.asarray(yield_stress, dtype=float).reshape(num_curves, 1)
+
+    if initial_guess is None:
+        initial_guess = law_class.default_initial_guess
+    params = np.array(np.broadcast_to(np.asarray(initial_guess, dtype=float), (num_curves, 2)))
+    damping = np.full(num_curves, 1e-3)
+    converged = np.zeros(num_curves, dtype=bool)
+    iterations = np.zeros(num_curves, dtype=int)
+
+    def cost_of(rows, p):
+        with np.errstate(all="ignore"):
+            residual = (y[rows] - law_class.law_function(x[rows], p[:, :1], p[:, 1:], sigma0[rows])) * weight[rows]
+            cost = np.sum(residual ** 2, axis=1)
+        return residual, np.where(np.isfinite(cost), cost, np.inf)
+
+    active = np.arange(num_curves)
+    residual, cost = cost_of(active, params)
+    cost_all = cost.copy()
+
+    for _ in range(max_iterations):
+        if active.size == 0:
+            break
+        p = params[active]
+        with np.errstate(all="ignore"):
+            j1, j2 = law_class.law_jacobian(x[active], p[:, :1], p[:, 1:], sigma0[active])
+            j1 = j1 * weight[active]
+            j2 = j2 * weight[active]
+            # 正規方程式 (J^T J + λ diag(J^T J)) δ = J^T r を2x2の閉形式で解く
+            a11 = np.sum(j1 * j1, axis=1)
+            a12 = np.sum(j1 * j2, axis=1)
+            a22 = np.sum(j2 * j2, axis=1)
+            g1 = np.sum(j1 * residual, axis=1)
+            g2 = np.sum(j2 * residual, axis=1)
+            lam = damping[active]
+            d11 = a11 * (1 + lam)
+            d22 = a22 * (1 + lam)
+            det = d11 * d22 - a12 * a12
+            step = np.stack([(d22 * g1 - a12 * g2) / det, (d11 * g2 - a12 * g1) / det], axis=1)
+        step = np.where(np.isfinite(step), step, 0.0)
+
+        trial = p + step
+        trial_residual, trial_cost = cost_of(active, trial)
+        accepted = trial_cost < cost_all[active]
+        iterations[active] += 1
+
+        # 受理された曲線はパラメータを更新し減衰を弱める、棄却された曲線は減衰を強める
+        params[active[accepted]] = trial[accepted]
+        residual = np.where(accepted[:, None], trial_residual, residual)
+        relative_decrease = (cost_all[active] - trial_cost) / np.maximum(cost_all[active], 1e-300)
+        cost_all[active[accepted]] = trial_cost[accepted]
+        damping[active] = np.where(accepted, lam / 10, np.minimum(lam * 10, 1e16))
+
+        step_size = np.linalg.norm(step, axis=1) / (np.linalg.norm(p, axis=1) + tolerance)
+        done = (accepted & ((relative_decrease < tolerance) | (step_size < tolerance))) | (damping[active] >= 1e16)
+        converged[active[done & (damping[active] < 1e16)]] = True
+        keep = ~done
+        active = active[keep]
+        residual = residual[keep]
+
+    return params, converged, iterations
+
+
+def fit_curves_batched(
+        law: str,
+        curves: Sequence[StressStrainCurve],
+        settings: FitSettings,
+) -> List:
+    """
+    複数の応力ひずみ曲線に同じ硬化則を一括でフィッティング
+    ・fit_ludwik_curve などと同じモデルオブジェクトのリストを返す
+    """
+    models, _ = fit_curve_batch(law, curves, [settings] * len(curves))
+    return models
+
+
+def fit_curve_batch(
+        law: str,
+        curves: Sequence[StressStrainCurve],
+        settings_list: Sequence[FitSettings],
+        max_points: int = MAX_BATCH_POINTS,
+) -> Tuple[List, np.ndarray]:
+    """
+    曲線ごとに異なるフィッティング設定で、同じ硬化則を一括でフィッティング
+    ・反復回数制限は settings_list の最大値を使用
+    ・パディング後の要素数が max_points を超える場合は点数順に分けて解く（split_batches）
+    ・(モデルオブジェクトのリスト, 収束フラグ (B,)) を返す
+    """
+    law_class = LAW_MODELS[law]
+    x_list, y_list = zip(*(get_fit_data(curve, settings) for curve, settings in zip(curves, settings_list)))
+
+    yield_stress = np.array([curve.yield_stress for curve in curves], dtype=float)
+    initial_guess = np.array([
+        settings.initial_guess
+        if law == "ludwik" and settings.initial_guess is not None
+        # 曲線ごとにデータから初期値を推定
+        else initial_guess_for(law_class, x_row, y_row, curve.yield_stress, settings.material)
+        for x_row, y_row, curve, settings in zip(x_list, y_list, curves, settings_list)
+    ], dtype=float)
+    max_iterations = max(settings.max_iterations for settings in settings_list)
+
+    # 点数の大きく異なる曲線を1つの (B, L) 配列に詰めないよう、要素数の上限ごとに分けて解く
+    params = np.empty((len(curves), 2))
+    converged = np.zeros(len(curves), dtype=bool)
+    for index in split_batches([len(x_row) for x_row in x_list], max_points):
+        x, y, mask = pad_curves([x_list[i] for i in index], [y_list[i] for i in index])
+        params[index], converged[index], _ = solve_batched(
+            law, x, y, mask, yield_stress[index], initial_guess[index], max_iterations
+        )
+
+    models = []
+    for curve, p in zip(curves, params):
+        model = law_class(yield_stress=curve.yield_stress, **dict(zip(law_class.param_names, map(float, p))))
+        models.append(model)
+    return models, converged
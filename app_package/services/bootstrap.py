@@ -0,0 +1,231 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Dict, List, Literal, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..models.hardening_law import HardeningLaw
+from .batch_solver import solve_batched
+from .fit_curve import LAW_MODELS
+from .instrumentation import add_count
+
+
+@dataclass(slots=True)
+class BootstrapResult:
+    """
+    1つの硬化則のブートストラップ結果
+    ・samples は再フィッティングしたパラメータ (B, 2)（収束しなかった反復は除外済み）
+    ・residuals は元のフィッティングの残差（予測区間の計算に使用）
+    """
+    law: str
+    yield_stress: float
+    params: Tuple[float, float]
+    samples: np.ndarray
+    residuals: np.ndarray
+    num_replicates: int
+    method: str
+    elapsed: float = 0.0
+
+    @property
+    def param_names(self) -> Tuple[str, str]:
+        return LAW_MODELS[self.law].param_names
+
+    def confidence_intervals(self, confidence: float = 0.95) -> Dict[str, Tuple[float, float]]:
+        """パラメータのパーセンタイル信頼区間"""
+        alpha = (1 - confidence) / 2
+        lower, upper = np.quantile(self.samples, [alpha, 1 - alpha], axis=0)
+        return {name: (float(lo), float(hi)) for name, lo, hi in zip(self.param_names, lower, upper)}
+
+    def standard_errors(self) -> Dict[str, float]:
+        """パラメータのブートストラップ標準誤差"""
+        return {name: float(value) for name, value in zip(self.param_names, np.std(self.samples, axis=0, ddof=1))}
+
+    def bands(self, strain: np.ndarray, confidence: float = 0.95, seed: int = 0) -> pd.DataFrame:
+        """
+        ひずみ strain での応力の信頼区間（曲線そのものの不確かさ）と予測区間（新しい測定値のばらつきを含む）
+        ・予測区間は各反復の曲線に元の残差を再標本化して加えたもののパーセンタイル
+        """
+        law_class = LAW_MODELS[self.law]
+        strain = np.asarray(strain, dtype=float)
+        alpha = (1 - confidence) / 2
+        with np.errstate(all="ignore"):
+            stress = law_class.law_function(strain[None, :], self.samples[:, :1], self.samples[:, 1:], self.yield_stress)
+        rng = np.random.default_rng(seed)
+        noise = self.residuals[rng.integers(0, len(self.residuals), size=stress.shape)] if len(self.residuals) else 0.0
+        lower, upper = np.nanquantile(stress, [alpha, 1 - alpha], axis=0)
+        prediction_lower, prediction_upper = np.nanquantile(stress + noise, [alpha, 1 - alpha], axis=0)
+        return pd.DataFrame({
+            "strain": strain,
+            "lower": lower,
+            "upper": upper,
+            "prediction_lower": prediction_lower,
+            "prediction_upper": prediction_upper,
+        })
+
+
+def _refit_chunk(
+        law: str,
+        x: np.ndarray,
+        y: np.ndarray,
+        fitted: np.ndarray,
+        residuals: np.ndarray,
+        yield_stress: float,
+        params: Tuple[float, float],
+        method: str,
+        seed: np.random.SeedSequence,
+        count: int,
+        max_iterations: int,
+) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    count 個の再標本を作り、一括LMソルバーでまとめて再フィッティング（プロセスプールのワーカーで実行）
+    ・residual: 当てはめ値に残差を復元抽出して加える（x は固定）
+    ・pairs: (x, y) の組を復元抽出する
+    ・元のパラメータから開始するため数回の反復で収束する
+    ・residual の場合は x が全反復で共通なので、元のパラメータでのヤコビアン J を共有した
+      ガウス・ニュートン法の1ステップ (JᵀJ)⁻¹Jᵀr* を行列積でまとめて求め、そこから開始する
+    ・(パラメータ (count, 2), 収束フラグ (count,), 反復回数の合計) を返す
+    """
+    rng = np.random.default_rng(seed)
+    index = rng.integers(0, len(x), size=(count, len(x)))
+    initial_guess = np.broadcast_to(np.asarray(params, dtype=float), (count, 2))
+    if method == "residual":
+        resampled = residuals[index]
+        x_batch = np.broadcast_to(x, index.shape)
+        y_batch = fitted[None, :] + resampled
+        jacobian = LAW_MODELS[law].jacobian(params, x, yield_stress)
+        with np.errstate(all="ignore"):
+            step = np.linalg.solve(jacobian.T @ jacobian, (resampled @ jacobian).T).T
+        if np.all(np.isfinite(step)):
+            initial_guess = initial_guess + step
+    else:
+        x_batch, y_batch = x[index], y[index]
+    mask = np.ones(index.shape, dtype=bool)
+    samples, converged, iterations = solve_batched(
+        law, x_batch, y_batch, mask, np.full(count, yield_stress), initial_guess, max_iterations
+    )
+    return samples, converged, int(iterations.sum())
+
+
+# 全セッションで共有するプロセスプール（スレッドのロックを引き継がないよう spawn で起動）
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """ブートストラップ用のプロセスプールを取得（最初の呼び出し時に起動し、以降は再利用）"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count() or 1, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _process_pool
+
+
+def _reset_process_pool(pool: ProcessPoolExecutor) -> None:
+    """壊れたプールを破棄（次の呼び出しで作り直す）"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is pool:
+            _process_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def bootstrap_law(
+        law_model: HardeningLaw,
+        x: np.ndarray,
+        y: np.ndarray,
+        num_replicates: int = 2000,
+        method: Literal["residual", "pairs"] = "residual",
+        chunk_size: int = 250,
+        workers: Optional[int] = None,
+        seed: int = 0,
+        max_iterations: int = 100,
+) -> BootstrapResult:
+    """
+    フィッティング済みの硬化則のパラメータをブートストラップ法で再推定
+    ・反復を chunk_size 個ずつの塊に分け、塊ごとに一括LMソルバーで再フィッティング
+    ・塊は共有のプロセスプールで並列に処理する（workers=1 の場合は同じプロセスで順に処理）
+    ・乱数は seed から塊ごとに分岐させるため、workers の数によらず同じ結果になる
+    ・収束した反復が2回未満の場合は ValueError
+    """
+    start_time = time.perf_counter()
+    law = next(name for name, law_class in LAW_MODELS.items() if isinstance(law_model, law_class))
+    x = np.ascontiguousarray(x, dtype=np.float64)
+    y = np.ascontiguousarray(y, dtype=np.float64)
+    with np.errstate(all="ignore"):
+        fitted = law_model.get_stress(x)
+    residuals = y - fitted
+    residuals = residuals - np.mean(residuals)
+
+    counts = [min(chunk_size, num_replicates - start) for start in range(0, num_replicates, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(counts))
+    jobs = [
+        (law, x, y, fitted, residuals, law_model.yield_stress, law_model.params, method, chunk_seed, count, max_iterations)
+        for chunk_seed, count in zip(seeds, counts)
+    ]
+
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers <= 1:
+        results = [_refit_chunk(*job) for job in jobs]
+    else:
+        pool = get_process_pool()
+        try:
+            # 入力順を保ったまま結果を集約
+            results = list(pool.map(_refit_chunk, *zip(*jobs)))
+        except BrokenProcessPool:
+            _reset_process_pool(pool)
+            raise
+
+    samples = np.concatenate([chunk for chunk, _, _ in results])
+    converged = np.concatenate([flags for _, flags, _ in results])
+    add_count("bootstrap_iterations", sum(iterations for _, _, iterations in results))
+    samples = samples[converged & np.all(np.isfinite(samples), axis=1)]
+    if len(samples) < 2:
+        raise ValueError(f"{law}: 収束した反復が{len(samples)}回しかないため、信頼区間を計算できません")
+    return BootstrapResult(
+        law=law,
+        yield_stress=law_model.yield_stress,
+        params=law_model.params,
+        samples=samples,
+        residuals=residuals,
+        num_replicates=num_replicates,
+        method=method,
+        elapsed=time.perf_counter() - start_time,
+    )
+
+
+def bootstrap_laws(
+        laws: Dict[str, HardeningLaw],
+        x: np.ndarray,
+        y: np.ndarray,
+        **kwargs,
+) -> Dict[str, BootstrapResult]:
+    """複数の硬化則をまとめてブートストラップ（引数は bootstrap_law と同じ）"""
+    return {name: bootstrap_law(law_model, x, y, **kwargs) for name, law_model in laws.items()}
+
+
+def summary_rows(results: Dict[str, BootstrapResult], confidence: float = 0.95) -> List[Dict]:
+    """硬化則・パラメータごとの推定値・標準誤差・信頼区間の表"""
+    rows = []
+    for name, result in results.items():
+        intervals = result.confidence_intervals(confidence)
+        errors = result.standard_errors()
+        for param_name, value in zip(result.param_names, result.params):
+            rows.append({
+                "law": name,
+                "param": param_name,
+                "estimate": value,
+                "std_error": errors[param_name],
+                "lower": intervals[param_name][0],
+                "upper": intervals[param_name][1],
+                "converged": len(result.samples),
+                "replicates": result.num_replicates,
+            })
+    return rows
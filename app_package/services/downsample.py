@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+from typing import Literal
+
+from ..models.stress_strain_curve import StressStrainCurve
+
+
+def pixel_budget(width_inches: float = 10.0, dpi: float = 100.0, points_per_pixel: float = 2.0) -> int:
+    """描画幅から間引き後の点数を決める"""
+    return max(int(width_inches * dpi * points_per_pixel), 3)
+
+
+# グラフ描画用の点数（幅10インチ × 100dpi の1ピクセルあたり2点）
+DISPLAY_POINTS = pixel_budget()
+
+
+def _bucket_edges(n: int, n_out: int) -> np.ndarray:
+    """先頭・末尾を除く n-2 点を n_out-2 個のバケットに分ける境界"""
+    return np.linspace(1, n - 1, n_out - 1).astype(int)
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets による間引き
+    ・各バケットから、前の選択点と次バケットの平均点で作る三角形の面積が最大の点を選ぶ
+    ・曲線の形状（降伏の折れ曲がりなど）を保ったまま n_out 点のインデックスを返す
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = _bucket_edges(n, n_out)
+    # 各バケットの平均点（次バケットの代表点として使う）を累積和で一括計算
+    cum_x = np.concatenate([[0.0], np.cumsum(x)])
+    cum_y = np.concatenate([[0.0], np.cumsum(y)])
+    starts, ends = edges[:-1], edges[1:]
+    counts = np.maximum(ends - starts, 1)
+    mean_x = (cum_x[ends] - cum_x[starts]) / counts
+    mean_y = (cum_y[ends] - cum_y[starts]) / counts
+    mean_x = np.append(mean_x[1:], x[-1])
+    mean_y = np.append(mean_y[1:], y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for i, (start, end) in enumerate(zip(starts, ends)):
+        if end <= start:
+            selected[i + 1] = start
+            previous = start
+            continue
+        bx, by = x[start:end], y[start:end]
+        area = np.abs((x[previous] - mean_x[i]) * (by - y[previous]) - (x[previous] - bx) * (mean_y[i] - y[previous]))
+        previous = start + int(np.argmax(area))
+        selected[i + 1] = previous
+    return selected
+
+
+def minmax(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    最小・最大による間引き
+    ・各バケットの y の最小点と最大点を残す（ピークを必ず保持）
+    """
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+
+    edges = _bucket_edges(n, max(n_out // 2, 3))
+    starts = edges[:-1]
+    # バケットごとの argmin / argmax を reduceat で一括計算
+    bucket_min = np.minimum.reduceat(y[1:-1], starts - 1)
+    bucket_max = np.maximum.reduceat(y[1:-1], starts - 1)
+    bucket_id = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, n - 1)))
+    inner = np.arange(1, n - 1)
+    is_min = y[1:-1] == bucket_min[bucket_id]
+    is_max = y[1:-1] == bucket_max[bucket_id]
+    first_min = inner[is_min][np.unique(bucket_id[is_min], return_index=True)[1]]
+    first_max = inner[is_max][np.unique(bucket_id[is_max], return_index=True)[1]]
+    return np.unique(np.concatenate([[0, n - 1], first_min, first_max]))
+
+
+def decimate(
+        x: np.ndarray,
+        y: np.ndarray,
+        n_out: int = DISPLAY_POINTS,
+        method: Literal["lttb", "minmax"] = "lttb",
+) -> np.ndarray:
+    """
+    描画用に間引いた点のインデックスを返す
+    ・どちらの方法でも y の最大点（引張強さ）は必ず含める
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if len(x) <= n_out:
+        return np.arange(len(x))
+    indices = lttb(x, y, n_out) if method == "lttb" else minmax(x, y, n_out)
+    return np.union1d(indices, [int(np.argmax(y))])
+
+
+def get_display_data(
+        curve: StressStrainCurve,
+        kind: Literal["nominal", "true", "plastic"],
+        max_points: int = DISPLAY_POINTS,
+        method: Literal["lttb", "minmax"] = "lttb",
+) -> pd.DataFrame:
+    """
+    描画用に間引いた曲線データを取得
+    ・get_nominal_data / get_true_data / get_plastic_data と同じ列構成
+    ・曲線ごとに一度だけ計算してキャッシュ（フィッティング・エクスポートは元データを使用）
+    """
+    def compute():
+        df = getattr(curve, f"get_{kind}_data")()
+        indices = decimate(df.iloc[:, 0].to_numpy(), df.iloc[:, 1].to_numpy(), max_points, method)
+        return df.iloc[indices].reset_index(drop=True)
+
+    return curve.cached(f"display_{kind}_{max_points}_{method}", compute)
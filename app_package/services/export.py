@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Tuple
+
+from ..models.hardening_law import HardeningLaw, build_strain_grid
+from .adaptive_sampling import adaptive_sample
+
+
+def evaluate_laws(laws: Dict[str, HardeningLaw], strain: np.ndarray) -> pd.DataFrame:
+    """
+    共通のひずみ格子で全硬化則の応力を計算
+    ・列は strain と硬化則名（ludwik, swift, voce, …）
+    """
+    strain = np.asarray(strain, dtype=float)
+    columns = {"strain": strain}
+    for name, law_model in laws.items():
+        columns[name] = law_model.get_stress(strain)
+    return pd.DataFrame(columns, copy=False)
+
+
+def build_export_frame(
+        laws: Dict[str, HardeningLaw],
+        strain_range: Tuple[float, float],
+        num_points: int = 100,
+        detail_range: Tuple[float, float] = (0.0, 0.05),
+        detail_points: int = 50,
+) -> pd.DataFrame:
+    """均等格子（詳細範囲つき）を一度だけ作り、全硬化則を評価した横長のデータフレームを返す"""
+    strain = build_strain_grid(strain_range, num_points, detail_range, detail_points)
+    return evaluate_laws(laws, strain)
+
+
+def build_adaptive_export_frame(
+        laws: Dict[str, HardeningLaw],
+        strain_range: Tuple[float, float],
+        tolerance: float = 1.0,
+) -> pd.DataFrame:
+    """
+    全硬化則を応力誤差 tolerance[MPa] 以内で再現する共通の点列で評価した横長のデータフレームを返す
+    ・各区間の誤差は全硬化則の最大値で判定する
+    """
+    names = list(laws)
+
+    def stresses(strain):
+        return np.column_stack([laws[name].get_stress(strain) for name in names])
+
+    strain, stress = adaptive_sample(stresses, strain_range[0], strain_range[1], tolerance)
+    columns = {"strain": strain}
+    columns.update({name: stress[:, i] for i, name in enumerate(names)})
+    return pd.DataFrame(columns, copy=False)
+
+
+def law_frame(export_df: pd.DataFrame, law: str) -> pd.DataFrame:
+    """横長のデータフレームから1つの硬化則の (strain, stress) を取り出す"""
+    return pd.DataFrame({"strain": export_df["strain"], "stress": export_df[law]})
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from ..models.stress_strain_curve import StressStrainCurve
+from ..models.fit_settings import FitSettings
+from ..models.hardening_law import HardeningLaw
+from .cache import LRUCache
+from .fit_curve import LAW_MODELS
+from .initializer import warm_starts
+from .instrumentation import add_count
+
+
+# ディスクキャッシュの保存先を指定する環境変数
+CACHE_DIR_ENV = "FITCURVE_CACHE_DIR"
+
+
+class FitCache:
+    """
+    フィッティング結果のキャッシュ
+    ・キーは曲線データのハッシュ、硬化則名、FitSettings の各フィールドから作る
+    ・メモリ上のLRU層と、任意でセッション・CLI間で共有するディスク層(JSON)を持つ
+    ・材料ごとのウォームスタート（初期値）はキーに含めない（初期値が変わっても収束先は同じとみなす）
+    """
+
+    def __init__(self, max_entries: int = 256, cache_dir: Optional[str] = None):
+        self.memory = LRUCache(max_entries=max_entries)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.disk_hits = 0
+        self.misses = 0
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(curve: StressStrainCurve, law: str, settings: FitSettings) -> str:
+        """キャッシュキーを作成"""
+        digest = hashlib.sha256()
+        digest.update(curve.content_hash().encode())
+        digest.update(law.encode())
+        # 制限時間は結果に影響しないためキーに含めない
+        digest.update(settings.model_dump_json(exclude={"timeout"}).encode())
+        return digest.hexdigest()
+
+    def get(self, curve: StressStrainCurve, law: str, settings: FitSettings) -> Optional[HardeningLaw]:
+        """キャッシュ済みのフィッティング結果を取得（なければ None）"""
+        key = self.make_key(curve, law, settings)
+        params = self.memory.get(key)
+        if params is None and self.cache_dir is not None:
+            params = self._read_disk(key)
+            if params is not None:
+                self.disk_hits += 1
+                self.memory.put(key, params)
+        if params is None:
+            self.misses += 1
+            return None
+        return LAW_MODELS[law](**params)
+
+    def put(self, curve: StressStrainCurve, law: str, settings: FitSettings, law_model: HardeningLaw) -> None:
+        """フィッティング結果を保存"""
+        key = self.make_key(curve, law, settings)
+        params = law_model.to_dict()
+        self.memory.put(key, params)
+        if self.cache_dir is not None:
+            self._write_disk(key, params)
+
+    def get_or_fit(
+            self,
+            curve: StressStrainCurve,
+            law: str,
+            settings: FitSettings,
+            fit: Callable[[StressStrainCurve, FitSettings], HardeningLaw],
+    ) -> HardeningLaw:
+        """
+        キャッシュにあればそれを返し、なければフィッティングして保存
+        ・キャッシュから返した結果も、フィッティングした場合と同様に材料のウォームスタートに登録する
+        """
+        law_model = self.get(curve, law, settings)
+        if law_model is None:
+            law_model = fit(curve, settings)
+            self.put(curve, law, settings, law_model)
+        else:
+            add_count("fit_cache_hits")
+            if settings.material:
+                warm_starts.put(settings.material, law_model)
+        return law_model
+
+    def stats(self) -> Dict[str, int]:
+        """ヒット・ミス回数"""
+        return {
+            "memory_hits": self.memory.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "entries": len(self.memory),
+        }
+
+    def clear(self) -> None:
+        """メモリ層を破棄（ディスク層は残す）"""
+        self.memory.clear()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _read_disk(self, key: str) -> Optional[Dict]:
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key: str, params: Dict) -> None:
+        # 他プロセスが途中のファイルを読まないよう一時ファイル経由で置き換える
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(params, f)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            pass
+
+
+_fit_caches: Dict[Optional[str], FitCache] = {}
+_fit_caches_lock = threading.Lock()
+
+
+def get_fit_cache(cache_dir: Optional[str] = None) -> FitCache:
+    """
+    プロセス内で共有するフィットキャッシュを取得
+    ・cache_dir を省略した場合は環境変数 FITCURVE_CACHE_DIR を使用（未設定ならメモリのみ）
+    """
+    cache_dir = cache_dir or os.environ.get(CACHE_DIR_ENV) or None
+    with _fit_caches_lock:
+        if cache_dir not in _fit_caches:
+            _fit_caches[cache_dir] = FitCache(cache_dir=cache_dir)
+        return _fit_caches[cache_dir]
@@ -1,64 +1,97 @@
 import numpy as np
-from scipy import optimize
+from typing import Callable, Dict, Optional, Tuple, Type
 from ..models.raw_data import RawData
 from ..models.stress_strain_curve import StressStrainCurve
 from ..models.fit_settings import FitSettings
+from ..models.hardening_law import HardeningLaw
 from ..models.ludwik_law import LudwikLaw
 from ..models.swift_law import SwiftLaw
 from ..models.voce_law import VoceLaw
+from .varpro import fit_varpro
+from .initializer import initial_guess_for, warm_starts
+from .instrumentation import add_count
+
+
+# 法則名と硬化則モデルクラスの対応
+LAW_MODELS: Dict[str, Type[HardeningLaw]] = {
+    "ludwik": LudwikLaw,
+    "swift": SwiftLaw,
+    "voce": VoceLaw,
+}
+
+
+def get_fit_data(
+        base_curve: StressStrainCurve,
+        settings: FitSettings,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """フィット範囲で真ひずみ・真応力データをフィルタリング"""
+    start, end = settings.fit_range
+    true_strain = base_curve.true_strain
+    mask = (true_strain > start) & (true_strain <= end)
+    return true_strain[mask], base_curve.true_stress[mask]
+
+
+def fit_law_curve(
+        law_class: Type[HardeningLaw],
+        base_curve: StressStrainCurve,
+        settings: FitSettings,
+        initial_guess: Optional[Tuple[float, float]] = None,
+        deadline: Optional[float] = None,
+) -> HardeningLaw:
+    """
+    応力ひずみ曲線に指定した硬化則をフィッティング
+    ・settings.solver が "varpro" かつ分離形の硬化則の場合は変数射影法を使用
+    ・initial_guess を省略した場合は材料ごとの前回結果またはデータからの推定値を使用
+    ・deadline（time.monotonic() 基準）を過ぎると FitTimeoutError で中断
+    """
+    x_data, y_data = get_fit_data(base_curve, settings)
+
+    law_model = law_class(yield_stress=base_curve.yield_stress, **{name: 0.0 for name in law_class.param_names})
+    if settings.solver == "varpro" and law_class.varpro_bounds is not None:
+        law_model.set_params(fit_varpro(
+            law_class, x_data, y_data, base_curve.yield_stress, settings.max_iterations, deadline=deadline
+        ))
+    else:
+        if initial_guess is None:
+            initial_guess = initial_guess_for(law_class, x_data, y_data, base_curve.yield_stress, settings.material)
+        law_model.fit_to_data(x_data, y_data, initial_guess, settings.max_iterations, deadline)
+        add_count("nfev", law_model.nfev)
+
+    if settings.material:
+        warm_starts.put(settings.material, law_model)
+    return law_model
 
 
 def fit_ludwik_curve(
         base_curve: StressStrainCurve,
         settings: FitSettings,
+        deadline: Optional[float] = None,
 ) -> LudwikLaw:
     """応力ひずみ曲線にLudwik則をフィッティング"""
-    # 範囲でデータをフィルタリング
-    start, end = settings.fit_range
-    mask = (base_curve.true_strain > start) & (base_curve.true_strain <= end)
-    
-    x_data = base_curve.true_strain[mask]
-    y_data = base_curve.true_stress[mask]
-    
-    # LudwikLawのフィッティングメソッドを使用
-    ludwik_law_model = LudwikLaw(yield_stress=base_curve.yield_stress, k=0.0, n=0.0)
-    ludwik_law_model.fit_to_data(x_data, y_data, settings.initial_guess, settings.max_iterations)
-    
-    return ludwik_law_model
+    return fit_law_curve(LudwikLaw, base_curve, settings, settings.initial_guess, deadline=deadline)
 
 
 def fit_swift_curve(
         base_curve: StressStrainCurve,
         settings: FitSettings,
+        deadline: Optional[float] = None,
 ) -> SwiftLaw:
     """応力ひずみ曲線にSwift則をフィッティング"""
-    start, end = settings.fit_range
-    mask = (base_curve.true_strain > start) & (base_curve.true_strain <= end)
-    
-    x_data = base_curve.true_strain[mask]
-    y_data = base_curve.true_stress[mask]
-    
-    # SwiftLawのフィッティングメソッドを使用
-    swift_law_model = SwiftLaw(yield_stress=base_curve.yield_stress, alpha=0.0, n=0.0)
-    # swift_law_model = SwiftLaw(c=0.0, alpha=0.0, n=0.0)
-    swift_law_model.fit_to_data(x_data, y_data)
-    
-    return swift_law_model
+    return fit_law_curve(SwiftLaw, base_curve, settings, deadline=deadline)
 
 
 def fit_voce_curve(
         base_curve: StressStrainCurve,
         settings: FitSettings,
+        deadline: Optional[float] = None,
 ) -> VoceLaw:
     """応力ひずみ曲線にVoce則をフィッティング"""
-    start, end = settings.fit_range
-    mask = (base_curve.true_strain > start) & (base_curve.true_strain <= end)
-    
-    x_data = base_curve.true_strain[mask]
-    y_data = base_curve.true_stress[mask]
-    
-    # VoceLawのフィッティングメソッドを使用
-    voce_law_model = VoceLaw(yield_stress=base_curve.yield_stress, stress_infinite=0.0, h=0.0)
-    voce_law_model.fit_to_data(x_data, y_data)
-    
-    return voce_law_model
+    return fit_law_curve(VoceLaw, base_curve, settings, deadline=deadline)
+
+
+# 法則名とフィッティング関数の対応
+LAW_FITTERS: Dict[str, Callable[..., HardeningLaw]] = {
+    "ludwik": fit_ludwik_curve,
+    "swift": fit_swift_curve,
+    "voce": fit_voce_curve,
+}
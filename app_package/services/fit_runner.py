@@ -0,0 +1,98 @@
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pydantic import BaseModel, ConfigDict
+from typing import Callable, Dict, Iterator, Literal, Optional
+
+from ..models.stress_strain_curve import StressStrainCurve
+from ..models.fit_settings import FitSettings
+from ..models.hardening_law import FitTimeoutError, HardeningLaw
+from .fit_curve import LAW_FITTERS
+from .fit_cache import FitCache
+from .instrumentation import log_exception, stage, submit_in_context
+
+
+class FitOutcome(BaseModel):
+    """1つの硬化則のフィッティング結果"""
+    law: str
+    status: Literal["ok", "timeout", "error"]
+    model: Optional[HardeningLaw] = None
+    error: Optional[str] = None
+    elapsed: float = 0.0
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+
+# 全セッションで共有するフィッティング用ワーカープール
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor(max_workers: int = 8) -> ThreadPoolExecutor:
+    """フィッティング用のワーカープールを取得"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fit")
+        return _executor
+
+
+def _run_fit(
+        law: str,
+        fitter: Callable[..., HardeningLaw],
+        curve: StressStrainCurve,
+        settings: FitSettings,
+        deadline: float,
+        cache: Optional[FitCache],
+) -> FitOutcome:
+    """ワーカー上で1つの硬化則をフィッティング"""
+    start_time = time.perf_counter()
+
+    def fit(curve, settings):
+        return fitter(curve, settings, deadline=deadline)
+
+    with stage(f"fit.{law}") as record:
+        try:
+            model = cache.get_or_fit(curve, law, settings, fit) if cache is not None else fit(curve, settings)
+            return FitOutcome(law=law, status="ok", model=model, elapsed=time.perf_counter() - start_time)
+        except FitTimeoutError as e:
+            record.status = "timeout"
+            return FitOutcome(law=law, status="timeout", error=f"{e}", elapsed=time.perf_counter() - start_time)
+        except Exception as e:
+            record.status = "error"
+            log_exception(f"{law} のフィッティングに失敗しました", e, law=law)
+            return FitOutcome(law=law, status="error", error=f"{e}", elapsed=time.perf_counter() - start_time)
+
+
+def fit_laws_concurrently(
+        curve: StressStrainCurve,
+        settings: FitSettings,
+        fitters: Dict[str, Callable[..., HardeningLaw]] = LAW_FITTERS,
+        cache: Optional[FitCache] = None,
+        grace: float = 1.0,
+) -> Iterator[FitOutcome]:
+    """
+    各硬化則のフィッティングをワーカープールで並行に実行し、終わった順に結果を返す
+    ・各フィッティングは settings.timeout 秒を過ぎると評価の途中で中断され status="timeout" になる
+    ・中断に応じないまま猶予 grace 秒を過ぎた場合も status="timeout" として打ち切る
+    """
+    executor = get_executor()
+    deadline = time.monotonic() + settings.timeout
+    futures: Dict[Future, str] = {
+        submit_in_context(executor, _run_fit, law, fitter, curve, settings, deadline, cache): law
+        for law, fitter in fitters.items()
+    }
+
+    pending = set(futures)
+    while pending:
+        remaining = deadline + grace - time.monotonic()
+        done, pending = wait(pending, timeout=max(remaining, 0.0), return_when=FIRST_COMPLETED)
+        for future in done:
+            yield future.result()
+        if not done:
+            break
+
+    # 制限時間を過ぎても終わらなかったフィッティングは打ち切る
+    for future in pending:
+        future.cancel()
+        yield FitOutcome(law=futures[future], status="timeout", error="制限時間を超過しました", elapsed=settings.timeout)
@@ -0,0 +1,156 @@
+from dataclasses import dataclass
+from typing import List, Tuple
+
+import numpy as np
+
+from ..models.stress_strain_curve import StressStrainCurve
+from ..models.ludwik_law import LudwikLaw
+from .batch_solver import pad_curves, solve_batched
+from .live_fit import FitWindowData
+
+
+@dataclass(slots=True)
+class WindowCandidate:
+    """フィット範囲の候補"""
+    fit_range: Tuple[float, float]
+    # 両対数線形回帰の決定係数（探索時のスコア）
+    linear_r_squared: float
+    # 非線形フィッティング後の応力空間での決定係数
+    r_squared: float
+    params: Tuple[float, float]
+    num_points: int
+
+
+@dataclass(slots=True)
+class WindowSearchResult:
+    """
+    フィット範囲の自動探索の結果
+    ・starts / ends は候補の開始・終了ひずみ、quality[i, j] は範囲 (starts[i], ends[j]) の線形回帰の決定係数
+      （条件を満たさない範囲は NaN）
+    """
+    best: WindowCandidate
+    candidates: List[WindowCandidate]
+    starts: np.ndarray
+    ends: np.ndarray
+    quality: np.ndarray
+    num_windows: int
+
+
+class _PrefixSums:
+    """
+    Ludwik則の線形化 log(σ - σ0) = log(k) + n * log(ε) の (u, v) = (log ε, log(σ - σ0)) の累積和
+    ・桁落ちを避けるため全体の平均を引いてから累積する
+    ・任意の範囲 [i, j) の回帰の統計量を O(1) で求める
+    """
+
+    def __init__(self, u: np.ndarray, v: np.ndarray):
+        self.u_mean, self.v_mean = float(np.mean(u)), float(np.mean(v))
+        u, v = u - self.u_mean, v - self.v_mean
+        zero = np.zeros(1)
+        self.count = np.arange(len(u) + 1, dtype=float)
+        self.u = np.concatenate([zero, np.cumsum(u)])
+        self.v = np.concatenate([zero, np.cumsum(v)])
+        self.uu = np.concatenate([zero, np.cumsum(u * u)])
+        self.vv = np.concatenate([zero, np.cumsum(v * v)])
+        self.uv = np.concatenate([zero, np.cumsum(u * v)])
+
+    def regression(self, i: np.ndarray, j: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """範囲 [i, j)（ブロードキャスト可能な添字配列）の (傾き, 切片, 決定係数)"""
+        n = self.count[j] - self.count[i]
+        su, sv = self.u[j] - self.u[i], self.v[j] - self.v[i]
+        with np.errstate(all="ignore"):
+            sxx = self.uu[j] - self.uu[i] - su * su / n
+            syy = self.vv[j] - self.vv[i] - sv * sv / n
+            sxy = self.uv[j] - self.uv[i] - su * sv / n
+            slope = sxy / sxx
+            intercept = (sv - slope * su) / n + self.v_mean - slope * self.u_mean
+            r_squared = sxy * sxy / (sxx * syy)
+        return slope, intercept, r_squared
+
+
+def search_fit_window(
+        curve: StressStrainCurve,
+        min_span: float = 0.3,
+        min_points: int = 20,
+        max_candidates: int = 128,
+        top_k: int = 8,
+        max_iterations: int = 200,
+) -> WindowSearchResult:
+    """
+    Ludwik則のフィット範囲を自動で探索
+    ・降伏後のデータを両対数で線形化し、累積和から全ての候補範囲の回帰の決定係数を一括で計算
+      （範囲の境界は最大 max_candidates 個の候補点、幅は塑性域のひずみ幅の min_span 倍以上）
+    ・決定係数の上位 top_k 個の（互いに離れた）範囲を、線形回帰の結果を初期値とした一括LMソルバーで非線形フィッティングし、
+      応力空間の決定係数が最大の範囲を採用する
+    """
+    data = FitWindowData.from_curve(curve)
+    yield_stress = curve.yield_stress
+    valid = (data.x > 0) & (data.y > yield_stress)
+    x, y = data.x[valid], data.y[valid]
+    if len(x) < max(min_points, 2):
+        raise ValueError("降伏応力を超えるデータ点が少なすぎるため、フィット範囲を探索できません")
+
+    sums = _PrefixSums(np.log(x), np.log(y - yield_stress))
+
+    # 範囲の境界の候補（データ点の添字、終了側は排他的）
+    boundaries = np.unique(np.linspace(0, len(x), min(max_candidates, len(x)) + 1).round().astype(int))
+    start_index, end_index = boundaries[:-1], boundaries[1:]
+    i, j = start_index[:, None], end_index[None, :]
+    slope, _, quality = sums.regression(i, j)
+    span = x[end_index - 1][None, :] - x[start_index][:, None]
+    allowed = (j - i >= min_points) & (span >= min_span * (x[-1] - x[0])) & (slope > 0) & np.isfinite(quality)
+    quality = np.where(allowed, quality, np.nan)
+    if not np.any(allowed):
+        raise ValueError("条件を満たすフィット範囲の候補がありません（最小の範囲幅を小さくしてください）")
+
+    # 上位の範囲を、境界が近いものを除きながら選ぶ
+    order = np.argsort(np.where(allowed, -quality, np.inf), axis=None)[:int(np.count_nonzero(allowed))]
+    chosen: List[Tuple[int, int]] = []
+    for flat in order:
+        row, col = np.unravel_index(flat, quality.shape)
+        if all(abs(row - r) + abs(col - c) > 2 for r, c in chosen):
+            chosen.append((int(row), int(col)))
+        if len(chosen) >= top_k:
+            break
+
+    # 非線形フィッティングで絞り込む（範囲内の全データ点を get_fit_data と同じ条件で使用）
+    fit_ranges = [(_start_of(x, start_index[r]), float(x[end_index[c] - 1])) for r, c in chosen]
+    bounds = [data.bounds(fit_range) for fit_range in fit_ranges]
+    x_list = [data.x[lo:hi] for lo, hi in bounds]
+    y_list = [data.y[lo:hi] for lo, hi in bounds]
+    slopes, intercepts, _ = sums.regression(start_index[[r for r, _ in chosen]], end_index[[c for _, c in chosen]])
+    initial_guess = np.column_stack([np.exp(intercepts), slopes])
+    x_batch, y_batch, mask = pad_curves(x_list, y_list)
+    params, _, _ = solve_batched(
+        "ludwik", x_batch, y_batch, mask, np.full(len(chosen), yield_stress), initial_guess, max_iterations
+    )
+
+    candidates = []
+    for (r, c), fit_range, (lo, hi), p, x_row, y_row in zip(chosen, fit_ranges, bounds, params, x_list, y_list):
+        with np.errstate(all="ignore"):
+            residual = y_row - LudwikLaw.law_function(x_row, p[0], p[1], yield_stress)
+            ss_res = float(np.sum(residual * residual))
+        ss_tot = data.total_sum_of_squares(lo, hi)
+        r_squared = 1 - ss_res / ss_tot if ss_tot > 0 and np.isfinite(ss_res) else float("nan")
+        candidates.append(WindowCandidate(
+            fit_range=fit_range,
+            linear_r_squared=float(quality[r, c]),
+            r_squared=r_squared,
+            params=(float(p[0]), float(p[1])),
+            num_points=hi - lo,
+        ))
+
+    best = max(candidates, key=lambda candidate: np.nan_to_num(candidate.r_squared, nan=-np.inf))
+    return WindowSearchResult(
+        best=best,
+        candidates=candidates,
+        starts=np.array([_start_of(x, index) for index in start_index]),
+        ends=x[end_index - 1],
+        quality=quality,
+        num_windows=int(np.count_nonzero(allowed)),
+    )
+
+
+def _start_of(x: np.ndarray, index: int) -> float:
+    """データ点 x[index] を含む範囲の開始ひずみ（フィット範囲は start < ε なので直前の値）"""
+    return float(np.nextafter(x[index], -np.inf))
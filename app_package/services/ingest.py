@@ -0,0 +1,216 @@
+import hashlib
+import io
+import os
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from ..models.column_store import ColumnStore
+from ..models.raw_data import RawData
+from .cache import LRUCache
+from .instrumentation import log_event
+from .session_store import IDLE_TIMEOUT_ENV
+
+
+# この大きさ以上のファイルは全列を読み込まず、選択列のみをチャンク単位で読み込む
+LARGE_FILE_BYTES = 20 * 1024 * 1024
+# 大きなファイルのプレビュー行数
+PREVIEW_ROWS = 100
+
+# 列キャッシュの保存先の上限（環境変数で上書き可能）
+DATA_DIR_BUDGET_ENV = "FITCURVE_DATA_DIR_MAX_MB"
+DATA_MAX_AGE_ENV = "FITCURVE_DATA_MAX_AGE_S"
+DATA_DIR_BUDGET_BYTES = 2 * 1024 * 1024 * 1024
+DATA_MAX_AGE_S = 24 * 3600.0
+
+# 読み込み済みデータフレームの共有キャッシュ（セッション間で共有）
+_frame_cache = LRUCache(
+    max_entries=8,
+    max_bytes=512 * 1024 * 1024,
+    sizeof=lambda df: int(df.memory_usage(deep=True).sum()),
+)
+
+
+def _read_bytes(uploaded_file: Any) -> bytes:
+    """アップロードファイル（またはファイルパス）の内容を取得"""
+    if isinstance(uploaded_file, bytes):
+        return uploaded_file
+    if isinstance(uploaded_file, (str, os.PathLike)):
+        with open(uploaded_file, "rb") as f:
+            return f.read()
+    if hasattr(uploaded_file, "getvalue"):
+        return uploaded_file.getvalue()
+    uploaded_file.seek(0)
+    return uploaded_file.read()
+
+
+def _buffer(uploaded_file: Any):
+    """アップロードファイルの内容をコピーせずに参照（できなければ読み込む）"""
+    if hasattr(uploaded_file, "getbuffer"):
+        return uploaded_file.getbuffer()
+    return _read_bytes(uploaded_file)
+
+
+def upload_id(uploaded_file: Any) -> Optional[str]:
+    """
+    アップロードを識別するID
+    ・Streamlit の UploadedFile は file_id を持つので内容を読まずに判定できる
+    ・file_id がなければ None（内容のハッシュで判定する）
+    """
+    return getattr(uploaded_file, "file_id", None)
+
+
+def content_hash(data: bytes) -> str:
+    """ファイル内容のハッシュ値"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _file_hash(path: str, block_size: int = 8 * 1024 * 1024) -> str:
+    """ファイル内容のハッシュ値（ブロック単位で読み込む）"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_csv_cached(uploaded_file: Any) -> Tuple[str, pd.DataFrame]:
+    """
+    CSVを読み込む（同じ内容のファイルは一度だけパース）
+    ・(内容のハッシュ値, データフレーム) を返す
+    ・返すデータフレームはキャッシュと共有されるため変更しないこと
+    """
+    data = _read_bytes(uploaded_file)
+    key = content_hash(data)
+    df = _frame_cache.get(key)
+    if df is None:
+        df = pd.read_csv(io.BytesIO(data))
+        _frame_cache.put(key, df)
+    return key, df
+
+
+def _open_column_store(uploaded_file: Any) -> ColumnStore:
+    """
+    大きなファイルの列キャッシュを用意
+    ・アップロードの場合は内容を一度だけ cache_dir に書き出してストリーミング読み込みの元にする
+    """
+    cache_dir = ColumnStore.default_cache_dir()
+    os.makedirs(cache_dir, exist_ok=True)
+    if isinstance(uploaded_file, (str, os.PathLike)):
+        source_path = os.fspath(uploaded_file)
+        digest = _file_hash(source_path)
+    else:
+        buffer = _buffer(uploaded_file)
+        digest = content_hash(buffer)
+        source_path = os.path.join(cache_dir, f"{digest}.csv")
+        if not os.path.exists(source_path):
+            tmp_path = f"{source_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(buffer)
+            os.replace(tmp_path, source_path)
+        else:
+            os.utime(source_path)
+        prune_column_cache(cache_dir, keep_digest=digest)
+    return ColumnStore(source_path=source_path, digest=digest, cache_dir=cache_dir)
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    return float(value) if value else default
+
+
+def prune_column_cache(
+        cache_dir: str,
+        keep_digest: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        max_age: Optional[float] = None,
+        min_age: Optional[float] = None,
+) -> int:
+    """
+    列キャッシュの保存先（アップロードの書き出しと列キャッシュ）を、ファイル内容のハッシュ値単位で削除
+    ・最後の使用から max_age 秒を超えたものを削除し、合計が max_bytes を超える場合は使用が古いものから削除
+    ・keep_digest と、最後の使用から min_age 秒以内のもの（セッションが参照している可能性がある）は削除しない
+    ・削除したバイト数を返す
+    """
+    max_bytes = max_bytes if max_bytes is not None else int(_env_float(DATA_DIR_BUDGET_ENV, DATA_DIR_BUDGET_BYTES / 2 ** 20) * 2 ** 20)
+    max_age = max_age if max_age is not None else _env_float(DATA_MAX_AGE_ENV, DATA_MAX_AGE_S)
+    min_age = min_age if min_age is not None else _env_float(IDLE_TIMEOUT_ENV, 3600.0)
+
+    groups: Dict[str, List[os.DirEntry]] = defaultdict(list)
+    try:
+        with os.scandir(cache_dir) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    groups[entry.name.split("__")[0].split(".")[0]].append(entry)
+    except FileNotFoundError:
+        return 0
+
+    # ハッシュ値ごとの (最後の使用時刻, 合計バイト数)
+    usage = {
+        digest: (max(entry.stat().st_mtime for entry in files), sum(entry.stat().st_size for entry in files))
+        for digest, files in groups.items()
+    }
+    now = time.time()
+    total = sum(size for _, size in usage.values())
+    freed = 0
+    for digest in sorted(usage, key=lambda digest: usage[digest][0]):
+        last_used, size = usage[digest]
+        if digest == keep_digest or now - last_used <= min_age:
+            continue
+        if now - last_used <= max_age and total <= max_bytes:
+            continue
+        removed = 0
+        for entry in groups[digest]:
+            try:
+                file_size = entry.stat().st_size
+                os.remove(entry.path)
+                removed += file_size
+            except OSError:
+                # 使用中（Windows のメモリマップなど）のファイルは次回に回す
+                pass
+        total -= removed
+        freed += removed
+    if freed:
+        log_event("column_cache_prune", cache_dir=cache_dir, freed_bytes=freed, remaining_bytes=total)
+    return freed
+
+
+def _upload_size(uploaded_file: Any) -> int:
+    if isinstance(uploaded_file, (str, os.PathLike)):
+        return os.path.getsize(uploaded_file)
+    if isinstance(uploaded_file, bytes):
+        return len(uploaded_file)
+    size = getattr(uploaded_file, "size", None)
+    return size if size is not None else len(_buffer(uploaded_file))
+
+
+def ingest_upload(uploaded_file: Any) -> Tuple[str, RawData]:
+    """
+    アップロードファイルから RawData を作成
+    ・小さなファイルは全体をパース（同じ内容はキャッシュを共有）
+    ・大きなファイルは先頭行のみをプレビューとして読み、列データは列キャッシュから必要時に読み込む
+    ・(内容のハッシュ値, RawData) を返す
+    """
+    if _upload_size(uploaded_file) < LARGE_FILE_BYTES:
+        digest, df = read_csv_cached(uploaded_file)
+        return digest, RawData(df=df)
+
+    column_store = _open_column_store(uploaded_file)
+    preview_key = f"{column_store.digest}:preview"
+    preview_df = _frame_cache.get(preview_key)
+    if preview_df is None:
+        preview_df = pd.read_csv(column_store.source_path, nrows=PREVIEW_ROWS)
+        _frame_cache.put(preview_key, preview_df)
+    return column_store.digest, RawData(df=preview_df, column_store=column_store)
+
+
+def frame_cache_stats():
+    """データフレームキャッシュのヒット・ミス回数"""
+    return _frame_cache.stats()
+
+
+def clear_frame_cache() -> None:
+    """データフレームキャッシュを空にする"""
+    _frame_cache.clear()
@@ -0,0 +1,124 @@
+import threading
+import numpy as np
+from typing import Callable, Dict, Optional, Tuple, Type
+
+from ..models.hardening_law import HardeningLaw
+from ..models.ludwik_law import LudwikLaw
+from ..models.swift_law import SwiftLaw
+from ..models.voce_law import VoceLaw
+
+
+def estimate_ludwik(x: np.ndarray, y: np.ndarray, yield_stress: float) -> Tuple[float, float]:
+    """
+    Ludwik則の初期値推定
+    ・log(σ - σ0) = log(k) + n * log(εp) の両対数線形回帰
+    """
+    valid = (x > 0) & (y > yield_stress)
+    if np.count_nonzero(valid) < 2:
+        return LudwikLaw.default_initial_guess
+    n, log_k = np.polyfit(np.log(x[valid]), np.log(y[valid] - yield_stress), 1)
+    return float(np.exp(log_k)), float(n)
+
+
+def estimate_swift(x: np.ndarray, y: np.ndarray, yield_stress: float, num_grid: int = 32) -> Tuple[float, float]:
+    """
+    Swift則の初期値推定
+    ・α を固定すると log(σ/σ0) = n * log(1 + εp/α) は n について線形
+    ・α の候補を対数格子で一括評価し、対数空間の残差が最小の (α, n) を採用
+    """
+    valid = (x > 0) & (y > 0)
+    if np.count_nonzero(valid) < 2:
+        return SwiftLaw.default_initial_guess
+    x, log_ratio = x[valid], np.log(y[valid] / yield_stress)
+
+    alpha = np.logspace(-5, 0, num_grid)[:, None]
+    basis = np.log1p(x / alpha)
+    n = np.sum(basis * log_ratio, axis=1) / np.sum(basis * basis, axis=1)
+    sse = np.sum((log_ratio - n[:, None] * basis) ** 2, axis=1)
+    best = int(np.argmin(sse))
+    return float(alpha[best, 0]), float(n[best])
+
+
+def estimate_voce(x: np.ndarray, y: np.ndarray, yield_stress: float, num_grid: int = 32) -> Tuple[float, float]:
+    """
+    Voce則の初期値推定
+    ・飽和応力 σ∞ を最大応力の少し上に置いた候補を一括評価
+    ・log((σ∞ - σ)/(σ∞ - σ0)) = -h * εp を原点を通る直線で回帰して h を求める
+    ・応力空間の残差が最小の (σ∞, h) を採用
+    """
+    valid = x > 0
+    if np.count_nonzero(valid) < 2:
+        return VoceLaw.default_initial_guess
+    x, y = x[valid], y[valid]
+
+    y_max = float(np.max(y))
+    span = max(y_max - yield_stress, 1e-6 * max(abs(y_max), 1.0))
+    stress_infinite = (y_max + span * np.logspace(-3, 0, num_grid))[:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_decay = np.log((stress_infinite - y) / (stress_infinite - yield_stress))
+        h = -np.sum(x * log_decay, axis=1) / np.sum(x * x)
+        prediction = VoceLaw.law_function(x, stress_infinite, h[:, None], yield_stress)
+        sse = np.sum((y - prediction) ** 2, axis=1)
+    sse = np.where(np.isfinite(sse) & (h > 0), sse, np.inf)
+    best = int(np.argmin(sse))
+    if not np.isfinite(sse[best]):
+        return VoceLaw.default_initial_guess
+    return float(stress_infinite[best, 0]), float(h[best])
+
+
+# 硬化則ごとの初期値推定関数
+ESTIMATORS: Dict[Type[HardeningLaw], Callable[[np.ndarray, np.ndarray, float], Tuple[float, float]]] = {
+    LudwikLaw: estimate_ludwik,
+    SwiftLaw: estimate_swift,
+    VoceLaw: estimate_voce,
+}
+
+
+class WarmStartStore:
+    """材料ごとに前回のフィッティング結果を初期値として保持するクラス"""
+
+    def __init__(self):
+        self._params: Dict[Tuple[str, str], Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, material: str, law_class: Type[HardeningLaw]) -> Optional[Tuple[float, float]]:
+        """保存済みの初期値を取得"""
+        with self._lock:
+            return self._params.get((material, law_class.__name__))
+
+    def put(self, material: str, law_model: HardeningLaw) -> None:
+        """フィッティング結果を保存"""
+        if not all(np.isfinite(law_model.params)):
+            return
+        with self._lock:
+            self._params[(material, type(law_model).__name__)] = law_model.params
+
+    def clear(self) -> None:
+        with self._lock:
+            self._params.clear()
+
+
+warm_starts = WarmStartStore()
+
+
+def initial_guess_for(
+        law_class: Type[HardeningLaw],
+        x: np.ndarray,
+        y: np.ndarray,
+        yield_stress: float,
+        material: Optional[str] = None,
+) -> Tuple[float, float]:
+    """
+    フィッティングの初期値を決定
+    ・材料名があり前回の結果が保存されていればそれを使用
+    ・なければデータから閉形式で推定
+    """
+    if material:
+        stored = warm_starts.get(material, law_class)
+        if stored is not None:
+            return stored
+
+    estimate = ESTIMATORS[law_class](np.asarray(x, dtype=float), np.asarray(y, dtype=float), yield_stress)
+    if not all(np.isfinite(estimate)):
+        return law_class.default_initial_guess
+    return estimate
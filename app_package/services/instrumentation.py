@@ -0,0 +1,178 @@
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+# 構造化ログ（1行1JSON）の出力先
+logger = logging.getLogger("fitcurve")
+
+
+class StageRecord(BaseModel):
+    """1つの処理段階の計測結果"""
+    name: str
+    depth: int = 0
+    started: float = 0.0
+    elapsed: float = 0.0
+    memory_delta: int = 0
+    counters: Dict[str, float] = Field(default_factory=dict)
+    status: str = "ok"
+    error: Optional[str] = None
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    def add(self, name: str, value: float) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+
+class RunLog:
+    """
+    1回の再実行（またはリクエスト）で記録した段階の一覧
+    ・ワーカースレッドからも追記されるためロックで保護する
+    """
+
+    def __init__(self, session_id: Optional[str] = None):
+        self.session_id = session_id
+        self.records: List[StageRecord] = []
+        self._lock = threading.Lock()
+
+    def append(self, record: StageRecord) -> None:
+        with self._lock:
+            self.records.append(record)
+
+    def add(self, record: StageRecord, name: str, value: float) -> None:
+        with self._lock:
+            record.add(name, value)
+
+
+# 現在の再実行の記録と、実行中の段階のスタック
+_current_run: contextvars.ContextVar[Optional[RunLog]] = contextvars.ContextVar("fitcurve_run", default=None)
+_stage_stack: contextvars.ContextVar[Tuple[StageRecord, ...]] = contextvars.ContextVar("fitcurve_stages", default=())
+
+
+def configure_logging(level: int = logging.INFO) -> None:
+    """構造化ログを標準エラー出力に出す（既にハンドラがあれば何もしない）"""
+    if logger.handlers:
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False
+
+
+def log_event(event: str, **fields: Any) -> None:
+    """構造化ログを1行出力"""
+    run = _current_run.get()
+    payload = {"event": event, "time": round(time.time(), 3)}
+    if run is not None and run.session_id is not None:
+        payload["session"] = run.session_id
+    payload.update(fields)
+    logger.info(json.dumps(payload, ensure_ascii=False, default=str))
+
+
+def log_exception(message: str, error: BaseException, **fields: Any) -> None:
+    """握りつぶしていた例外を構造化ログ（ERROR）として出力"""
+    run = _current_run.get()
+    payload = {"event": "error", "time": round(time.time(), 3), "message": message,
+               "error_type": type(error).__name__, "error": f"{error}"}
+    if run is not None and run.session_id is not None:
+        payload["session"] = run.session_id
+    stack = _stage_stack.get()
+    if stack:
+        payload["stage"] = stack[-1].name
+    payload.update(fields)
+    logger.error(json.dumps(payload, ensure_ascii=False, default=str), exc_info=error)
+
+
+def _rss_bytes() -> int:
+    """プロセスの常駐メモリ量（取得できない環境では 0）"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return 0
+
+
+@contextmanager
+def run_log(session_id: Optional[str] = None) -> Iterator[RunLog]:
+    """再実行1回分の計測を開始（ブロック内の stage がこの RunLog に記録される）"""
+    run = RunLog(session_id)
+    token = _current_run.set(run)
+    try:
+        yield run
+    finally:
+        _current_run.reset(token)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[StageRecord]:
+    """
+    処理段階の経過時間・メモリ増減・カウンタを記録
+    ・終了時に構造化ログを出力し、実行中の RunLog に追加する
+    ・例外は記録してそのまま送出する
+    """
+    stack = _stage_stack.get()
+    start_time = time.perf_counter()
+    record = StageRecord(name=name, depth=len(stack), started=start_time)
+    token = _stage_stack.set(stack + (record,))
+    memory_before = _rss_bytes()
+    try:
+        yield record
+    except BaseException as e:
+        record.status = "error"
+        record.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        record.elapsed = time.perf_counter() - start_time
+        record.memory_delta = _rss_bytes() - memory_before
+        _stage_stack.reset(token)
+        run = _current_run.get()
+        if run is not None:
+            run.append(record)
+        log_event(
+            "stage",
+            stage=name,
+            depth=record.depth,
+            elapsed_ms=round(record.elapsed * 1000, 3),
+            memory_delta_mb=round(record.memory_delta / 2 ** 20, 3),
+            counters=record.counters,
+            status=record.status,
+            **({"error": record.error} if record.error else {}),
+        )
+
+
+def instrumented(name: str) -> Callable:
+    """関数全体を stage(name) で計測するデコレータ"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def add_count(name: str, value: float = 1) -> None:
+    """
+    実行中の全段階（外側の段階を含む）のカウンタに加算
+    ・ソルバーの関数評価回数(nfev)などを記録する
+    """
+    run = _current_run.get()
+    for record in _stage_stack.get():
+        if run is not None:
+            run.add(record, name, value)
+        else:
+            record.add(name, value)
+
+
+def submit_in_context(executor, func: Callable, *args, **kwargs):
+    """現在の計測コンテキストを引き継いでワーカーに投入"""
+    return executor.submit(contextvars.copy_context().run, func, *args, **kwargs)
@@ -0,0 +1,202 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple, Type
+
+import numpy as np
+
+from ..models.stress_strain_curve import StressStrainCurve
+from ..models.fit_settings import FitSettings
+from ..models.hardening_law import HardeningLaw
+from .batch_solver import solve_batched
+from .fit_curve import LAW_MODELS
+from .fit_runner import get_executor
+from .initializer import initial_guess_for
+from .instrumentation import log_event, log_exception, submit_in_context
+
+
+@dataclass(slots=True)
+class FitWindowData:
+    """
+    フィット範囲を動かしながら繰り返しフィッティングするための前計算
+    ・真ひずみの昇順に並べた (x, y) と、y・y² の累積和（先頭に0を付加）
+    ・範囲の切り出しは二分探索でビューを返し、範囲内の全平方和 ss_tot は累積和から O(1) で求める
+    """
+    x: np.ndarray
+    y: np.ndarray
+    y_sum: np.ndarray
+    y_square_sum: np.ndarray
+
+    @classmethod
+    def from_curve(cls, curve: StressStrainCurve) -> "FitWindowData":
+        """曲線から作成（曲線の派生値としてキャッシュし、曲線の変更時に破棄される）"""
+        def compute():
+            x = np.asarray(curve.true_strain, dtype=np.float64)
+            y = np.asarray(curve.true_stress, dtype=np.float64)
+            order = np.argsort(x, kind="stable")
+            x, y = x[order], y[order]
+            zero = np.zeros(1)
+            return cls(x, y, np.concatenate([zero, np.cumsum(y)]), np.concatenate([zero, np.cumsum(y * y)]))
+        return curve.cached("live_fit.window_data", compute)
+
+    def bounds(self, fit_range: Tuple[float, float]) -> Tuple[int, int]:
+        """get_fit_data と同じ条件 (start < x <= end) の添字範囲"""
+        start, end = fit_range
+        return int(np.searchsorted(self.x, start, side="right")), int(np.searchsorted(self.x, end, side="right"))
+
+    def total_sum_of_squares(self, lo: int, hi: int) -> float:
+        """範囲内の Σ(y - ȳ)²"""
+        count = hi - lo
+        if count <= 0:
+            return 0.0
+        total = self.y_sum[hi] - self.y_sum[lo]
+        return float(self.y_square_sum[hi] - self.y_square_sum[lo] - total * total / count)
+
+
+@dataclass(slots=True)
+class LiveFitResult:
+    """ライブフィッティングの1回分の結果"""
+    fit_range: Tuple[float, float]
+    models: Dict[str, HardeningLaw]
+    r_squared: Dict[str, float]
+    iterations: Dict[str, int]
+    num_points: int
+    elapsed: float
+    # 何回目の要求に対する結果か
+    revision: int = 0
+
+
+@dataclass(slots=True)
+class _Request:
+    fit_range: Tuple[float, float]
+    settings: FitSettings
+    revision: int
+    submitted: float = field(default_factory=time.monotonic)
+
+
+class LiveFitter:
+    """
+    フィット範囲のスライダー操作に合わせて全硬化則を再フィッティングする
+    ・submit は最新の要求を記録するだけで、ワーカーが debounce 秒間新しい要求が来なくなってからフィッティングする
+      （途中の要求は最新のもので置き換えられ、フィッティングされない）
+    ・前回のパラメータから一括LMソルバーを開始する（ウォームスタート）ため、範囲の小さな変更は数回の反復で済む
+    ・ウォームスタートで収束しなかった硬化則は、データからの推定値で最初からやり直す
+    ・操作中のプレビューのため収束判定 tolerance は通常より緩くする（確定は「フィッティング実行」で行う）
+    """
+
+    def __init__(
+            self,
+            curve: StressStrainCurve,
+            laws: Optional[Dict[str, Type[HardeningLaw]]] = None,
+            debounce: float = 0.15,
+            tolerance: float = 1e-8,
+    ):
+        self.curve = curve
+        self.laws = laws or LAW_MODELS
+        self.debounce = debounce
+        self.tolerance = tolerance
+        self._data = FitWindowData.from_curve(curve)
+        self._params: Dict[str, np.ndarray] = {}
+        self._request: Optional[_Request] = None
+        self._result: Optional[LiveFitResult] = None
+        self._revision = 0
+        self._running = False
+        self._lock = threading.Lock()
+
+    def submit(self, settings: FitSettings) -> int:
+        """フィット範囲（と設定）の変更を要求し、要求の番号を返す"""
+        with self._lock:
+            if self._result is not None and self._request is None and self._result.fit_range == tuple(settings.fit_range):
+                return self._result.revision
+            self._revision += 1
+            self._request = _Request(tuple(settings.fit_range), settings, self._revision)
+            if not self._running:
+                self._running = True
+                submit_in_context(get_executor(), self._work)
+            return self._revision
+
+    @property
+    def pending(self) -> bool:
+        """未処理の要求またはフィッティング中の要求があるか"""
+        with self._lock:
+            return self._running
+
+    def latest(self) -> Optional[LiveFitResult]:
+        """最後に完了したフィッティング結果"""
+        with self._lock:
+            return self._result
+
+    def wait(self, timeout: float) -> Optional[LiveFitResult]:
+        """要求が全て処理されるまで最大 timeout 秒待ち、最後の結果を返す"""
+        deadline = time.monotonic() + timeout
+        while self.pending and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return self.latest()
+
+    def _work(self) -> None:
+        """ワーカー: 要求が落ち着くのを待ってから最新の要求をフィッティング"""
+        while True:
+            with self._lock:
+                request = self._request
+                if request is None:
+                    self._running = False
+                    return
+                quiet = self.debounce - (time.monotonic() - request.submitted)
+                if quiet <= 0:
+                    self._request = None
+            if quiet > 0:
+                time.sleep(quiet)
+                continue
+            try:
+                result = self.fit(request.fit_range, request.settings)
+                result.revision = request.revision
+                with self._lock:
+                    self._result = result
+            except Exception as e:
+                log_exception("ライブフィッティングに失敗しました", e, fit_range=request.fit_range)
+
+    def fit(self, fit_range: Tuple[float, float], settings: FitSettings) -> LiveFitResult:
+        """指定した範囲で全硬化則を同期的にフィッティング"""
+        start_time = time.perf_counter()
+        lo, hi = self._data.bounds(fit_range)
+        x = self._data.x[None, lo:hi]
+        y = self._data.y[None, lo:hi]
+        mask = np.ones(x.shape, dtype=bool)
+        yield_stress = np.array([self.curve.yield_stress], dtype=float)
+        ss_tot = self._data.total_sum_of_squares(lo, hi)
+
+        models, r_squared, iterations = {}, {}, {}
+        for law, law_class in self.laws.items():
+            previous = self._params.get(law)
+            params, converged, used = None, False, 0
+            if previous is not None:
+                params, converged, count = solve_batched(
+                    law, x, y, mask, yield_stress, previous, settings.max_iterations, self.tolerance
+                )
+                used = int(count[0])
+            if not converged or not np.all(np.isfinite(params)):
+                guess = self._cold_guess(law, law_class, x[0], y[0], settings)
+                params, converged, count = solve_batched(
+                    law, x, y, mask, yield_stress, guess, settings.max_iterations, self.tolerance
+                )
+                used += int(count[0])
+            self._params[law] = params[0].copy()
+
+            model = law_class(yield_stress=self.curve.yield_stress, **dict(zip(law_class.param_names, map(float, params[0]))))
+            models[law] = model
+            iterations[law] = used
+            with np.errstate(all="ignore"):
+                residual = y[0] - law_class.law_function(x[0], *params[0], self.curve.yield_stress)
+                ss_res = float(np.sum(residual * residual))
+            r_squared[law] = 1 - ss_res / ss_tot if ss_tot > 0 else float("nan")
+
+        elapsed = time.perf_counter() - start_time
+        log_event("live_fit", fit_range=list(fit_range), num_points=hi - lo, iterations=iterations,
+                  elapsed_ms=round(elapsed * 1000, 3))
+        return LiveFitResult(tuple(fit_range), models, r_squared, iterations, hi - lo, elapsed)
+
+    def _cold_guess(self, law: str, law_class: Type[HardeningLaw], x: np.ndarray, y: np.ndarray, settings: FitSettings):
+        """ウォームスタートできない場合の初期値（通常のフィッティングと同じ決め方）"""
+        if law == "ludwik" and settings.initial_guess is not None:
+            return settings.initial_guess
+        return initial_guess_for(law_class, x, y, self.curve.yield_stress, settings.material)
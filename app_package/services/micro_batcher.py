@@ -0,0 +1,197 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor
+from typing import Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+from pydantic import BaseModel, ConfigDict
+
+from ..models.stress_strain_curve import StressStrainCurve
+from ..models.fit_settings import FitSettings
+from ..models.hardening_law import HardeningLaw
+from .batch_solver import MAX_BATCH_POINTS, fit_curve_batch, split_batches
+from .fit_runner import get_executor
+
+
+class BatchResult(BaseModel):
+    """一括フィッティングした1曲線・1硬化則分の結果"""
+    law: str
+    model: HardeningLaw
+    converged: bool
+    r_squared: float
+    batch_size: int
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+
+class LatencyStats:
+    """
+    直近のレイテンシを保持してパーセンタイルを計算
+    ・スレッドセーフ（直近 max_samples 件のみ保持）
+    """
+
+    def __init__(self, max_samples: int = 10_000):
+        self._samples: Deque[float] = deque(maxlen=max_samples)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+            self._count += 1
+
+    def summary(self) -> Dict[str, float]:
+        """件数と p50 / p95 / p99 [ms]"""
+        with self._lock:
+            samples = np.array(self._samples)
+            count = self._count
+        if len(samples) == 0:
+            return {"count": count, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0}
+        p50, p95, p99 = np.percentile(samples, [50, 95, 99]) * 1000
+        return {"count": count, "p50_ms": float(p50), "p95_ms": float(p95), "p99_ms": float(p99)}
+
+
+def solve_batch(
+        law: str,
+        curves: List[StressStrainCurve],
+        settings_list: List[FitSettings],
+        max_points: int = MAX_BATCH_POINTS,
+) -> List[BatchResult]:
+    """ワーカー上で1つの硬化則を一括フィッティングし、決定係数を付けて返す"""
+    models, converged = fit_curve_batch(law, curves, settings_list, max_points)
+    return [
+        BatchResult(
+            law=law,
+            model=model,
+            converged=bool(ok),
+            r_squared=float(model.calculate_r_squared(curve.plastic_strain, curve.true_stress)),
+            batch_size=len(curves),
+        )
+        for curve, model, ok in zip(curves, models, converged)
+    ]
+
+
+class MicroBatcher:
+    """
+    短い時間窓に届いたフィッティング要求をまとめて一括で解く
+    ・最初の要求から window 秒待つか max_batch 件たまった時点で、硬化則ごとに solve_batch をワーカープールで実行
+    ・同じ硬化則の要求も、パディング後の要素数 (曲線数 × 最長の点数) が max_batch_points を超えないよう点数順に分ける
+      （長い曲線1本と短い曲線を同じ配列に詰めてメモリを使い切らないため。超える曲線は単独で解く）
+    ・イベントループ上で使用する（submit はコルーチン）
+    """
+
+    def __init__(
+            self,
+            window: float = 0.005,
+            max_batch: int = 256,
+            executor: Optional[Executor] = None,
+            max_batch_points: int = MAX_BATCH_POINTS,
+    ):
+        self.window = window
+        self.max_batch = max_batch
+        self.max_batch_points = max_batch_points
+        self.executor = executor
+        self.latency = LatencyStats()
+        self._queue: Optional[asyncio.Queue] = None
+        self._collector: Optional[asyncio.Task] = None
+        self._collecting = 0
+        self._in_flight = 0
+        self._batches = 0
+        self._batched_jobs = 0
+        self._tasks = set()
+
+    @property
+    def running(self) -> bool:
+        return self._collector is not None and not self._collector.done()
+
+    def start(self) -> None:
+        """実行中のイベントループ上で収集タスクを開始"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._collector = asyncio.get_running_loop().create_task(self._collect())
+
+    async def stop(self) -> None:
+        """収集タスクを停止し、実行中のバッチの完了を待つ"""
+        if self._collector is not None:
+            self._collector.cancel()
+            try:
+                await self._collector
+            except asyncio.CancelledError:
+                pass
+            self._collector = None
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def submit(self, law: str, curve: StressStrainCurve, settings: FitSettings) -> BatchResult:
+        """1曲線・1硬化則のフィッティングを要求し、一括フィッティングの結果を待つ"""
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((law, curve, settings, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self) -> None:
+        """時間窓ごとに要求を集めてバッチを発行"""
+        loop = asyncio.get_running_loop()
+        while True:
+            jobs = [await self._queue.get()]
+            self._collecting = 1
+            deadline = loop.time() + self.window
+            while len(jobs) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    jobs.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+                self._collecting = len(jobs)
+            self._collecting = 0
+
+            groups: Dict[str, List[Tuple]] = {}
+            for job in jobs:
+                groups.setdefault(job[0], []).append(job)
+            for law, group in groups.items():
+                lengths = [len(job[1].nominal_strain) for job in group]
+                for index in split_batches(lengths, self.max_batch_points):
+                    task = loop.create_task(self._dispatch(law, [group[i] for i in index]))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, law: str, jobs: List[Tuple]) -> None:
+        """1つの硬化則のバッチをワーカープールで解き、各要求に結果を返す"""
+        loop = asyncio.get_running_loop()
+        curves = [job[1] for job in jobs]
+        settings_list = [job[2] for job in jobs]
+        self._in_flight += len(jobs)
+        try:
+            results = await loop.run_in_executor(
+                self.executor or get_executor(), solve_batch, law, curves, settings_list, self.max_batch_points
+            )
+        except Exception as e:
+            for job in jobs:
+                if not job[3].done():
+                    job[3].set_exception(e)
+            return
+        finally:
+            self._in_flight -= len(jobs)
+        self._batches += 1
+        self._batched_jobs += len(jobs)
+        now = time.perf_counter()
+        for job, result in zip(jobs, results):
+            self.latency.record(now - job[4])
+            if not job[3].done():
+                job[3].set_result(result)
+
+    def metrics(self) -> Dict[str, float]:
+        """待ち行列の長さ・処理中の件数・平均バッチサイズ・レイテンシ"""
+        queued = (self._queue.qsize() if self._queue is not None else 0) + self._collecting
+        return {
+            "queue_depth": queued,
+            "in_flight": self._in_flight,
+            "batches": self._batches,
+            "mean_batch_size": self._batched_jobs / self._batches if self._batches else 0.0,
+            "job_latency": self.latency.summary(),
+        }
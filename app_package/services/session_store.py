@@ -0,0 +1,334 @@
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from enum import Enum
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..models.raw_data import RawData
+from ..models.stress_strain_curve import StressStrainCurve
+from .instrumentation import log_event
+
+
+# セッションIDを保存する st.session_state のキー
+SESSION_ID_KEY = "session_id"
+
+# 予算などの設定（環境変数で上書き可能）
+SESSION_BUDGET_ENV = "FITCURVE_SESSION_BUDGET_MB"
+GLOBAL_BUDGET_ENV = "FITCURVE_GLOBAL_BUDGET_MB"
+IDLE_TIMEOUT_ENV = "FITCURVE_SESSION_IDLE_S"
+SPILL_DIR_ENV = "FITCURVE_SPILL_DIR"
+
+
+class _Spilled:
+    """pickle でディスクに退避した値（次に取得したときに読み戻す）"""
+    __slots__ = ("path", "nbytes")
+
+    def __init__(self, path: str, nbytes: int):
+        self.path = path
+        self.nbytes = nbytes
+
+    def load(self) -> Any:
+        with open(self.path, "rb") as f:
+            value = pickle.load(f)
+        os.remove(self.path)
+        return value
+
+
+class _Entry:
+    """1つのキーの値と、メモリ上・ディスク上の大きさ、退避で作成したメモリマップファイル"""
+    __slots__ = ("value", "resident", "spilled", "files")
+
+    def __init__(self, value: Any):
+        self.value = value
+        self.resident, self.spilled = sizeof(value)
+        self.files: List[str] = []
+
+    def release(self) -> None:
+        """
+        退避ファイルを削除（値を置き換え・破棄するとき）
+        ・呼び出し元が保持しているメモリマップ配列は、ファイル削除後もマップが解除されるまで読める（POSIX）
+        """
+        paths = self.files + ([self.value.path] if isinstance(self.value, _Spilled) else [])
+        self.value = None
+        self.files = []
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                # 削除済み、または使用中（Windows のメモリマップ）のファイルはセッション破棄時に削除する
+                pass
+
+
+class _Session:
+    __slots__ = ("entries", "last_access")
+
+    def __init__(self):
+        self.entries: Dict[Hashable, _Entry] = {}
+        self.last_access = time.monotonic()
+
+    @property
+    def resident(self) -> int:
+        return sum(entry.resident for entry in self.entries.values())
+
+
+def _is_memmap(array: np.ndarray) -> bool:
+    """メモリマップファイルを参照している配列かどうか"""
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base if isinstance(array.base, np.ndarray) else None
+    return False
+
+
+def _array_size(array: np.ndarray) -> Tuple[int, int]:
+    return (0, array.nbytes) if _is_memmap(array) else (array.nbytes, 0)
+
+
+def sizeof(value: Any) -> Tuple[int, int]:
+    """
+    値の大きさ (メモリ上のバイト数, ディスク上のバイト数)
+    ・配列・曲線・データフレームは保持している配列の合計、それ以外は sys.getsizeof
+    ・データフレームは文字列列を深く数えない（概算）
+    """
+    if isinstance(value, _Spilled):
+        return 0, value.nbytes
+    if isinstance(value, np.ndarray):
+        return _array_size(value)
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=False).sum()), 0
+    if isinstance(value, StressStrainCurve):
+        arrays = [value.nominal_strain, value.nominal_stress]
+        arrays += [cached for cached in value._cache.values() if isinstance(cached, np.ndarray)]
+        sizes = [_array_size(array) for array in arrays]
+        frames = [sizeof(cached)[0] for cached in value._cache.values() if isinstance(cached, pd.DataFrame)]
+        return sum(size[0] for size in sizes) + sum(frames), sum(size[1] for size in sizes)
+    if isinstance(value, RawData):
+        # 変換済みの列は、データフレームや列キャッシュを参照しているもの（ゼロコピー）を数えない
+        converted = [_array_size(array) for array in value._columns.values() if array.flags.owndata]
+        return sizeof(value.df)[0] + sum(size[0] for size in converted), sum(size[1] for size in converted)
+    return sys.getsizeof(value), 0
+
+
+class SessionStore:
+    """
+    全セッションの状態を保持するストア
+    ・セッションごと・全体のメモリ予算（バイト数）を超えると、大きな値からディスクに退避する
+      - 配列と応力ひずみ曲線はメモリマップファイルに置き換え（そのまま使える）
+      - その他の値は pickle で退避し、次に取得したときに読み戻す
+    ・全体の予算を超えた場合や idle_timeout 秒アクセスのないセッションは、最後のアクセスが古い順に破棄する
+    """
+
+    def __init__(
+            self,
+            session_budget: int = 512 * 2 ** 20,
+            global_budget: int = 4 * 2 ** 30,
+            idle_timeout: float = 3600.0,
+            spill_dir: Optional[str] = None,
+            min_spill_bytes: int = 1 * 2 ** 20,
+    ):
+        self.session_budget = session_budget
+        self.global_budget = global_budget
+        self.idle_timeout = idle_timeout
+        self.spill_dir = spill_dir or os.path.join(tempfile.gettempdir(), "fitcurve_spill")
+        self.min_spill_bytes = min_spill_bytes
+        self._sessions: Dict[str, _Session] = {}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_env(cls) -> "SessionStore":
+        """環境変数の設定でストアを作成"""
+        kwargs = {}
+        if os.environ.get(SESSION_BUDGET_ENV):
+            kwargs["session_budget"] = int(float(os.environ[SESSION_BUDGET_ENV]) * 2 ** 20)
+        if os.environ.get(GLOBAL_BUDGET_ENV):
+            kwargs["global_budget"] = int(float(os.environ[GLOBAL_BUDGET_ENV]) * 2 ** 20)
+        if os.environ.get(IDLE_TIMEOUT_ENV):
+            kwargs["idle_timeout"] = float(os.environ[IDLE_TIMEOUT_ENV])
+        return cls(spill_dir=os.environ.get(SPILL_DIR_ENV), **kwargs)
+
+    # 値の取得・保存
+    def get(self, session_id: str, key: Hashable, default: Any = None) -> Any:
+        """値を取得（退避済みの値は読み戻す）"""
+        with self._lock:
+            session = self._touch(session_id)
+            entry = session.entries.get(key)
+            if entry is None:
+                return default
+            value = entry.value
+            if isinstance(value, _Spilled):
+                value = entry.value = value.load()
+            # 曲線の派生配列などは取得後に増えるため、取得のたびに大きさを更新する
+            entry.resident, entry.spilled = sizeof(value)
+            self._enforce(session_id, keep=key)
+            return value
+
+    def put(self, session_id: str, key: Hashable, value: Any) -> None:
+        """値を保存し、予算を超えていれば退避・破棄する"""
+        with self._lock:
+            session = self._touch(session_id)
+            entry = _Entry(value)
+            previous = session.entries.pop(key, None)
+            if previous is not None:
+                if previous.value is value:
+                    # 同じオブジェクトの保存し直しはメモリマップファイルを引き継ぐ
+                    entry.files = previous.files
+                else:
+                    previous.release()
+            session.entries[key] = entry
+            self._enforce(session_id, keep=key)
+
+    def contains(self, session_id: str, key: Hashable) -> bool:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            return session is not None and key in session.entries
+
+    def delete_session(self, session_id: str) -> None:
+        """セッションの全ての値と退避ファイルを破棄"""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+        shutil.rmtree(self._session_dir(session_id), ignore_errors=True)
+
+    # 使用量
+    def usage(self, session_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """キーごとの使用量（session_id を省略した場合は全セッション）"""
+        with self._lock:
+            sessions = self._sessions.items() if session_id is None else [(session_id, self._sessions.get(session_id))]
+            rows = []
+            for sid, session in sessions:
+                if session is None:
+                    continue
+                for key, entry in session.entries.items():
+                    rows.append({
+                        "session": sid,
+                        "key": key.name if isinstance(key, Enum) else f"{key}",
+                        "type": "spilled" if isinstance(entry.value, _Spilled) else type(entry.value).__name__,
+                        "resident_bytes": entry.resident,
+                        "spilled_bytes": entry.spilled,
+                        "idle_s": time.monotonic() - session.last_access,
+                    })
+            return rows
+
+    def totals(self) -> Dict[str, int]:
+        """全体の使用量"""
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "resident_bytes": sum(session.resident for session in self._sessions.values()),
+                "spilled_bytes": sum(
+                    entry.spilled for session in self._sessions.values() for entry in session.entries.values()
+                ),
+                "session_budget": self.session_budget,
+                "global_budget": self.global_budget,
+            }
+
+    # 内部処理
+    def _touch(self, session_id: str) -> _Session:
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = self._sessions[session_id] = _Session()
+        session.last_access = time.monotonic()
+        return session
+
+    def _session_dir(self, session_id: str) -> str:
+        return os.path.join(self.spill_dir, session_id)
+
+    def _enforce(self, session_id: str, keep: Hashable) -> None:
+        """予算とアイドル時間の制限を適用（操作中のセッションは破棄しない）"""
+        now = time.monotonic()
+        for sid in [sid for sid, s in self._sessions.items() if sid != session_id and now - s.last_access > self.idle_timeout]:
+            self._evict(sid, reason="idle")
+
+        # セッションの予算: 大きな値から退避（直前に操作した値は最後に回す）
+        session = self._sessions[session_id]
+        self._spill_until(session_id, session, self.session_budget, keep)
+
+        # 全体の予算: 古いセッションから破棄し、それでも超える場合は操作中のセッションの値を退避
+        while self._total_resident() > self.global_budget:
+            idle = [sid for sid in self._sessions if sid != session_id]
+            if not idle:
+                self._spill_until(session_id, session, session.resident - (self._total_resident() - self.global_budget), keep)
+                break
+            self._evict(min(idle, key=lambda sid: self._sessions[sid].last_access), reason="global_budget")
+
+    def _total_resident(self) -> int:
+        return sum(session.resident for session in self._sessions.values())
+
+    def _spill_until(self, session_id: str, session: _Session, budget: int, keep: Hashable) -> None:
+        """
+        予算以下になるまで大きな値から退避
+        ・直前に操作した値は呼び出し元が使い続けるため pickle で退避しない（配列・曲線のメモリマップ化のみ）
+        """
+        if session.resident <= budget:
+            return
+        candidates = sorted(
+            (
+                key for key, entry in session.entries.items()
+                if entry.resident >= self.min_spill_bytes
+                and (key != keep or isinstance(entry.value, (np.ndarray, StressStrainCurve)))
+            ),
+            key=lambda key: (key == keep, -session.entries[key].resident),
+        )
+        for key in candidates:
+            if session.resident <= budget:
+                break
+            self._spill(session_id, key, session.entries[key])
+
+    def _spill(self, session_id: str, key: Hashable, entry: _Entry) -> None:
+        """値をディスクに退避"""
+        directory = self._session_dir(session_id)
+        os.makedirs(directory, exist_ok=True)
+        before = entry.resident
+        value = entry.value
+        if isinstance(value, np.ndarray):
+            entry.value = self._to_memmap(directory, value, entry.files)
+        elif isinstance(value, StressStrainCurve):
+            # 公称ひずみ・応力をメモリマップに置き換え、派生配列は必要になった時点で再計算する
+            value.nominal_strain = self._to_memmap(directory, value.nominal_strain, entry.files)
+            value.nominal_stress = self._to_memmap(directory, value.nominal_stress, entry.files)
+            value.invalidate_cache()
+        else:
+            path = os.path.join(directory, f"{uuid.uuid4().hex}.pkl")
+            with open(path, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            entry.value = _Spilled(path, os.path.getsize(path))
+        entry.resident, entry.spilled = sizeof(entry.value)
+        log_event("session_spill", session_id=session_id, key=key.name if isinstance(key, Enum) else f"{key}",
+                  freed_bytes=before - entry.resident)
+
+    @staticmethod
+    def _to_memmap(directory: str, array: np.ndarray, files: List[str]) -> np.ndarray:
+        """配列をメモリマップファイルに置き換え（作成したファイルは files に追加）"""
+        if _is_memmap(array):
+            return array
+        path = os.path.join(directory, f"{uuid.uuid4().hex}.npy")
+        np.save(path, np.ascontiguousarray(array))
+        files.append(path)
+        return np.load(path, mmap_mode="r")
+
+    def _evict(self, session_id: str, reason: str) -> None:
+        session = self._sessions.get(session_id)
+        freed = session.resident if session is not None else 0
+        self.delete_session(session_id)
+        log_event("session_evict", session_id=session_id, reason=reason, freed_bytes=freed)
+
+
+# 全セッションで共有するストア
+_store: Optional[SessionStore] = None
+_store_lock = threading.Lock()
+
+
+def get_session_store() -> SessionStore:
+    """全セッションで共有するストアを取得"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SessionStore.from_env()
+        return _store
@@ -0,0 +1,73 @@
+import numpy as np
+from typing import Optional, Tuple, Type
+
+from ..models.hardening_law import HardeningLaw, check_deadline
+from .instrumentation import add_count
+
+
+def projected_cost(
+        law_class: Type[HardeningLaw],
+        x: np.ndarray,
+        y: np.ndarray,
+        yield_stress: float,
+        p2,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    非線形パラメータ p2 を固定し、線形パラメータ p1 を閉形式で消去した残差二乗和
+    ・p2 はスカラーまたは (G, 1) の配列（複数候補を一括評価）
+    ・(残差二乗和, 最適な p1) を返す
+    """
+    offset, basis = law_class.separable_basis(x, p2, yield_stress)
+    z = y - offset
+    basis_norm = np.sum(basis * basis, axis=-1)
+    projection = np.sum(basis * z, axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p1 = projection / basis_norm
+        cost = np.sum(z * z, axis=-1) - projection * p1
+    return np.where(np.isfinite(cost), cost, np.inf), p1
+
+
+def fit_varpro(
+        law_class: Type[HardeningLaw],
+        x: np.ndarray,
+        y: np.ndarray,
+        yield_stress: float,
+        max_iterations: int = 1000,
+        num_grid: int = 64,
+        deadline: Optional[float] = None,
+) -> Tuple[float, float]:
+    """
+    変数射影法(VarPro)による分離形硬化則のフィッティング
+    ・p2 の範囲 varpro_bounds を対数スケールで粗く一括評価し最良点を探す
+    ・最良点の前後区間で有界1次元探索(Brent法)を行い p2 を決定
+    ・初期推定値は不要
+    ・deadline（time.monotonic() 基準）を過ぎると FitTimeoutError で中断
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    low, high = np.log(law_class.varpro_bounds)
+
+    # 粗い格子で一括評価
+    log_grid = np.linspace(low, high, num_grid)
+    grid_cost, _ = projected_cost(law_class, x, y, yield_stress, np.exp(log_grid)[:, None])
+    best = int(np.argmin(grid_cost))
+    bracket = (log_grid[max(best - 1, 0)], log_grid[min(best + 1, num_grid - 1)])
+
+    # 最良点近傍で有界1次元探索
+    def cost(log_p2):
+        check_deadline(deadline)
+        return projected_cost(law_class, x, y, yield_stress, np.exp(log_p2))[0]
+
+    # scipy は読み込みが重いため、フィッティング時に初めて読み込む
+    from scipy import optimize
+
+    result = optimize.minimize_scalar(
+        cost,
+        bounds=bracket,
+        method="bounded",
+        options={"maxiter": max_iterations, "xatol": 1e-10},
+    )
+    add_count("nfev", num_grid + result.nfev)
+    p2 = float(np.exp(result.x))
+    _, p1 = projected_cost(law_class, x, y, yield_stress, p2)
+    return float(p1), p2
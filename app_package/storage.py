@@ -1,8 +1,7 @@
+import uuid
 import pandas as pd
 import numpy as np
-import streamlit as st
-from streamlit.runtime.state import SessionStateProxy
-from typing import Any
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 from enum import Enum
 
 from .models.raw_data import RawData
@@ -11,11 +10,33 @@ from .models.fit_settings import FitSettings
 from .models.ludwik_law import LudwikLaw
 from .models.swift_law import SwiftLaw
 
-from .services.fit_curve import fit_ludwik_curve, fit_swift_curve, fit_voce_curve
+from .services.bootstrap import bootstrap_laws
+from .services.fit_cache import get_fit_cache
+from .services.fit_curve import get_fit_data
+from .services.fit_runner import fit_laws_concurrently
+from .services.fit_window import search_fit_window
+from .services.ingest import ingest_upload, upload_id
+from .services.live_fit import LiveFitResult, LiveFitter
+from .services.instrumentation import instrumented, log_exception
+from .services.session_store import SESSION_ID_KEY, SessionStore, get_session_store
+
+if TYPE_CHECKING:
+    from streamlit.runtime.state import SessionStateProxy
+
+
+def _notify(level: str, message: str) -> None:
+    """画面にメッセージを表示（streamlit はセッション状態の操作だけでは不要なため、表示時に読み込む）"""
+    import streamlit as st
+
+    getattr(st, level)(message)
 
 
 class Storage:
-    """セッション状態を管理するクラス"""
+    """
+    セッション状態を管理するクラス
+    ・値は st.session_state ではなく全セッション共有の SessionStore に保存し、メモリ予算を超えるとディスクに退避する
+    ・st.session_state にはセッションIDのみを保持する
+    """
     
     # キー定義
     class Key(Enum):
@@ -26,51 +47,79 @@ class Storage:
         LUDWIK_LAW = "key_ludwik_law"
         SWIFT_LAW = "key_swift_law"
         VOCE_LAW = "key_voce_law"
-        EXPORT_LUDWIK_DATA = "key_export_ludwik_data"
-        EXPORT_SWIFT_DATA = "key_export_swift_data"
-        EXPORT_VOCE_DATA = "key_export_voce_data"
+        EXPORT_DATA = "key_export_data"
+        UPLOAD_ID = "key_upload_id"
+        LIVE_FITTER = "key_live_fitter"
+        LIVE_FIT_RESULT = "key_live_fit_result"
+        FIT_WINDOW = "key_fit_window"
+        BOOTSTRAP = "key_bootstrap"
+
+    # 硬化則名と保存先キー・表示名の対応
+    LAW_KEYS = {
+        "ludwik": Key.LUDWIK_LAW,
+        "swift": Key.SWIFT_LAW,
+        "voce": Key.VOCE_LAW,
+    }
+    LAW_LABELS = {
+        "ludwik": "Ludwik則",
+        "swift": "Swift則",
+        "voce": "Voce則",
+    }
     
-    def __init__(self, state: SessionStateProxy):
+    def __init__(self, state: "SessionStateProxy", store: Optional[SessionStore] = None):
         self.state = state
-        # 必要に応じて初期化
-        self._initialize_keys()
-    
-    def _initialize_keys(self):
-        """必要なキーを初期化"""
-        for key in self.Key:
-            if key not in self.state:
-                self.state[key] = None
+        self.store = store or get_session_store()
+        if SESSION_ID_KEY not in self.state:
+            self.state[SESSION_ID_KEY] = uuid.uuid4().hex[:12]
+        self.session_id = self.state[SESSION_ID_KEY]
     
     def init_state(self, key: Key, value: Any) -> None:
         """キーを初期化"""
-        if key not in self.state:
-          self.state[key] = None
+        if not self.store.contains(self.session_id, key):
+            self.store.put(self.session_id, key, None)
 
     def set_state(self, key: Key, value: Any, *, do_init: bool = False) -> None:
         """セッションに値を保存"""
         if do_init:
             self.init_state(key, value)
         
-        self.state[key] = value
+        self.store.put(self.session_id, key, value)
     
     def get_state(self, key: str) -> Any:
         """セッションから値を取得"""
-        return self.state.get(key, None)
+        return self.store.get(self.session_id, key)
+
+    def memory_usage(self) -> List[Dict[str, Any]]:
+        """このセッションのキーごとのメモリ使用量"""
+        return self.store.usage(self.session_id)
     
     # イベントハンドラ
+    @instrumented("storage.on_file_uploaded")
     def on_file_uploaded(self, uploaded_file: str) -> None:
-        """ファイルアップロード処理"""
+        """
+        ファイルアップロード処理
+        ・読み込み済みのファイルであれば何もしない（再実行のたびに再パースしない）
+        ・同じ内容のファイルはセッション間で共有するキャッシュから取得
+        ・大きなファイルはプレビューのみ読み込み、列データは列選択後に必要な列だけ読み込む
+        """
         if uploaded_file is None:
             return
+
+        file_id = upload_id(uploaded_file)
+        if file_id is not None and file_id == self.get_state(self.Key.UPLOAD_ID):
+            return
             
         try:
-            df = pd.read_csv(uploaded_file)
-            raw_data = RawData(df=df)
+            digest, raw_data = ingest_upload(uploaded_file)
+            if file_id is None and digest == self.get_state(self.Key.UPLOAD_ID):
+                return
             self.set_state(self.Key.RAW_DATA, raw_data, do_init=True)
+            self.set_state(self.Key.UPLOAD_ID, file_id or digest, do_init=True)
         except Exception as e:
-            # エラー処理
-            pass
+            log_exception("ファイルの読み込みに失敗しました", e, file_id=file_id)
+            _notify("error", f"ファイルの読み込みに失敗しました: {e}")
     
+    @instrumented("storage.on_raw_data_columns_selected")
     def on_raw_data_columns_selected(self, epsilon_col, sigma_col, is_percent, young_modulus, yield_stress) -> None:
         """カラム選択処理"""
         raw_data = self.get_state(self.Key.RAW_DATA)
@@ -83,65 +132,127 @@ class Storage:
         raw_data.is_strain_percent = is_percent
         raw_data.young_modulus = young_modulus
         raw_data.yield_stress = yield_stress
-        self.set_state(self.Key.RAW_DATA, raw_data, do_init=True) 
         
         # 曲線データを作成して保存
         try:
+            raw_data.load_columns()
             curve = StressStrainCurve(
                 nominal_strain=raw_data.strain_col,
                 nominal_stress=raw_data.stress_col,
                 young_modulus=raw_data.young_modulus,
-                yield_stress=raw_data.yield_stress
+                yield_stress=raw_data.yield_stress,
+                dtype=raw_data.dtype
             )
             self.set_state(self.Key.SS_CURVE, curve, do_init=True)
         except Exception as e:
-            # エラー処理
-            pass
+            log_exception("応力ひずみ曲線の作成に失敗しました", e, epsilon_column=epsilon_col, sigma_column=sigma_col)
+            _notify("error", f"応力ひずみ曲線の作成に失敗しました: {e}")
+        # 列の読み込み後に保存（保存後に変更するとディスクに退避された値と食い違うため）
+        self.set_state(self.Key.RAW_DATA, raw_data, do_init=True)
         
+    @instrumented("storage.fit_curve_with_settings")
     def fit_curve_with_settings(self, settings: FitSettings) -> None:
         """フィッティング処理"""
         # 設定の保存
         try:
             self.set_state(self.Key.FIT_SETTINGS, settings, do_init=True)
         except Exception as e:
-            # エラー処理
-            st.error(f"フィッティング設定の保存に失敗しました: {e}")
-            pass
+            log_exception("フィッティング設定の保存に失敗しました", e)
+            _notify("error", f"フィッティング設定の保存に失敗しました: {e}")
         
         # フィッティング
         ss_curve = self.get_state(self.Key.SS_CURVE)
         if ss_curve is None:
             return
-        
-        try:
-            fitted_ludwik_curve = fit_ludwik_curve(ss_curve, settings)
-            self.set_state(self.Key.LUDWIK_LAW, fitted_ludwik_curve, do_init=True)
-        except Exception as e:
-            # エラー処理
-            st.error(f"Ludwik則のフィッティングに失敗しました: {e}")
-            pass
 
+        # 各硬化則を並行にフィッティングし、終わったものから保存
+        # 同じ曲線・設定の結果はキャッシュから取得
+        # 時間切れ・失敗した硬化則は前回の結果を残さない（別の範囲・設定の結果を表示しないため）
+        for outcome in fit_laws_concurrently(ss_curve, settings, cache=get_fit_cache()):
+            label = self.LAW_LABELS.get(outcome.law, outcome.law)
+            self.set_state(self.LAW_KEYS[outcome.law], outcome.model if outcome.status == "ok" else None, do_init=True)
+            if outcome.status == "ok":
+                continue
+            if outcome.status == "timeout":
+                _notify("warning", f"{label}のフィッティングが制限時間（{settings.timeout:g}秒）内に終わりませんでした")
+            else:
+                _notify("error", f"{label}のフィッティングに失敗しました: {outcome.error}")
+
+    @instrumented("storage.on_fit_range_changed")
+    def on_fit_range_changed(self, settings: FitSettings) -> None:
+        """
+        ライブフィッティング: フィット範囲の変更をバックグラウンドのフィッティングに要求
+        ・曲線が変わった場合はフィッター（前回のパラメータ・前計算）を作り直す
+        ・完了済みの最新結果があれば保存する
+        """
+        ss_curve = self.get_state(self.Key.SS_CURVE)
+        if ss_curve is None:
+            return
+        fitter = self.get_state(self.Key.LIVE_FITTER)
+        if fitter is None or fitter.curve is not ss_curve:
+            fitter = LiveFitter(ss_curve)
+            self.set_state(self.Key.LIVE_FITTER, fitter, do_init=True)
+        fitter.submit(settings)
+        self.set_state(self.Key.FIT_SETTINGS, settings, do_init=True)
+        self.collect_live_fit()
+
+    def collect_live_fit(self) -> Tuple[Optional[LiveFitResult], bool]:
+        """
+        ライブフィッティングの最新結果を取得し、未保存なら硬化則の結果として保存
+        ・(最新結果, 今回保存したかどうか) を返す
+        """
+        fitter = self.get_state(self.Key.LIVE_FITTER)
+        result = fitter.latest() if fitter is not None else None
+        if result is None or result is self.get_state(self.Key.LIVE_FIT_RESULT):
+            return result, False
+        for law, model in result.models.items():
+            self.set_state(self.LAW_KEYS[law], model, do_init=True)
+        self.set_state(self.Key.LIVE_FIT_RESULT, result, do_init=True)
+        return result, True
+
+    @instrumented("storage.on_fit_window_search")
+    def on_fit_window_search(self, min_span: float) -> None:
+        """フィット範囲の自動探索（結果は曲線ごとにキャッシュ）"""
+        ss_curve = self.get_state(self.Key.SS_CURVE)
+        if ss_curve is None:
+            return
         try:
-            fitted_swift_curve = fit_swift_curve(ss_curve, settings)
-            self.set_state(self.Key.SWIFT_LAW, fitted_swift_curve, do_init=True)
+            result = ss_curve.cached(f"fit_window:{min_span:g}", lambda: search_fit_window(ss_curve, min_span=min_span))
+            self.set_state(self.Key.FIT_WINDOW, result, do_init=True)
         except Exception as e:
-            # エラー処理
-            st.error(f"Swift則のフィッティングに失敗しました: {e}")
-            pass
+            log_exception("フィット範囲の探索に失敗しました", e, min_span=min_span)
+            _notify("error", f"フィット範囲の探索に失敗しました: {e}")
 
+    @instrumented("storage.on_bootstrap_requested")
+    def on_bootstrap_requested(self, num_replicates: int, method: str) -> None:
+        """フィッティング済みの各硬化則のパラメータの不確かさをブートストラップ法で評価"""
+        ss_curve = self.get_state(self.Key.SS_CURVE)
+        settings = self.get_state(self.Key.FIT_SETTINGS)
+        laws = {law: self.get_state(key) for law, key in self.LAW_KEYS.items()}
+        laws = {law: model for law, model in laws.items() if model is not None}
+        if ss_curve is None or settings is None or not laws:
+            return
         try:
-            fitted_voce_curve = fit_voce_curve(ss_curve, settings)
-            self.set_state(self.Key.VOCE_LAW, fitted_voce_curve, do_init=True)
+            x_data, y_data = get_fit_data(ss_curve, settings)
+            results = bootstrap_laws(laws, x_data, y_data, num_replicates=num_replicates, method=method)
+            self.set_state(self.Key.BOOTSTRAP, results, do_init=True)
         except Exception as e:
-            # エラー処理
-            st.error(f"Voce則のフィッティングに失敗しました: {e}")
-            pass
+            log_exception("ブートストラップ法による評価に失敗しました", e, num_replicates=num_replicates, method=method)
+            _notify("error", f"ブートストラップ法による評価に失敗しました: {e}")
 
+    def current_bootstrap(self) -> Dict[str, Any]:
+        """現在の硬化則の結果に対応するブートストラップ結果のみを取得（再フィッティング後の古い結果は除く）"""
+        results = self.get_state(self.Key.BOOTSTRAP) or {}
+        current = {}
+        for law, result in results.items():
+            model = self.get_state(self.LAW_KEYS[law])
+            if model is not None and model.params == result.params and model.yield_stress == result.yield_stress:
+                current[law] = result
+        return current
 
-    def update_export_data(self, export_ludwik_data: pd.DataFrame, export_swift_data: pd.DataFrame, export_voce_data: pd.DataFrame) -> None:
-        """エクスポートデータの更新"""
-        if export_ludwik_data is None or export_swift_data is None or export_voce_data is None:
+    @instrumented("storage.update_export_data")
+    def update_export_data(self, export_data: pd.DataFrame) -> None:
+        """エクスポートデータ（strain と硬化則ごとの応力の列）の更新"""
+        if export_data is None:
             return
-        self.set_state(self.Key.EXPORT_LUDWIK_DATA, export_ludwik_data, do_init=True)
-        self.set_state(self.Key.EXPORT_SWIFT_DATA, export_swift_data, do_init=True)
-        self.set_state(self.Key.EXPORT_VOCE_DATA, export_voce_data, do_init=True)
+        self.set_state(self.Key.EXPORT_DATA, export_data, do_init=True)
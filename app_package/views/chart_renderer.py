@@ -0,0 +1,123 @@
+import hashlib
+import io
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+import streamlit as st
+import pandas as pd
+
+from ..services.cache import LRUCache
+
+if TYPE_CHECKING:
+    from matplotlib.axes import Axes
+    from matplotlib.figure import Figure
+
+
+# 描画バックエンド
+BACKEND_MATPLOTLIB = "matplotlib"
+BACKEND_CLIENT = "streamlit"
+BACKEND_LABELS = {
+    BACKEND_MATPLOTLIB: "matplotlib（画像）",
+    BACKEND_CLIENT: "Streamlit（ブラウザ描画・軽量）",
+}
+
+# 描画済み画像(PNG)のキャッシュ（セッション間で共有）
+_image_cache = LRUCache(max_entries=64, max_bytes=64 * 1024 * 1024, sizeof=len)
+
+
+def render_backend_selector() -> None:
+    """サイドバーに描画バックエンドの選択を表示"""
+    st.sidebar.selectbox(
+        "グラフの描画方法",
+        list(BACKEND_LABELS),
+        format_func=BACKEND_LABELS.get,
+        key="chart_backend"
+    )
+
+
+def get_backend() -> str:
+    """選択中の描画バックエンド"""
+    return st.session_state.get("chart_backend", BACKEND_MATPLOTLIB)
+
+
+@contextmanager
+def managed_figure(figsize: Tuple[float, float] = (10, 6)) -> Iterator[Tuple["Figure", "Axes"]]:
+    """
+    pyplot の図を作成し、使用後に必ず閉じる
+    ・matplotlib は読み込みが重いため、画像の描画が必要になった時点で初めて読み込む
+    """
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=figsize)
+    try:
+        yield fig, ax
+    finally:
+        plt.close(fig)
+
+
+def chart_key(name: str, frames: Sequence[pd.DataFrame], options: Dict) -> str:
+    """グラフ名・データ・描画オプションから画像キャッシュのキーを作成"""
+    digest = hashlib.sha256(name.encode())
+    for frame in frames:
+        digest.update(repr(list(frame.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    digest.update(repr(sorted(options.items())).encode())
+    return digest.hexdigest()
+
+
+def long_frame(series: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """系列名→(x, y) 2列のデータフレームを、ブラウザ描画用の縦長形式 (x, y, series) に変換"""
+    return pd.concat([
+        pd.DataFrame({"x": df.iloc[:, 0].to_numpy(), "y": df.iloc[:, 1].to_numpy(), "series": label})
+        for label, df in series.items()
+    ], ignore_index=True)
+
+
+def show_chart(
+        name: str,
+        draw: Callable[["Axes"], None],
+        series: Dict[str, pd.DataFrame],
+        x_label: str = "",
+        y_label: str = "",
+        options: Optional[Dict] = None,
+        figsize: Tuple[float, float] = (10, 6),
+        dpi: int = 100,
+) -> None:
+    """
+    グラフを表示
+    ・matplotlib の場合は描画した PNG をデータとオプションのハッシュでキャッシュし、
+      データが変わらない限り再描画しない（図は描画後すぐに閉じる）
+    ・ブラウザ描画の場合は series をそのまま st.line_chart に渡す
+    """
+    if get_backend() == BACKEND_CLIENT:
+        st.line_chart(long_frame(series), x="x", y="y", color="series", x_label=x_label, y_label=y_label)
+        return
+
+    st.image(cached_png(name, draw, list(series.values()), options, figsize, dpi))
+
+
+def cached_png(
+        name: str,
+        draw: Callable[["Axes"], None],
+        frames: Sequence[pd.DataFrame],
+        options: Optional[Dict] = None,
+        figsize: Tuple[float, float] = (10, 6),
+        dpi: int = 100,
+) -> bytes:
+    """matplotlib で描画した PNG（データとオプションのハッシュでキャッシュ）"""
+    options = dict(options or {}, figsize=figsize, dpi=dpi)
+    key = chart_key(name, frames, options)
+    png = _image_cache.get(key)
+    if png is None:
+        with managed_figure(figsize) as (fig, ax):
+            draw(ax)
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format="png", dpi=dpi)
+            png = buffer.getvalue()
+        _image_cache.put(key, png)
+    return png
+
+
+def image_cache_stats() -> Dict[str, int]:
+    """画像キャッシュのヒット・ミス回数"""
+    return _image_cache.stats()
@@ -1,11 +1,23 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
+from typing import Dict, Optional
 
 from ..models.stress_strain_curve import StressStrainCurve
 from ..models.ludwik_law import LudwikLaw
 from ..models.swift_law import SwiftLaw
 from ..storage import Storage
+from ..services.bootstrap import BootstrapResult, summary_rows
+from ..services.downsample import get_display_data
+from ..services.export import build_adaptive_export_frame, build_export_frame, law_frame
+from .chart_renderer import show_chart
+
+
+# 硬化則ごとの表示名と線の色
+LAW_STYLES = {
+    "ludwik": ("Ludwik", "blue"),
+    "swift": ("Swift", "red"),
+    "voce": ("Voce", "green"),
+}
 
 
 def render(storage: Storage):
@@ -15,58 +27,43 @@ def render(storage: Storage):
     """
     # データの取得
     ss_curve = storage.get_state(storage.Key.SS_CURVE)
-    fitted_ludwik_curve = storage.get_state(storage.Key.LUDWIK_LAW)
-    fitted_swift_curve = storage.get_state(storage.Key.SWIFT_LAW)
-    fitted_voce_curve = storage.get_state(storage.Key.VOCE_LAW)
-    if fitted_ludwik_curve is None or ss_curve is None:
+    laws = {law: storage.get_state(key) for law, key in storage.LAW_KEYS.items()}
+    laws = {law: model for law, model in laws.items() if model is not None}
+    if ss_curve is None or not laws:
         return
     
     st.subheader("フィッティング結果")
 
     # グラフ表示
-    # 元データ取得
-    plastic_df = ss_curve.get_plastic_data()
+    # 元データ取得（描画用に間引いたデータ）
+    plastic_df = get_display_data(ss_curve, "plastic")
 
-    # フィッティング曲線のデータ取得
+    # フィッティング曲線のデータ取得（共通のひずみ格子で全硬化則を評価）
     strain_range = (0.0, 0.1)
     num_points = 20
     detail_range = (0.0, 0.05)
     detail_points = 50
-    ludwik_df = fitted_ludwik_curve.get_plot_data(strain_range, num_points, detail_range, detail_points)
-    swift_df = fitted_swift_curve.get_plot_data(strain_range, num_points, detail_range, detail_points)
-    voce_df = fitted_voce_curve.get_plot_data(strain_range, num_points, detail_range, detail_points)
-
-    plot_plastic_curve(plastic_df, ludwik_df, swift_df, voce_df)
-
-    # フィッティング結果表示
-    ludwik_result = (
-        f"### Ludwik則\n"
-        f"- **k** = {fitted_ludwik_curve.k:.3f}\n"
-        f"- **n** = {fitted_ludwik_curve.n:.3f}\n"
-        f"- **R²** = {fitted_ludwik_curve.calculate_r_squared(ss_curve.plastic_strain, ss_curve.true_stress):.3f}"
-    )
-    
-    swift_result = (
-        f"### Swift則\n"
-        f"- **alpha** = {fitted_swift_curve.alpha:.3f}\n"
-        f"- **n** = {fitted_swift_curve.n:.3f}\n"
-        f"- **R²** = {fitted_swift_curve.calculate_r_squared(ss_curve.plastic_strain, ss_curve.true_stress):.3f}"
-    )
-
-    voce_result = (
-        f"### Voce則\n"
-        f"- **stress_infinite** = {fitted_voce_curve.stress_infinite:.3f}\n"
-        f"- **h** = {fitted_voce_curve.h:.3f}\n"
-        f"- **R²** = {fitted_voce_curve.calculate_r_squared(ss_curve.plastic_strain, ss_curve.true_stress):.3f}"
-    )
-
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.markdown(ludwik_result)
-    with col2:
-        st.markdown(swift_result)
-    with col3:
-        st.markdown(voce_result)
+    curves_df = build_export_frame(laws, strain_range, num_points, detail_range, detail_points)
+
+    # パラメータの不確かさ（ブートストラップ法）
+    confidence = render_uncertainty_settings(storage)
+    bootstrap = storage.current_bootstrap()
+    bands = {name: result.bands(curves_df["strain"].to_numpy(), confidence) for name, result in bootstrap.items()}
+
+    plot_plastic_curve(plastic_df, curves_df, bands)
+    if bootstrap:
+        display_uncertainty_table(bootstrap, laws, confidence)
+
+    # フィッティング結果表示（時間切れ・失敗した硬化則は結果なし）
+    for column, (law, label) in zip(st.columns(len(storage.LAW_LABELS)), storage.LAW_LABELS.items()):
+        with column:
+            model = laws.get(law)
+            if model is None:
+                st.markdown(f"### {label}\n- 結果なし（時間切れまたは失敗）")
+                continue
+            r_squared = model.calculate_r_squared(ss_curve.plastic_strain, ss_curve.true_stress)
+            lines = [f"- **{name}** = {value:.3f}" for name, value in zip(model.param_names, model.params)]
+            st.markdown("\n".join([f"### {label}", *lines, f"- **R²** = {r_squared:.3f}"]))
 
     # CSVエクスポート設定
     st.subheader("CSVエクスポート設定")
@@ -82,156 +79,222 @@ def render(storage: Storage):
         key="export_strain_range"
     )
 
-    # データ数
-    num_points = st.number_input(
-        "データ数",
-        min_value=10,
-        max_value=1000,
-        value=20,
-        step=1,
-        key="export_num_points"
-    )
-    
-    # 詳細データ範囲
-    detail_strain_range = st.slider(
-        "詳細データ範囲 (ε の範囲)",
-        min_value=0.0,
-        max_value=1.0,
-        value=(0.0, 0.05),
-        step=0.001,
-        format="%.3f",
-        key="export_detail_strain_range"
+    # サンプリング方法（適応: 指定した応力誤差以内で硬化則を再現する最小限の点列）
+    sampling_mode = st.radio(
+        "サンプリング方法",
+        ["均等", "適応"],
+        horizontal=True,
+        help="適応: 曲率の大きい範囲ほど点を密にし、許容応力誤差以内で硬化則を再現する点列を出力",
+        key="export_sampling_mode"
     )
 
-    # 詳細データ数
-    detail_points = st.number_input(
-        "詳細データ数",
-        min_value=10,
-        max_value=1000,
-        value=50,
-        step=1,
-        key="export_detail_points"
-    )
+    if sampling_mode == "均等":
+        # データ数
+        num_points = st.number_input(
+            "データ数",
+            min_value=10,
+            max_value=1000,
+            value=20,
+            step=1,
+            key="export_num_points"
+        )
+    
+        # 詳細データ範囲
+        detail_strain_range = st.slider(
+            "詳細データ範囲 (ε の範囲)",
+            min_value=0.0,
+            max_value=1.0,
+            value=(0.0, 0.05),
+            step=0.001,
+            format="%.3f",
+            key="export_detail_strain_range"
+        )
+
+        # 詳細データ数
+        detail_points = st.number_input(
+            "詳細データ数",
+            min_value=10,
+            max_value=1000,
+            value=50,
+            step=1,
+            key="export_detail_points"
+        )
+    else:
+        # 許容応力誤差
+        tolerance = st.number_input(
+            "許容応力誤差[MPa]",
+            min_value=0.001,
+            value=1.0,
+            step=0.1,
+            format="%.3f",
+            key="export_tolerance"
+        )
 
     if st.button("データ設定の更新"):
-        export_ludwik_df = fitted_ludwik_curve.get_plot_data(all_strain_range, num_points, detail_strain_range, detail_points)
-        export_swift_df = fitted_swift_curve.get_plot_data(all_strain_range, num_points, detail_strain_range, detail_points)
-        export_voce_df = fitted_voce_curve.get_plot_data(all_strain_range, num_points, detail_strain_range, detail_points)
-        storage.update_export_data(export_ludwik_df, export_swift_df, export_voce_df)
+        if sampling_mode == "均等":
+            export_df = build_export_frame(laws, all_strain_range, num_points, detail_strain_range, detail_points)
+        else:
+            export_df = build_adaptive_export_frame(laws, all_strain_range, tolerance)
+        storage.update_export_data(export_df)
         st.success("データ設定を更新しました")
 
     # エクスポートデータのプレビュー
     st.subheader("エクスポートデータのプレビュー")
-    export_ludwik_df = storage.get_state(storage.Key.EXPORT_LUDWIK_DATA)
-    export_swift_df = storage.get_state(storage.Key.EXPORT_SWIFT_DATA)
-    export_voce_df = storage.get_state(storage.Key.EXPORT_VOCE_DATA)
-    if export_ludwik_df is None or export_swift_df is None or export_voce_df is None:
+    export_df = storage.get_state(storage.Key.EXPORT_DATA)
+    if export_df is None:
         return
     
     # エクスポートデータのテーブル表示
-    # st.dataframe(export_ludwik_df)
-    # st.dataframe(export_swift_df)
+    # st.dataframe(export_df)
 
     # エクスポートデータのグラフ表示
-    plot_export_data(export_ludwik_df, export_swift_df, export_voce_df)
+    plot_export_data(export_df)
 
-    # CSVダウンロード
-    csv_ludwik = export_ludwik_df.to_csv(index=False)
+    # CSVダウンロード（全硬化則をまとめたCSVと、硬化則ごとのCSV）
     st.download_button(
-        "Ludwik則のCSVダウンロード",
-        csv_ludwik,
-        file_name="ludwik_law_data.csv",
-        mime="text/csv"
-    )
-    csv_swift = export_swift_df.to_csv(index=False)
-    st.download_button(
-        "Swift則のCSVダウンロード",
-        csv_swift,
-        file_name="swift_law_data.csv",
-        mime="text/csv"
-    )
-    csv_voce = export_voce_df.to_csv(index=False)
-    st.download_button(
-        "Voce則のCSVダウンロード",
-        csv_voce,
-        file_name="voce_law_data.csv",
+        "全硬化則のCSVダウンロード",
+        export_df.to_csv(index=False),
+        file_name="hardening_law_data.csv",
         mime="text/csv"
     )
+    for name in export_df.columns[1:]:
+        label = LAW_STYLES.get(name, (name, None))[0]
+        st.download_button(
+            f"{label}則のCSVダウンロード",
+            law_frame(export_df, name).to_csv(index=False),
+            file_name=f"{name}_law_data.csv",
+            mime="text/csv"
+        )
 
 
-def plot_plastic_curve(plastic_df: pd.DataFrame, ludwik_df: pd.DataFrame, swift_df: pd.DataFrame, voce_df: pd.DataFrame):
-    """塑性ひずみ-真応力曲線のグラフを表示"""
+def render_uncertainty_settings(storage: Storage) -> float:
+    """
+    ・ブートストラップ法の反復回数・再標本化の方法・信頼水準の入力
+    ・「信頼区間を計算」で storage.on_bootstrap_requested を呼び出す
+    ・信頼水準を返す
+    """
+    with st.expander("パラメータの不確かさ（ブートストラップ法）"):
+        num_replicates = st.number_input(
+            "反復回数", min_value=100, max_value=20000, value=2000, step=100, key="bootstrap_replicates"
+        )
+        method = st.radio(
+            "再標本化の方法",
+            ["residual", "pairs"],
+            format_func={"residual": "残差の再標本化", "pairs": "データ点の再標本化"}.get,
+            horizontal=True,
+            key="bootstrap_method"
+        )
+        confidence = st.slider("信頼水準", min_value=0.5, max_value=0.99, value=0.95, step=0.01, key="bootstrap_confidence")
+        if st.button("信頼区間を計算", key="run_bootstrap"):
+            storage.on_bootstrap_requested(num_replicates, method)
+    return confidence
+
+
+def display_uncertainty_table(bootstrap: Dict[str, BootstrapResult], laws: Dict, confidence: float):
+    """パラメータの推定値・標準誤差・信頼区間の表（curve_fit の共分散からの標準誤差も併記）"""
+    rows = summary_rows(bootstrap, confidence)
+    for row in rows:
+        errors = laws[row["law"]].standard_errors
+        names = laws[row["law"]].param_names
+        row["std_error_asymptotic"] = errors[names.index(row["param"])] if errors is not None else None
+        row["law"] = LAW_STYLES.get(row["law"], (row["law"], None))[0]
+    elapsed = sum(result.elapsed for result in bootstrap.values())
+    st.caption(f"{int(confidence * 100)}% 信頼区間（パーセンタイル法、計算時間 {elapsed:.1f} 秒）")
+    columns = ["law", "param", "estimate", "std_error", "std_error_asymptotic", "lower", "upper", "converged", "replicates"]
+    st.dataframe(pd.DataFrame(rows, columns=columns).rename(columns={
+        "law": "硬化則",
+        "param": "パラメータ",
+        "estimate": "推定値",
+        "std_error": "標準誤差",
+        "std_error_asymptotic": "標準誤差（漸近）",
+        "lower": "下限",
+        "upper": "上限",
+        "converged": "収束数",
+        "replicates": "反復回数",
+    }), hide_index=True)
+
+
+def plot_plastic_curve(plastic_df: pd.DataFrame, curves_df: pd.DataFrame, bands: Optional[Dict[str, pd.DataFrame]] = None):
+    """
+    塑性ひずみ-真応力曲線のグラフを表示
+    ・bands がある硬化則は信頼区間（濃い帯）と予測区間（薄い帯）を重ねて表示
+    """
+    bands = bands or {}
 
     # グラフ設定
-    fig, ax = plt.subplots(figsize=(10, 6))
     marker_size = 3
     line_width = 1.5
     
-    # 塑性ひずみ-真応力曲線
-    ax.plot(plastic_df[f"{plastic_df.columns[0]}"], 
-            plastic_df[f"{plastic_df.columns[1]}"], 
-            'o-', markersize=marker_size*2, linewidth=line_width*3, 
-            color='gray', label="Experimental")
-    
-    ax.plot(ludwik_df[f"{ludwik_df.columns[0]}"], 
-            ludwik_df[f"{ludwik_df.columns[1]}"], 
-            '--', markersize=marker_size, linewidth=line_width, 
-            color='blue', label="Ludwik")
-    
-    ax.plot(swift_df[f"{swift_df.columns[0]}"], 
-            swift_df[f"{swift_df.columns[1]}"], 
-            '--', markersize=marker_size, linewidth=line_width, 
-            color='red', label="Swift")
-
-    ax.plot(voce_df[f"{voce_df.columns[0]}"], 
-            voce_df[f"{voce_df.columns[1]}"], 
-            '--', markersize=marker_size, linewidth=line_width, 
-            color='green', label="Voce")
-            
-    # 軸とグリッドの設定
-    ax.set_xlabel(f"{plastic_df.columns[0]}")
-    ax.set_ylabel(f"{plastic_df.columns[1]}")
-    ax.set_xlim(left=0)
-    ax.set_ylim(bottom=0)
-    ax.grid(True, linestyle='--', alpha=0.7)
-    ax.legend()
+    def draw(ax):
+        # 塑性ひずみ-真応力曲線
+        ax.plot(plastic_df[f"{plastic_df.columns[0]}"], 
+                plastic_df[f"{plastic_df.columns[1]}"], 
+                'o-', markersize=marker_size*2, linewidth=line_width*3, 
+                color='gray', label="Experimental")
+        
+        # フィッティング曲線
+        for name in curves_df.columns[1:]:
+            label, color = LAW_STYLES.get(name, (name, None))
+            ax.plot(curves_df["strain"], 
+                    curves_df[name], 
+                    '--', markersize=marker_size, linewidth=line_width, 
+                    color=color, label=label)
+
+        # 信頼区間・予測区間
+        for name, band in bands.items():
+            label, color = LAW_STYLES.get(name, (name, None))
+            ax.fill_between(band["strain"], band["prediction_lower"], band["prediction_upper"],
+                            color=color, alpha=0.08, linewidth=0)
+            ax.fill_between(band["strain"], band["lower"], band["upper"],
+                            color=color, alpha=0.3, linewidth=0, label=f"{label} CI")
+                
+        # 軸とグリッドの設定
+        ax.set_xlabel(f"{plastic_df.columns[0]}")
+        ax.set_ylabel(f"{plastic_df.columns[1]}")
+        ax.set_xlim(left=0)
+        ax.set_ylim(bottom=0)
+        ax.grid(True, linestyle='--', alpha=0.7)
+        ax.legend()
     
-    # グラフ表示
-    st.pyplot(fig)
+    # グラフ表示（描画済みの画像はデータが変わるまで再利用）
+    series = {"Experimental": plastic_df}
+    series.update({LAW_STYLES.get(name, (name, None))[0]: law_frame(curves_df, name) for name in curves_df.columns[1:]})
+    for name, band in bands.items():
+        label = LAW_STYLES.get(name, (name, None))[0]
+        for column in ("prediction_lower", "lower", "upper", "prediction_upper"):
+            series[f"{label} {column}"] = band[["strain", column]]
+    show_chart(
+        "fit_plastic", draw, series,
+        x_label=plastic_df.columns[0], y_label=plastic_df.columns[1]
+    )
 
 
-def plot_export_data(export_ludwik_df: pd.DataFrame, export_swift_df: pd.DataFrame, export_voce_df: pd.DataFrame):
+def plot_export_data(export_df: pd.DataFrame):
     """エクスポートデータのグラフを表示"""
     # グラフ設定
-    fig, ax = plt.subplots(figsize=(10, 6))
     marker_size = 2
     line_width = 1
     
-    # 塑性ひずみ-真応力曲線   
-    ax.plot(export_ludwik_df["strain"], 
-            export_ludwik_df["stress"], 
-            'o-', markersize=marker_size, linewidth=line_width, 
-            color='blue', label="Ludwik" )
-    ax.plot(export_swift_df["strain"], 
-            export_swift_df["stress"], 
-            'o-', markersize=marker_size, linewidth=line_width, 
-            color='red', label="Swift")
-    ax.plot(export_voce_df["strain"], 
-            export_voce_df["stress"], 
-            'o-', markersize=marker_size, linewidth=line_width, 
-            color='green', label="Voce")
-            
-    # 軸とグリッドの設定
-    ax.set_xlabel(f"{export_ludwik_df.columns[0]}")
-    ax.set_ylabel(f"{export_ludwik_df.columns[1]}")
-    ax.set_xlim(left=0)
-    ax.set_ylim(bottom=0)
-    ax.grid(True, linestyle='--', alpha=0.7)
-    ax.legend()
+    def draw(ax):
+        # 塑性ひずみ-真応力曲線   
+        for name in export_df.columns[1:]:
+            label, color = LAW_STYLES.get(name, (name, None))
+            ax.plot(export_df["strain"], 
+                    export_df[name], 
+                    'o-', markersize=marker_size, linewidth=line_width, 
+                    color=color, label=label)
+                
+        # 軸とグリッドの設定
+        ax.set_xlabel("strain")
+        ax.set_ylabel("stress")
+        ax.set_xlim(left=0)
+        ax.set_ylim(bottom=0)
+        ax.grid(True, linestyle='--', alpha=0.7)
+        ax.legend()
     
-    # グラフ表示
-    st.pyplot(fig)
-
+    # グラフ表示（描画済みの画像はデータが変わるまで再利用）
+    series = {LAW_STYLES.get(name, (name, None))[0]: law_frame(export_df, name) for name in export_df.columns[1:]}
+    show_chart("export", draw, series, x_label="strain", y_label="stress")
 
 
 
@@ -1,7 +1,11 @@
+import numpy as np
+import pandas as pd
 import streamlit as st
 
 from ..models.fit_settings import FitSettings
+from ..services.fit_window import WindowSearchResult
 from ..storage import Storage
+from .chart_renderer import cached_png
 
 
 def render(storage: Storage):
@@ -9,6 +13,8 @@ def render(storage: Storage):
     ・アップロード済みデータがなければ何もしない
     ・フィット範囲スライダー、初期推定値入力などを提供
     ・「フィッティング実行」ボタンでstorage.on_fit_settings_changed を呼び出す
+    ・ライブフィッティングが有効な場合は、フィット範囲の変更ごとに storage.on_fit_range_changed を呼び出す
+    ・フィット範囲の自動探索（storage.on_fit_window_search）と、その結果の適用
     """
     # データの取得
     ss_curve = storage.get_state(storage.Key.SS_CURVE)
@@ -24,28 +30,150 @@ def render(storage: Storage):
     default_max = strain_max
     step = 0.001
     
+    # 自動探索の結果をセッション状態経由で設定するため、初期値もセッション状態で与える
+    # 曲線が変わった場合は初期値に戻し、それ以外も新しいスライダーの範囲に収める
+    curve_hash = ss_curve.content_hash()
+    if st.session_state.get("fit_range_curve") != curve_hash or "fit_range" not in st.session_state:
+        st.session_state["fit_range_curve"] = curve_hash
+        st.session_state["fit_range"] = (default_min, default_max)
+    lo, hi = np.clip(st.session_state["fit_range"], strain_min, strain_max)
+    st.session_state["fit_range"] = (float(lo), float(hi))
     lo, hi = st.slider(
         "フィット範囲 (ε の範囲)",
         min_value=strain_min,
         max_value=strain_max,
-        value=(default_min, default_max),
         step=step,
         format="%.3f",
         key="fit_range"
     )
 
-    # 初期推定値
-    k0 = st.number_input("初期推定 k", value=1.0, step=0.1, key="initial_k")
-    n0 = st.number_input("初期推定 n", value=0.2, step=0.01, key="initial_n")
+    # フィット範囲の自動探索
+    with st.expander("フィット範囲の自動探索"):
+        min_span = st.number_input(
+            "最小の範囲幅（塑性域のひずみ幅に対する割合）",
+            min_value=0.05, max_value=1.0, value=0.3, step=0.05, key="fit_window_min_span"
+        )
+        if st.button("最適なフィット範囲を探索", key="search_fit_window"):
+            storage.on_fit_window_search(min_span)
+        window = storage.get_state(storage.Key.FIT_WINDOW)
+        if window is not None:
+            render_fit_window(window, strain_min, strain_max)
+
+    # 初期推定値（自動の場合はデータから推定、または同じ材料の前回結果を使用）
+    auto_initial_guess = st.checkbox("初期推定値をデータから自動で決定", value=True, key="auto_initial_guess")
+    initial_guess = None
+    if not auto_initial_guess:
+        k0 = st.number_input("初期推定 k", value=1.0, step=0.1, key="initial_k")
+        n0 = st.number_input("初期推定 n", value=0.2, step=0.01, key="initial_n")
+        initial_guess = (k0, n0)
+    material = st.text_input("材料名（前回のフィッティング結果を初期値に使用）", value="", key="fit_material")
 
     # イテレーション回数制限
     max_iterations = st.number_input("イテレーション回数制限", value=1000, step=100, key="max_iterations")
 
+    # 硬化則ごとの制限時間
+    timeout = st.number_input("硬化則ごとの制限時間[秒]", min_value=0.1, value=10.0, step=1.0, key="fit_timeout")
+
+    # ソルバー（varpro は Ludwik則・Voce則を初期推定値なしで1次元探索に帰着させる）
+    solver = st.selectbox(
+        "ソルバー",
+        ["curve_fit", "varpro"],
+        help="varpro: 線形パラメータを閉形式で消去する変数射影法（Ludwik則・Voce則）",
+        key="fit_solver"
+    )
+
+    settings = FitSettings(
+        fit_range=(lo, hi),
+        initial_guess=initial_guess,
+        max_iterations=max_iterations,
+        solver=solver,
+        material=material or None,
+        timeout=timeout
+    )
+
+    # ライブフィッティング（範囲を動かすたびに前回のパラメータから再フィッティング）
+    live = st.toggle(
+        "ライブフィッティング",
+        value=False,
+        help="フィット範囲を変更するたびに全硬化則を自動で再フィッティングします（一括LMソルバー・前回結果から開始）",
+        key="live_fit"
+    )
+    if live:
+        storage.on_fit_range_changed(settings)
+        render_live_status(storage)
+
     if st.button("フィッティング実行"):
-        settings = FitSettings(
-            fit_range=(lo, hi),
-            initial_guess=(k0, n0),
-            max_iterations=max_iterations
-        )
         storage.fit_curve_with_settings(settings)
-        st.success("フィッティングを実行しました！")
\ No newline at end of file
+        st.success("フィッティングを実行しました！")
+
+
+def render_fit_window(window: WindowSearchResult, strain_min: float, strain_max: float):
+    """
+    ・探索で選ばれた範囲と候補の一覧を表示
+    ・全候補範囲の線形回帰の決定係数をヒートマップで表示
+    ・「この範囲を適用」でフィット範囲のスライダーに反映
+    """
+    best = window.best
+    st.markdown(
+        f"**選ばれた範囲**: {best.fit_range[0]:.4f} – {best.fit_range[1]:.4f}"
+        f"（{best.num_points} 点、R² = {best.r_squared:.4f}、k = {best.params[0]:.3f}、n = {best.params[1]:.3f}）"
+    )
+    st.caption(f"{window.num_windows} 個の候補範囲を評価し、上位 {len(window.candidates)} 個を非線形フィッティングで比較しました")
+    st.dataframe(pd.DataFrame({
+        "開始": [candidate.fit_range[0] for candidate in window.candidates],
+        "終了": [candidate.fit_range[1] for candidate in window.candidates],
+        "線形化 R²": [candidate.linear_r_squared for candidate in window.candidates],
+        "R²": [candidate.r_squared for candidate in window.candidates],
+        "点数": [candidate.num_points for candidate in window.candidates],
+    }), hide_index=True)
+    plot_fit_window_heatmap(window)
+    st.button(
+        "この範囲を適用",
+        on_click=_apply_fit_range,
+        args=(best.fit_range, strain_min, strain_max),
+        key="apply_fit_window"
+    )
+
+
+def plot_fit_window_heatmap(window: WindowSearchResult):
+    """候補範囲（開始×終了）ごとの線形回帰の決定係数のヒートマップ"""
+    def draw(ax):
+        extent = (window.ends[0], window.ends[-1], window.starts[0], window.starts[-1])
+        image = ax.imshow(window.quality, origin="lower", aspect="auto", extent=extent, cmap="viridis")
+        ax.figure.colorbar(image, ax=ax, label="R² (log-log)")
+        ax.plot(window.best.fit_range[1], window.best.fit_range[0], marker="x", color="red", markersize=12, mew=2)
+        ax.set_xlabel("end strain")
+        ax.set_ylabel("start strain")
+        ax.set_title("fit quality of each window")
+
+    frame = pd.DataFrame(window.quality, index=window.starts, columns=window.ends)
+    st.image(cached_png("fit_window_heatmap", draw, [frame.reset_index()], {"best": window.best.fit_range}, figsize=(8, 6)))
+
+
+def _apply_fit_range(fit_range, strain_min: float, strain_max: float):
+    """フィット範囲のスライダーに値を設定（スライダーの範囲と刻みに合わせる）"""
+    lo = float(np.clip(np.floor(fit_range[0] * 1000) / 1000, strain_min, strain_max))
+    hi = float(np.clip(np.ceil(fit_range[1] * 1000) / 1000, strain_min, strain_max))
+    st.session_state["fit_range"] = (lo, hi)
+
+
+@st.fragment(run_every=0.3)
+def render_live_status(storage: Storage):
+    """
+    ・ライブフィッティングの状態を定期的に確認して表示
+    ・新しい結果が保存された場合はアプリ全体を再実行して結果のグラフを更新
+    """
+    fitter = storage.get_state(storage.Key.LIVE_FITTER)
+    result, updated = storage.collect_live_fit()
+    if updated:
+        st.rerun()
+    if result is None:
+        st.caption("ライブフィッティング: 計算中…")
+        return
+    iterations = " / ".join(f"{law} {count}" for law, count in result.iterations.items())
+    r_squared = " / ".join(f"{law} {value:.4f}" for law, value in result.r_squared.items())
+    state = "（更新中…）" if fitter is not None and fitter.pending else ""
+    st.caption(
+        f"ライブフィッティング{state}: 範囲 {result.fit_range[0]:.3f}–{result.fit_range[1]:.3f}、"
+        f"{result.num_points} 点、{result.elapsed * 1000:.1f} ms、反復回数 {iterations}、範囲内の R² {r_squared}"
+    )
\ No newline at end of file
@@ -0,0 +1,56 @@
+import streamlit as st
+import pandas as pd
+
+from ..services.instrumentation import RunLog
+from ..storage import Storage
+
+
+def render(run: RunLog, storage: Storage):
+    """
+    ・サイドバーの切り替えで、今回の再実行の処理段階ごとの計測結果を表示
+    ・経過時間・メモリ増減・ソルバーの関数評価回数(nfev)など
+    ・セッションのキーごとのメモリ使用量
+    """
+    if not st.sidebar.toggle("処理時間の計測を表示", value=False, key="show_metrics"):
+        return
+
+    render_memory_usage(storage)
+
+    records = sorted(run.records, key=lambda record: record.started)
+    if not records:
+        st.sidebar.caption("計測された処理はありません")
+        return
+
+    total = sum(record.elapsed for record in records if record.depth == 0)
+    st.sidebar.metric("再実行の合計時間", f"{total * 1000:.1f} ms")
+    metrics_df = pd.DataFrame({
+        "段階": ["　" * record.depth + record.name for record in records],
+        "時間[ms]": [record.elapsed * 1000 for record in records],
+        "メモリ増減[MB]": [record.memory_delta / 2 ** 20 for record in records],
+        "nfev": [int(record.counters.get("nfev", 0)) for record in records],
+        "カウンタ": [", ".join(f"{k}={v:g}" for k, v in record.counters.items() if k != "nfev") for record in records],
+        "状態": [record.status for record in records],
+    })
+    st.sidebar.dataframe(metrics_df, hide_index=True, column_config={
+        "時間[ms]": st.column_config.NumberColumn(format="%.1f"),
+        "メモリ増減[MB]": st.column_config.NumberColumn(format="%.2f"),
+    })
+
+
+def render_memory_usage(storage: Storage):
+    """セッションのキーごとのメモリ使用量（ディスクに退避した分を含む）"""
+    usage = storage.memory_usage()
+    totals = storage.store.totals()
+    st.sidebar.caption(
+        f"メモリ使用量: このセッション {sum(row['resident_bytes'] for row in usage) / 2 ** 20:.1f} MB"
+        f" / 予算 {totals['session_budget'] / 2 ** 20:.0f} MB、"
+        f"全体 {totals['resident_bytes'] / 2 ** 20:.1f} MB / {totals['global_budget'] / 2 ** 20:.0f} MB"
+        f"（{totals['sessions']} セッション）"
+    )
+    if usage:
+        st.sidebar.dataframe(pd.DataFrame({
+            "キー": [row["key"] for row in usage],
+            "型": [row["type"] for row in usage],
+            "メモリ[MB]": [row["resident_bytes"] / 2 ** 20 for row in usage],
+            "退避[MB]": [row["spilled_bytes"] / 2 ** 20 for row in usage],
+        }), hide_index=True)
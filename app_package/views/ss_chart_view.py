@@ -1,9 +1,10 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
 
 from ..models.stress_strain_curve import StressStrainCurve
+from ..services.downsample import get_display_data
 from ..storage import Storage
+from .chart_renderer import show_chart
 
 
 def render(storage: Storage):
@@ -38,35 +39,39 @@ def render(storage: Storage):
 
 def plot_nominal_and_true_curves(ss_curve: StressStrainCurve):
     """公称および真応力-ひずみ曲線のグラフを表示"""
-    # データ取得
-    nominal_df = ss_curve.get_nominal_data()
-    true_df = ss_curve.get_true_data()
+    # データ取得（描画用に間引いたデータ）
+    nominal_df = get_display_data(ss_curve, "nominal")
+    true_df = get_display_data(ss_curve, "true")
 
     # グラフ設定
-    fig, ax = plt.subplots(figsize=(10, 6))
     marker_size = 6
     line_width = 1.5
 
-    # 公称応力-ひずみ曲線
-    ax.plot(nominal_df[f"nominal_{ss_curve.label_strain}"], 
-            nominal_df[f"nominal_{ss_curve.label_stress}"], 
-            'o-', markersize=marker_size, linewidth=line_width, 
-            color='blue', label="nominal")
-    
-    # 真応力-ひずみ曲線
-    ax.plot(true_df[f"true_{ss_curve.label_strain}"], 
-            true_df[f"true_{ss_curve.label_stress}"], 
-            's-', markersize=marker_size, linewidth=line_width, 
-            color='red', label="true")
+    def draw(ax):
+        # 公称応力-ひずみ曲線
+        ax.plot(nominal_df[f"nominal_{ss_curve.label_strain}"], 
+                nominal_df[f"nominal_{ss_curve.label_stress}"], 
+                'o-', markersize=marker_size, linewidth=line_width, 
+                color='blue', label="nominal")
+        
+        # 真応力-ひずみ曲線
+        ax.plot(true_df[f"true_{ss_curve.label_strain}"], 
+                true_df[f"true_{ss_curve.label_stress}"], 
+                's-', markersize=marker_size, linewidth=line_width, 
+                color='red', label="true")
+        
+        # 軸とグリッドの設定
+        ax.set_xlabel(f"{ss_curve.label_strain}")
+        ax.set_ylabel(f"{ss_curve.label_stress}")
+        ax.grid(True, linestyle='--', alpha=0.7)
+        ax.legend()
     
-    # 軸とグリッドの設定
-    ax.set_xlabel(f"{ss_curve.label_strain}")
-    ax.set_ylabel(f"{ss_curve.label_stress}")
-    ax.grid(True, linestyle='--', alpha=0.7)
-    ax.legend()
-    
-    # グラフ表示
-    st.pyplot(fig)
+    # グラフ表示（描画済みの画像はデータが変わるまで再利用）
+    show_chart(
+        "ss_nominal_true", draw,
+        {"nominal": nominal_df, "true": true_df},
+        x_label=ss_curve.label_strain, y_label=ss_curve.label_stress
+    )
 
 
 def display_nominal_and_true_data_table(ss_curve: StressStrainCurve):
@@ -85,30 +90,34 @@ def display_nominal_and_true_data_table(ss_curve: StressStrainCurve):
 
 def plot_plastic_curve(ss_curve: StressStrainCurve):
     """塑性ひずみ-真応力曲線のグラフを表示"""
-    # データ取得
-    plastic_df = ss_curve.get_plastic_data()
+    # データ取得（描画用に間引いたデータ）
+    plastic_df = get_display_data(ss_curve, "plastic")
 
     # グラフ設定
-    fig, ax = plt.subplots(figsize=(10, 6))
     marker_size = 6
     line_width = 1.5
     
-    # 塑性ひずみ-真応力曲線
-    ax.plot(plastic_df[f"plastic_{ss_curve.label_strain}"], 
-            plastic_df[f"true_{ss_curve.label_stress}"], 
-            '^-', markersize=marker_size, linewidth=line_width, 
-            color='green', label="plastic")
-
-    # 軸とグリッドの設定
-    ax.set_xlabel(f"{ss_curve.label_strain}")
-    ax.set_ylabel(f"{ss_curve.label_stress}")
-    ax.set_xlim(left=0)  # x軸の最小値を0に設定
-    ax.set_ylim(bottom=0)  # y軸の最小値を0に設定
-    ax.grid(True, linestyle='--', alpha=0.7)
-    ax.legend()
+    def draw(ax):
+        # 塑性ひずみ-真応力曲線
+        ax.plot(plastic_df[f"plastic_{ss_curve.label_strain}"], 
+                plastic_df[f"true_{ss_curve.label_stress}"], 
+                '^-', markersize=marker_size, linewidth=line_width, 
+                color='green', label="plastic")
+
+        # 軸とグリッドの設定
+        ax.set_xlabel(f"{ss_curve.label_strain}")
+        ax.set_ylabel(f"{ss_curve.label_stress}")
+        ax.set_xlim(left=0)  # x軸の最小値を0に設定
+        ax.set_ylim(bottom=0)  # y軸の最小値を0に設定
+        ax.grid(True, linestyle='--', alpha=0.7)
+        ax.legend()
     
-    # グラフ表示
-    st.pyplot(fig)
+    # グラフ表示（描画済みの画像はデータが変わるまで再利用）
+    show_chart(
+        "ss_plastic", draw,
+        {"plastic": plastic_df},
+        x_label=ss_curve.label_strain, y_label=ss_curve.label_stress
+    )
 
 
 def display_plastic_data_table(ss_curve: StressStrainCurve):
@@ -0,0 +1,68 @@
+"""
+一括LMソルバーと曲線ごとのcurve_fitループの速度比較
+
+    python -m benchmarks.bench_batch_solver --curves 1000 --points 200
+    python -m benchmarks.bench_batch_solver --curves 255 --points 200 --long-points 1000000
+
+・--long-points を指定すると、その点数の曲線を1本加えた長さの混在するバッチで計測する
+  （一括フィッティングの確保メモリの最大値と、1本ずつ一括フィッティングした結果との一致も確認する）
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from app_package.models.fit_settings import FitSettings
+from app_package.services.batch_fit import LAW_FITTERS
+from app_package.services.batch_solver import fit_curves_batched
+
+from .synthetic import make_curves
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--curves", type=int, default=500)
+    parser.add_argument("--points", type=int, default=200)
+    parser.add_argument("--long-points", type=int, default=0, help="長さの混在するバッチにする場合の長い曲線の点数")
+    args = parser.parse_args()
+
+    curves = make_curves(args.curves, args.points)
+    if args.long_points:
+        curves += make_curves(1, args.long_points, seed=1)
+    settings = FitSettings(fit_range=(0.0, 0.25))
+
+    for law, fitter in LAW_FITTERS.items():
+        start = time.perf_counter()
+        loop_models = []
+        for curve in curves:
+            try:
+                loop_models.append(fitter(curve, settings))
+            except RuntimeError:
+                loop_models.append(None)
+        loop_time = time.perf_counter() - start
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        batch_models = fit_curves_batched(law, curves, settings)
+        batch_time = time.perf_counter() - start
+        batch_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        if args.long_points:
+            # 長さの混在するバッチの結果は、1本ずつ解いた結果と一致する
+            for curve, model in zip(curves[-2:], batch_models[-2:]):
+                single = fit_curves_batched(law, [curve], settings)[0]
+                assert np.allclose(model.params, single.params, rtol=1e-6), (law, model.params, single.params)
+
+        loop_r2 = np.nanmedian([m.calculate_r_squared(c.true_strain, c.true_stress) if m else np.nan
+                                for m, c in zip(loop_models, curves)])
+        batch_r2 = np.nanmedian([m.calculate_r_squared(c.true_strain, c.true_stress)
+                                 for m, c in zip(batch_models, curves)])
+        print(f"{law:>7}: loop {loop_time:7.3f} s (median R² {loop_r2:.4f})  "
+              f"batched {batch_time:7.3f} s (median R² {batch_r2:.4f})  "
+              f"speedup x{loop_time / batch_time:.1f}  batched peak {batch_peak / 2 ** 20:.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
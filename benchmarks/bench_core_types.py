@@ -0,0 +1,77 @@
+"""
+コアの型（硬化則・応力ひずみ曲線）の生成コストとメモリ量のベンチマーク
+
+    python -m benchmarks.bench_core_types --count 100000
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from app_package.models.ludwik_law import LudwikLaw
+from app_package.models.stress_strain_curve import StressStrainCurve
+
+
+def construct_time(make: Callable[[int], object], count: int) -> float:
+    """1個あたりの生成時間[秒]"""
+    start = time.perf_counter()
+    for i in range(count):
+        make(i)
+    return (time.perf_counter() - start) / count
+
+
+def object_bytes(make: Callable[[int], object], count: int) -> float:
+    """1個あたりの確保メモリ[バイト]（生成したオブジェクトを保持した状態で計測）"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [make(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return (after - before) / count
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_core_types")
+    parser.add_argument("--count", type=int, default=100_000, help="生成するオブジェクト数")
+    parser.add_argument("--points", type=int, default=10_000, help="応力ひずみ曲線の点数")
+    args = parser.parse_args(argv)
+
+    strain = np.linspace(0.0, 0.3, args.points)
+    stress = 300 + 500 * strain ** 0.2
+
+    def make_law(i):
+        return LudwikLaw(yield_stress=300.0, k=500.0 + i, n=0.2)
+
+    def make_curve(i):
+        return StressStrainCurve(nominal_strain=strain, nominal_stress=stress, yield_stress=300.0)
+
+    def make_curve_with_arrays(i):
+        curve = make_curve(i)
+        curve.plastic_strain
+        return curve
+
+    cases = [
+        ("LudwikLaw", make_law, args.count),
+        ("StressStrainCurve", make_curve, args.count // 10),
+        (f"StressStrainCurve+derived({args.points} pts)", make_curve_with_arrays, 200),
+    ]
+    if "dtype" in getattr(StressStrainCurve, "__dataclass_fields__", {}):
+        def make_curve_float32(i):
+            curve = StressStrainCurve(nominal_strain=strain, nominal_stress=stress, yield_stress=300.0, dtype=np.float32)
+            curve.plastic_strain
+            return curve
+        cases.append((f"StressStrainCurve+derived float32({args.points} pts)", make_curve_float32, 200))
+
+    for name, make, count in cases:
+        seconds = construct_time(make, count)
+        size = object_bytes(make, count)
+        print(f"{name:<48} {seconds * 1e6:9.2f} us/object  {size:12.0f} bytes/object")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
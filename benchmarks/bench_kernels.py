@@ -0,0 +1,85 @@
+"""
+硬化則の評価・決定係数の計算カーネル（NumPy / Numba）のベンチマーク
+
+    python -m benchmarks.bench_kernels
+    python -m benchmarks.bench_kernels --sizes 1000 100000 --calls 200
+
+・同じ入力で NumPy と Numba（インストールされている場合）を比較し、1回あたりの時間と確保メモリを表示する
+・Numba の初回コンパイル（またはディスクキャッシュからの読み込み）の時間も表示する
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from app_package.models import kernels
+from app_package.services.fit_curve import LAW_MODELS
+
+
+def call_time(run: Callable[[], object], calls: int) -> float:
+    """1回あたりの時間[秒]（calls 回の平均の3回中の最小）"""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(calls):
+            run()
+        best = min(best, (time.perf_counter() - start) / calls)
+    return best
+
+
+def peak_bytes(run: Callable[[], object]) -> int:
+    """1回の呼び出しで確保されるメモリの最大値[バイト]"""
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_kernels")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1_000, 100_000, 1_000_000], help="配列の点数")
+    parser.add_argument("--calls", type=int, default=50, help="計測する呼び出し回数")
+    args = parser.parse_args(argv)
+
+    backends = [kernels.BACKEND_NUMPY]
+    start = time.perf_counter()
+    if kernels.set_backend("auto") == kernels.BACKEND_NUMBA:
+        backends.append(kernels.BACKEND_NUMBA)
+        print(f"numba: 読み込み・コンパイル {time.perf_counter() - start:.2f} s")
+    else:
+        print("numba: 利用できないため NumPy のみ計測します")
+
+    params = {"ludwik": (500.0, 0.2), "swift": (0.002, 0.2), "voce": (600.0, 20.0)}
+    for size in args.sizes:
+        x = np.linspace(0.0, 0.3, size)
+        for law, law_class in LAW_MODELS.items():
+            p1, p2 = params[law]
+            model = law_class(yield_stress=300.0, **dict(zip(law_class.param_names, params[law])))
+            y = model.get_stress(x) + np.random.default_rng(0).normal(0.0, 1.0, size)
+            cases = {
+                "get_stress": lambda: model.get_stress(x),
+                "r_squared": lambda: model.calculate_r_squared(x, y),
+                "residual_sums": lambda: kernels.residual_sums(law_class, x, y, p1, p2, 300.0),
+            }
+            for name, run in cases.items():
+                line = f"{law:<7} {name:<14} n={size:<9}"
+                results = []
+                for backend in backends:
+                    kernels.set_backend(backend)
+                    run()
+                    seconds = call_time(run, args.calls)
+                    results.append(seconds)
+                    line += f" {backend}: {seconds * 1e6:10.1f} us {peak_bytes(run) / 1024:9.1f} KiB"
+                if len(results) == 2:
+                    line += f"  x{results[0] / results[1]:.2f}"
+                print(line, flush=True)
+    kernels.set_backend(None)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
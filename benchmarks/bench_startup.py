@@ -0,0 +1,96 @@
+"""
+起動時間（モジュールの読み込み時間）のベンチマーク
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --output startup.json --compare old_startup.json
+
+・各モジュールを新しいインタプリタで読み込み、`python -c pass` との差を読み込み時間とする
+・読み込み時点で scipy / matplotlib / streamlit が読み込まれていないかも確認する
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+from .suite import compare, environment, print_comparison
+
+
+# 起動時間を計測するモジュール（CLI・バッチのワーカープロセス・HTTPサービス・Streamlit アプリ）
+MODULES = [
+    "app_package.cli",
+    "app_package.services.batch_fit",
+    "app_package.server",
+    "app_package.storage",
+    "main",
+]
+# 読み込み時点では不要な重いモジュール
+HEAVY_MODULES = ["scipy", "matplotlib", "streamlit"]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def _probe(statement: str) -> Dict:
+    """新しいインタプリタで statement を実行し、経過時間と読み込まれた重いモジュールを返す"""
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(statement=statement, heavy=HEAVY_MODULES)],
+        capture_output=True, text=True, check=True, cwd=ROOT,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure_import(module: str, repeat: int = 5) -> Dict:
+    """module の読み込み時間（新しいインタプリタで repeat 回）"""
+    times, loaded = [], []
+    for _ in range(repeat):
+        result = _probe(f"import {module}")
+        times.append(result["elapsed"])
+        loaded = result["loaded"]
+    return {
+        "min_s": min(times),
+        "median_s": statistics.median(times),
+        "mean_s": statistics.fmean(times),
+        "repeat": repeat,
+        "heavy_modules_loaded": loaded,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_startup", description=__doc__.splitlines()[1])
+    parser.add_argument("--modules", nargs="+", default=MODULES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default=None, help="結果のJSON")
+    parser.add_argument("--compare", default=None, help="比較する過去の結果JSON")
+    parser.add_argument("--threshold", type=float, default=0.15, help="回帰とみなす遅延の割合")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for module in args.modules:
+        results[f"import.{module}"] = result = measure_import(module, args.repeat)
+        loaded = ", ".join(result["heavy_modules_loaded"]) or "-"
+        print(f"import {module:<35} {result['min_s'] * 1000:8.1f} ms  (heavy: {loaded})", flush=True)
+    current = {"environment": environment(), "config": {"repeat": args.repeat}, "results": results}
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"results -> {args.output}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print_comparison(compare(baseline, current, args.threshold), baseline, current)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,307 @@
+"""
+取り込み・曲線変換・フィッティング・エクスポートのベンチマーク
+
+    python -m benchmarks.suite                          # 10²〜10⁵点、結果を benchmarks/results/<commit>.json に保存
+    python -m benchmarks.suite --full                   # 10⁷点まで
+    python -m benchmarks.suite --compare benchmarks/results/abc1234.json --fail-on-regression
+    python -m benchmarks.suite --only fit --materials mild_steel --noise 0 2 10
+    python -m benchmarks.suite --only bootstrap --materials mild_steel  # 1万点・2000回のブートストラップ
+
+・各ケースは setup（計測外）と run（計測対象）に分け、キャッシュの効かない状態で計測する
+・比較は最小時間で行い、threshold を超えて遅くなったケースを回帰として報告する
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from itertools import product
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app_package.models.stress_strain_curve import StressStrainCurve
+from app_package.models.fit_settings import FitSettings
+from app_package.services.bootstrap import bootstrap_law
+from app_package.services.export import build_adaptive_export_frame, build_export_frame
+from app_package.services.fit_curve import LAW_FITTERS, get_fit_data
+from app_package.services.ingest import clear_frame_cache
+from app_package.services.session_store import SessionStore
+from app_package.storage import Storage
+
+from .synthetic import FULL_SIZES, MATERIALS, QUICK_SIZES, make_curve, to_csv_bytes
+
+
+STAGES = ["ingest", "curve", "fit", "r_squared", "export", "bootstrap"]
+# 既定で計測する段階（ブートストラップは時間がかかるため指定した場合のみ）
+DEFAULT_STAGES = [stage for stage in STAGES if stage != "bootstrap"]
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def measure(
+        run: Callable[[Any], Any],
+        setup: Callable[[], Any] = lambda: None,
+        repeat: int = 5,
+        min_time: float = 0.05,
+) -> Dict[str, float]:
+    """
+    run の実行時間を計測
+    ・1回が min_time より短い場合は複数回実行して平均する（setup は毎回実行し、計測に含めない）
+    """
+    state = setup()
+    start = time.perf_counter()
+    run(state)
+    first = time.perf_counter() - start
+    number = max(1, min(1000, int(min_time / max(first, 1e-9))))
+
+    times = []
+    for _ in range(repeat):
+        total = 0.0
+        for _ in range(number):
+            state = setup()
+            start = time.perf_counter()
+            run(state)
+            total += time.perf_counter() - start
+        times.append(total / number)
+    return {
+        "min_s": min(times),
+        "median_s": statistics.median(times),
+        "mean_s": statistics.fmean(times),
+        "repeat": repeat,
+        "number": number,
+    }
+
+
+def _curve_cases(
+        size: int, material: str, noise: float, data_dir: str, store: SessionStore
+) -> List[Tuple[str, str, Callable, Callable]]:
+    """
+    1つの合成曲線に対する (段階, 名前, setup, run) の一覧
+    ・Storage はベンチマーク専用のストアを使い、前回のセッションを setup で破棄する（退避・破棄を計測に含めない）
+    """
+    curve = make_curve(size, material, noise)
+    label = f"[{material},noise={noise:g},n={size}]"
+    cases = []
+
+    # 取り込み（アップロード → 列選択）
+    csv_bytes = to_csv_bytes(curve)
+
+    sessions = []
+
+    def cold_storage():
+        clear_frame_cache()
+        shutil.rmtree(data_dir, ignore_errors=True)
+        while sessions:
+            store.delete_session(sessions.pop())
+        storage = Storage(state={}, store=store)
+        sessions.append(storage.session_id)
+        return storage
+
+    def uploaded_storage():
+        storage = cold_storage()
+        storage.on_file_uploaded(io.BytesIO(csv_bytes))
+        return storage
+
+    def select_columns(storage):
+        storage.on_raw_data_columns_selected("strain", "stress", False, curve.young_modulus, curve.yield_stress)
+        storage.get_state(Storage.Key.SS_CURVE).plastic_strain
+
+    cases.append(("ingest", f"ingest.upload{label}", lambda: (cold_storage(), io.BytesIO(csv_bytes)),
+                  lambda state: state[0].on_file_uploaded(state[1])))
+    cases.append(("ingest", f"ingest.columns{label}", uploaded_storage, select_columns))
+
+    # 曲線の派生配列（真ひずみ → 真応力 → 弾性ひずみ → 塑性ひずみ）
+    def fresh_curve():
+        return StressStrainCurve(
+            nominal_strain=curve.nominal_strain, nominal_stress=curve.nominal_stress,
+            young_modulus=curve.young_modulus, yield_stress=curve.yield_stress,
+        )
+
+    def property_chain(c):
+        c.true_strain, c.true_stress, c.elastic_strain, c.plastic_strain
+        c.get_plastic_data()
+
+    cases.append(("curve", f"curve.properties{label}", fresh_curve, property_chain))
+
+    # フィッティングと決定係数
+    settings = FitSettings(fit_range=(0.0, float(curve.plastic_strain.max())))
+    for law, fitter in LAW_FITTERS.items():
+        cases.append(("fit", f"fit.{law}{label}", lambda: None, lambda _, fitter=fitter: fitter(curve, settings)))
+        try:
+            model = fitter(curve, settings)
+        except Exception:
+            continue
+        cases.append(("r_squared", f"r_squared.{law}{label}", lambda: None,
+                      lambda _, model=model: model.calculate_r_squared(curve.plastic_strain, curve.true_stress)))
+    return cases
+
+
+def _export_cases(material: str) -> List[Tuple[str, str, Callable, Callable]]:
+    """エクスポート（点数は曲線の長さによらない）"""
+    curve = make_curve(10_000, material, 0.0)
+    settings = FitSettings(fit_range=(0.0, float(curve.plastic_strain.max())))
+    laws = {law: fitter(curve, settings) for law, fitter in LAW_FITTERS.items()}
+    label = f"[{material}]"
+    return [
+        ("export", f"export.get_plot_data{label}", lambda: None,
+         lambda _: [model.get_plot_data((0.0, 0.5), 1000, (0.0, 0.05), 200) for model in laws.values()]),
+        ("export", f"export.grid{label}", lambda: None,
+         lambda _: build_export_frame(laws, (0.0, 0.5), 1000, (0.0, 0.05), 200)),
+        ("export", f"export.adaptive{label}", lambda: None,
+         lambda _: build_adaptive_export_frame(laws, (0.0, 0.5), 0.1)),
+    ]
+
+
+def _bootstrap_cases(material: str) -> List[Tuple[str, str, Callable, Callable]]:
+    """ブートストラップ（1万点の曲線、2000回の再標本化）"""
+    curve = make_curve(10_000, material, 1.0)
+    settings = FitSettings(fit_range=(0.0, float(curve.plastic_strain.max())))
+    x_data, y_data = get_fit_data(curve, settings)
+    label = f"[{material},n=10000,B=2000]"
+    cases = []
+    for law, fitter in LAW_FITTERS.items():
+        model = fitter(curve, settings)
+        cases.append(("bootstrap", f"bootstrap.{law}{label}", lambda: None,
+                      lambda _, model=model: bootstrap_law(model, x_data, y_data, num_replicates=2000)))
+    return cases
+
+
+def run_suite(
+        sizes: List[int],
+        materials: List[str],
+        noise_levels: List[float],
+        stages: List[str],
+        repeat: int = 5,
+) -> Dict[str, Dict[str, float]]:
+    """全ケースを実行し、ケース名 → 計測結果を返す"""
+    results = {}
+    data_dir = tempfile.mkdtemp(prefix="fitcurve_bench_")
+    previous_data_dir = os.environ.get("FITCURVE_DATA_DIR")
+    # 列キャッシュとセッションの退避先はどちらも data_dir の下に置き、終了時にまとめて削除する
+    columns_dir = os.path.join(data_dir, "columns")
+    os.environ["FITCURVE_DATA_DIR"] = columns_dir
+    store = SessionStore(spill_dir=os.path.join(data_dir, "spill"))
+    try:
+        cases = []
+        for size, material, noise in product(sizes, materials, noise_levels):
+            cases += _curve_cases(size, material, noise, columns_dir, store)
+        if "export" in stages:
+            for material in materials:
+                cases += _export_cases(material)
+        if "bootstrap" in stages:
+            for material in materials:
+                cases += _bootstrap_cases(material)
+
+        for stage, name, setup, run in cases:
+            if stage not in stages:
+                continue
+            try:
+                results[name] = measure(run, setup, repeat)
+                print(f"{name:<60} {results[name]['min_s'] * 1000:12.3f} ms", flush=True)
+            except Exception as e:
+                results[name] = {"error": f"{e}"}
+                print(f"{name:<60} error: {e}", flush=True)
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+        if previous_data_dir is None:
+            os.environ.pop("FITCURVE_DATA_DIR", None)
+        else:
+            os.environ["FITCURVE_DATA_DIR"] = previous_data_dir
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(__file__),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> Dict[str, str]:
+    """計測環境（比較時に異なる環境の結果を見分けるため）"""
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare(baseline: Dict, current: Dict, threshold: float = 0.15) -> List[Dict[str, Any]]:
+    """
+    2回の計測結果を比較
+    ・最小時間の比が 1 + threshold を超えたケースを regression、1 - threshold を下回ったケースを improvement とする
+    """
+    rows = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None or "min_s" not in base or "min_s" not in result:
+            continue
+        ratio = result["min_s"] / max(base["min_s"], 1e-12)
+        status = "regression" if ratio > 1 + threshold else "improvement" if ratio < 1 - threshold else ""
+        rows.append({"case": name, "baseline_s": base["min_s"], "current_s": result["min_s"],
+                     "ratio": ratio, "status": status})
+    return rows
+
+
+def print_comparison(rows: List[Dict[str, Any]], baseline: Dict, current: Dict) -> None:
+    print(f"\nbaseline {baseline['environment'].get('commit')} -> current {current['environment'].get('commit')}")
+    for row in rows:
+        print(f"{row['case']:<60} {row['baseline_s'] * 1000:10.3f} -> {row['current_s'] * 1000:10.3f} ms "
+              f"x{row['ratio']:5.2f} {row['status']}")
+    regressions = [row for row in rows if row["status"] == "regression"]
+    print(f"{len(rows)} cases compared, {len(regressions)} regressions")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite", description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=None, help="曲線の点数（省略時は10²〜10⁵）")
+    parser.add_argument("--full", action="store_true", help="10⁶, 10⁷点も計測")
+    parser.add_argument("--materials", nargs="+", choices=list(MATERIALS), default=list(MATERIALS))
+    parser.add_argument("--noise", type=float, nargs="+", default=[2.0], help="応力ノイズの標準偏差[MPa]")
+    parser.add_argument("--only", nargs="+", choices=STAGES, default=DEFAULT_STAGES, help="計測する段階")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default=None, help="結果のJSON（省略時は benchmarks/results/<commit>.json）")
+    parser.add_argument("--compare", default=None, help="比較する過去の結果JSON")
+    parser.add_argument("--threshold", type=float, default=0.15, help="回帰とみなす遅延の割合")
+    parser.add_argument("--fail-on-regression", action="store_true", help="回帰があれば終了コード1")
+    args = parser.parse_args(argv)
+
+    sizes = args.sizes or (FULL_SIZES if args.full else QUICK_SIZES)
+    current = {
+        "environment": environment(),
+        "config": {"sizes": sizes, "materials": args.materials, "noise": args.noise, "repeat": args.repeat},
+        "results": run_suite(sizes, args.materials, args.noise, args.only, args.repeat),
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{current['environment']['commit'] or 'latest'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(current, f, indent=2)
+    print(f"results -> {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows = compare(baseline, current, args.threshold)
+        print_comparison(rows, baseline, current)
+        if args.fail_on_regression and any(row["status"] == "regression" for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""
+ベンチマーク用の合成応力ひずみ曲線
+・弾性域（ヤング率の直線）と塑性域（指定した硬化則＋正規ノイズ）からなる公称応力ひずみ曲線を生成
+"""
+import io
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app_package.models.stress_strain_curve import StressStrainCurve
+from app_package.services.fit_curve import LAW_MODELS
+
+
+# 点数（10²〜10⁷）
+QUICK_SIZES = [10 ** 2, 10 ** 3, 10 ** 4, 10 ** 5]
+FULL_SIZES = QUICK_SIZES + [10 ** 6, 10 ** 7]
+
+# 材料パラメータ（名前 → (硬化則, パラメータ, 降伏応力[MPa])）
+MATERIALS: Dict[str, Tuple[str, Dict[str, float], float]] = {
+    "mild_steel": ("ludwik", {"k": 500.0, "n": 0.25}, 250.0),
+    "high_strength": ("ludwik", {"k": 900.0, "n": 0.12}, 700.0),
+    "aluminium": ("voce", {"stress_infinite": 320.0, "h": 25.0}, 150.0),
+    "stainless": ("swift", {"alpha": 0.02, "n": 0.4}, 300.0),
+}
+
+# 応力ノイズの標準偏差[MPa]
+NOISE_LEVELS = [0.0, 2.0, 10.0]
+
+
+def make_curve(
+        num_points: int,
+        material: str = "mild_steel",
+        noise: float = 2.0,
+        max_plastic_strain: float = 0.3,
+        elastic_fraction: float = 0.05,
+        young_modulus: float = 200000.0,
+        seed: int = 0,
+) -> StressStrainCurve:
+    """
+    合成応力ひずみ曲線を生成
+    ・num_points の elastic_fraction を弾性域、残りを塑性域に割り当てる
+    """
+    rng = np.random.default_rng(seed)
+    law, params, yield_stress = MATERIALS[material]
+    law_model = LAW_MODELS[law](yield_stress=yield_stress, **params)
+
+    num_elastic = max(int(num_points * elastic_fraction), 2)
+    num_plastic = max(num_points - num_elastic, 2)
+    elastic_stress = np.linspace(0.0, yield_stress, num_elastic, endpoint=False)
+    plastic_strain = np.linspace(0.0, max_plastic_strain, num_plastic)
+    true_stress = np.concatenate([elastic_stress, law_model.get_stress(plastic_strain)])
+    true_stress += rng.normal(0.0, noise, len(true_stress)) if noise > 0 else 0.0
+    true_strain = np.concatenate([np.zeros(num_elastic), plastic_strain]) + true_stress / young_modulus
+
+    nominal_strain = np.expm1(true_strain)
+    return StressStrainCurve(
+        nominal_strain=nominal_strain,
+        nominal_stress=true_stress / (1 + nominal_strain),
+        young_modulus=young_modulus,
+        yield_stress=yield_stress,
+    )
+
+
+def make_curves(num_curves: int, num_points: int, seed: int = 0) -> List[StressStrainCurve]:
+    """Ludwik則のパラメータ（k, n）をランダムに変えた合成曲線を生成（塑性域のみ）"""
+    rng = np.random.default_rng(seed)
+    young_modulus, yield_stress = 200000.0, 300.0
+    curves = []
+    for _ in range(num_curves):
+        k = rng.uniform(300, 900)
+        n = rng.uniform(0.1, 0.5)
+        plastic = np.linspace(0.0, 0.2, num_points)
+        true_stress = yield_stress + k * plastic ** n
+        true_stress += rng.normal(0, 2.0, num_points)
+        true_strain = plastic + true_stress / young_modulus
+        nominal_strain = np.exp(true_strain) - 1
+        curves.append(StressStrainCurve(
+            nominal_strain=nominal_strain,
+            nominal_stress=true_stress / (1 + nominal_strain),
+            young_modulus=young_modulus,
+            yield_stress=yield_stress,
+        ))
+    return curves
+
+
+def to_csv_bytes(curve: StressStrainCurve, strain_column: str = "strain", stress_column: str = "stress") -> bytes:
+    """アップロード用のCSV（公称ひずみ・公称応力の2列）"""
+    buffer = io.StringIO()
+    pd.DataFrame({strain_column: curve.nominal_strain, stress_column: curve.nominal_stress}).to_csv(
+        buffer, index=False, float_format="%.9g"
+    )
+    return buffer.getvalue().encode()
@@ -1,17 +1,28 @@
 import streamlit as st
 from app_package.storage import Storage
-from app_package.views import upload_view, raw_data_view, ss_chart_view, fit_settings_view, fit_result_view
+from app_package.services.instrumentation import configure_logging, run_log, stage
+from app_package.views import chart_renderer, metrics_view, upload_view, raw_data_view, ss_chart_view, fit_settings_view, fit_result_view
 
 
 def main():
+    configure_logging()
     storage = Storage(state=st.session_state)
 
-    st.title("硬化則カーブフィッティング")
-    upload_view.render(storage)
-    raw_data_view.render(storage)
-    ss_chart_view.render(storage)
-    fit_settings_view.render(storage)
-    fit_result_view.render(storage)
+    # 各ビューの描画（とそこから呼ばれるイベントハンドラ）を計測
+    with run_log(storage.session_id) as run:
+
+        st.title("硬化則カーブフィッティング")
+        chart_renderer.render_backend_selector()
+        for name, view in (
+            ("upload", upload_view),
+            ("raw_data", raw_data_view),
+            ("ss_chart", ss_chart_view),
+            ("fit_settings", fit_settings_view),
+            ("fit_result", fit_result_view),
+        ):
+            with stage(f"view.{name}"):
+                view.render(storage)
+    metrics_view.render(run, storage)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()